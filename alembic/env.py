@@ -29,7 +29,13 @@ config.set_main_option('sqlalchemy.url', database_url)
 # Importa la Base de tus modelos y los propios modelos
 from src.database.base import Base
 from src.database.models.user import User
+from src.database.backfill import CHECKPOINT_TABLE
 target_metadata = Base.metadata
+
+
+def include_name(name, type_, parent_names) -> bool:
+    # checkpoints of src.database.backfill are not part of the models, autogenerate must not drop them
+    return not (type_ == "table" and name == CHECKPOINT_TABLE)
 # --- FIN DE CAMBIOS ---
 
 # other values from the config, defined by the needs of env.py,
@@ -54,6 +60,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -77,7 +84,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_name=include_name
         )
 
         with context.begin_transaction():
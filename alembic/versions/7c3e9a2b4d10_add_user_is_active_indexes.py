@@ -0,0 +1,30 @@
+"""Add is_active composite indexes on user
+
+Revision ID: 7c3e9a2b4d10
+Revises: f1ba1591ca72
+Create Date: 2026-10-19 10:12:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e9a2b4d10'
+down_revision: Union[str, Sequence[str], None] = 'f1ba1591ca72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_user_is_active_id', 'user', ['is_active', 'id'], unique=False)
+    op.create_index('ix_user_is_active_username', 'user', ['is_active', 'username'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_is_active_username', table_name='user')
+    op.drop_index('ix_user_is_active_id', table_name='user')
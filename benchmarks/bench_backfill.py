@@ -0,0 +1,80 @@
+"""
+Latency of concurrent registrations while a new column is backfilled, one UPDATE vs src.database.backfill.
+
+A seeded table gets a new username_lower column, then a writer thread keeps inserting users (as
+/auth/register does) while the column is filled either by a single UPDATE over every row or by
+`backfill` in id-range batches with a pause between them.
+
+    poetry run python -m benchmarks.bench_backfill --rows 1000000
+"""
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+
+from src.database.backfill import BATCH_SIZE, PAUSE_SECONDS, backfill
+from benchmarks.common import SEED_PASSWORD_HASH, seeded_engine, summary
+
+UPDATE = "UPDATE user SET username_lower = lower(username) WHERE username_lower IS NULL"
+BATCH_UPDATE = UPDATE + " AND id BETWEEN :first_id AND :last_id"
+
+
+def run(mode: str, template: str, rows: int, batch_size: int, pause_seconds: float) -> None:
+    path = tempfile.mktemp(prefix="bench-backfill-", suffix=".db")
+    shutil.copy(template, path)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"timeout": 30})
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ALTER TABLE user ADD COLUMN username_lower VARCHAR(30)")
+
+    done = threading.Event()
+    latencies = []
+
+    def register() -> None:
+        i = 0
+        while not done.is_set():
+            start = time.perf_counter()
+            with engine.begin() as connection:
+                connection.execute(
+                    text("INSERT INTO user (username, username_lower, password, is_active) VALUES (:username, :username, :password, 1)"),
+                    {"username": f"new-{mode}-{i}", "password": SEED_PASSWORD_HASH},
+                )
+            latencies.append((time.perf_counter() - start) * 1000)
+            i += 1
+            time.sleep(0.001)
+
+    writer = threading.Thread(target=register)
+    writer.start()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    if mode == "single":
+        with engine.begin() as connection:
+            connection.execute(text(UPDATE))
+    else:
+        backfill(engine, "bench", BATCH_UPDATE, batch_size=batch_size, pause_seconds=pause_seconds, on_progress=lambda progress: None)
+    elapsed = time.perf_counter() - start
+    time.sleep(0.05)
+    done.set()
+    writer.join()
+    engine.dispose()
+    print(f"{mode:<8} backfill={elapsed:.2f}s ({rows / elapsed:,.0f} rows/s) registrations={len(latencies)} {summary(latencies)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=PAUSE_SECONDS)
+    args = parser.parse_args()
+
+    template = tempfile.mktemp(prefix="bench-backfill-template-", suffix=".db")
+    seeded_engine(args.rows, path=template).dispose()
+    print(f"{args.rows:,} rows, batches of {args.batch_size}, pause {args.pause}s")
+    for mode in ["single", "batched"]:
+        run(mode, template, args.rows, args.batch_size, args.pause)
+
+
+if __name__ == "__main__":
+    main()
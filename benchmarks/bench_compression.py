@@ -0,0 +1,64 @@
+"""
+CPU cost vs bytes saved by CompressionMiddleware encoders on realistic GET /users pages.
+
+Pages are the PaginationResponse JSON of `limit` random users, as the endpoint renders them.
+For every encoder and level it prints the compressed size, the ratio and the time to compress
+one page, whole (a regular response) and in 4 KiB chunks flushed one by one (a stream).
+
+    poetry run python -m benchmarks.bench_compression --iterations 200
+"""
+import argparse
+import random
+from statistics import median
+
+from src.core.compression import BrotliEncoder, GzipEncoder, brotli
+from src.schemas.pagination import PaginationResponse
+from src.schemas.user import UserDTO
+from benchmarks.common import measure, random_username
+
+CHUNK_SIZE = 4096
+
+
+def user_page(limit: int, rng: random.Random) -> bytes:
+    users = [UserDTO(id=rng.randint(1, 1_000_000), username=random_username(rng), is_active=rng.random() < 0.9) for _ in range(limit)]
+    page = PaginationResponse(results=users, page=rng.randint(1, 1000), limit=limit, total_pages=10_000, total_results=1_000_000)
+    return page.model_dump_json().encode()
+
+
+def compress_whole(new_encoder, body: bytes) -> bytes:
+    return new_encoder().finish(body)
+
+
+def compress_chunked(new_encoder, body: bytes) -> bytes:
+    encoder = new_encoder()
+    chunks = [encoder.compress(body[i:i + CHUNK_SIZE]) for i in range(0, len(body), CHUNK_SIZE)]
+    return b"".join(chunks) + encoder.finish()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    encoders = [(f"gzip-{level}", lambda level=level: GzipEncoder(level)) for level in (1, 4, 6, 9)]
+    if brotli is not None:
+        encoders += [(f"br-{quality}", lambda quality=quality: BrotliEncoder(quality)) for quality in (1, 4, 6, 11)]
+
+    print(f"{'limit':>5} {'encoder':<8} {'bytes':>8} {'ratio':>6} {'whole p50':>10} {'chunked':>8} {'MB/s':>7}")
+    for limit in (10, 50, 100):
+        body = user_page(limit, rng)
+        print(f"{limit:>5} {'identity':<8} {len(body):>8,} {1:>6.2f}")
+        for name, new_encoder in encoders:
+            compressed = compress_whole(new_encoder, body)
+            chunked = compress_chunked(new_encoder, body)
+            whole_ms = median(measure(lambda: compress_whole(new_encoder, body), args.iterations))
+            throughput = len(body) / whole_ms / 1000
+            print(
+                f"{limit:>5} {name:<8} {len(compressed):>8,} {len(body) / len(compressed):>6.2f} "
+                f"{whole_ms * 1000:>8.1f}us {len(chunked):>8,} {throughput:>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
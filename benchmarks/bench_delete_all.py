@@ -0,0 +1,85 @@
+"""
+Latency of concurrent registrations while every user is deleted, single transaction vs chunked job.
+
+A writer thread keeps inserting users (as /auth/register does) while another thread deletes a
+seeded table, either with UserRepository.delete_all (one DELETE, one commit) or with
+UserService.delete_all_in_chunks (DELETE_ALL_CHUNK_SIZE ids per transaction).
+
+    poetry run python -m benchmarks.bench_delete_all --rows 500000
+"""
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.config import settings
+from src.database.models.user import User
+from src.jobs.job_registry import Job
+from src.repositories.impl.user_repository_sql_alchemy import UserRepository
+from src.services.user_service import UserService
+from benchmarks.common import SEED_PASSWORD_HASH, seeded_engine, summary
+
+
+def run(mode: str, template: str, rows: int) -> None:
+    path = tempfile.mktemp(prefix="bench-delete-", suffix=".db")
+    shutil.copy(template, path)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    sessions = sessionmaker(autoflush=False, bind=engine)
+
+    @contextmanager
+    def open_repository():
+        db = sessions()
+        try:
+            yield UserRepository(db=db)
+        finally:
+            db.close()
+
+    done = threading.Event()
+    latencies = []
+
+    def register() -> None:
+        with open_repository() as repository:
+            i = 0
+            while not done.is_set():
+                start = time.perf_counter()
+                repository.save(User(username=f"new-{mode}-{i}", password=SEED_PASSWORD_HASH))
+                latencies.append((time.perf_counter() - start) * 1000)
+                i += 1
+                time.sleep(0.001)
+
+    writer = threading.Thread(target=register)
+    writer.start()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    if mode == "single":
+        with open_repository() as repository:
+            repository.delete_all()
+    else:
+        UserService(None, None, user_repository_factory=open_repository).delete_all_in_chunks(Job(kind="delete_all"))
+    elapsed = time.perf_counter() - start
+    time.sleep(0.05)
+    done.set()
+    writer.join()
+    engine.dispose()
+    print(f"{mode:<8} delete={elapsed:.2f}s ({rows / elapsed:,.0f} rows/s) registrations={len(latencies)} {summary(latencies)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    template = tempfile.mktemp(prefix="bench-delete-template-", suffix=".db")
+    seeded_engine(args.rows, path=template).dispose()
+    print(f"chunk size {settings.DELETE_ALL_CHUNK_SIZE}, pause {settings.DELETE_ALL_PAUSE_SECONDS}s")
+    for mode in ["single", "chunked"]:
+        run(mode, template, args.rows)
+
+
+if __name__ == "__main__":
+    main()
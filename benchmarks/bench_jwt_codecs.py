@@ -0,0 +1,48 @@
+"""
+Encode/decode throughput of every installed JWT codec backend and HMAC algorithm.
+
+"jose (raw key)" calls python-jose the way CookieService used to, with the secret string,
+to show what precomputing the key is worth on its own.
+
+    poetry run python -m benchmarks.bench_jwt_codecs --iterations 20000
+"""
+import argparse
+import time
+
+from jose import jwt
+
+from src.dependencies.codecs_di import available_jwt_codecs, get_jwt_codec
+
+SECRET_KEY = "benchmark-secret-key"
+
+
+def ops_per_second(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    now = int(time.time())
+    claims = {"sub": "benchmark-user", "id": 123456, "iat": now, "exp": now + 1800, "jti": "Xw1bQ3sZ9w8u2kq6mN0pLA"}
+
+    print(f"{'backend':<16} {'alg':<6} {'encode ops/s':>14} {'decode ops/s':>14}")
+    for algorithm in ["HS256", "HS384", "HS512"]:
+        token = jwt.encode(claims, SECRET_KEY, algorithm=algorithm)
+        encode = ops_per_second(lambda: jwt.encode(claims, SECRET_KEY, algorithm=algorithm), args.iterations)
+        decode = ops_per_second(lambda: jwt.decode(token, SECRET_KEY, algorithms=[algorithm]), args.iterations)
+        print(f"{'jose (raw key)':<16} {algorithm:<6} {encode:>14,.0f} {decode:>14,.0f}")
+        for backend in available_jwt_codecs():
+            codec = get_jwt_codec(backend, SECRET_KEY, algorithm)
+            encode = ops_per_second(lambda: codec.encode(claims), args.iterations)
+            decode = ops_per_second(lambda: codec.decode(token), args.iterations)
+            print(f"{backend:<16} {algorithm:<6} {encode:>14,.0f} {decode:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+POST /auth/login under overload, without and with ConcurrencyLimitMiddleware.
+
+Logins arrive at a fixed rate (open loop, like real clients that do not wait for each other) above
+what the CPU can bcrypt, against the app in process with the in-memory repository. Without a
+limit every login queues for a thread until it is served late or hits its deadline (504); with
+the adaptive limit the excess is shed right away with 503 and the logins let in stay fast.
+
+    poetry run python -m benchmarks.bench_load_shedding --rate 20 --seconds 10
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+from src.core.config import settings
+from benchmarks.common import summary
+
+CREDENTIALS = {"username": "benchuser", "password": "Password123!"}
+
+
+async def run(app, rate: float, seconds: float) -> None:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        await client.post("/auth/register", json=CREDENTIALS)
+        statuses: Counter[int] = Counter()
+        latencies: dict[int, list[float]] = {}
+
+        async def login() -> None:
+            start = time.perf_counter()
+            response = await client.post("/auth/login", json=CREDENTIALS)
+            statuses[response.status_code] += 1
+            latencies.setdefault(response.status_code, []).append((time.perf_counter() - start) * 1000)
+
+        tasks = []
+        start = time.perf_counter()
+        for i in range(int(rate * seconds)):
+            await asyncio.sleep(max(0.0, start + i / rate - time.perf_counter()))
+            tasks.append(asyncio.create_task(login()))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    print(f"  {sum(statuses.values())} logins in {elapsed:.1f}s, {statuses.get(200, 0) / elapsed:.1f} ok/s")
+    for status_code, timings in sorted(latencies.items()):
+        print(f"  {status_code}: {len(timings):>5} {summary(timings) if len(timings) > 1 else f'{timings[0]:.3f}ms'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=20, help="logins per second")
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    settings.USER_REPOSITORY = "memory"
+    settings.CONCURRENCY_LIMIT_ENABLED = False
+    from src.core.middleware import ConcurrencyLimitMiddleware
+    from src.main import app
+    from starlette.routing import Route
+
+    routes = [(route, getattr(route.endpoint, "_concurrency_group", "default")) for route in app.routes if isinstance(route, Route)]
+    print(f"auth limit {settings.CONCURRENCY_LIMITS['auth']}")
+    for name, target in [("unlimited", app), ("limited", ConcurrencyLimitMiddleware(app, routes=routes))]:
+        print(name)
+        asyncio.run(run(target, args.rate, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
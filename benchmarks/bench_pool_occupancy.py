@@ -0,0 +1,125 @@
+"""
+Connection pool occupancy under mixed traffic, eager sessions vs LazySession.
+
+Runs the real app in-process against a temporary SQLite file and drives a mix of
+/auth/logout, /users/me, /users and /users/{id} through httpx, recording for each mode
+how many sessions were built, how many connections were checked out and for how long.
+
+    poetry run python -m benchmarks.bench_pool_occupancy --requests 4000 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+# keep the access log out of the printed results
+os.environ.setdefault("LOG_FILE", os.devnull)
+
+import httpx
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.database.base import Base
+from src.database.session import LazySession, get_db_session
+from src.main import app
+
+TRAFFIC_MIX = [("POST", "/auth/logout", 30), ("GET", "/users/me", 40), ("GET", "/users?limit=50", 20), ("GET", "/users/{id}", 10)]
+
+
+class PoolProbe:
+    def __init__(self, engine):
+        self.checked_out = 0
+        self.peak = 0
+        self.checkouts = 0
+        self.hold_seconds = 0.0
+        self._since: dict[int, float] = {}
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "checkin", self._checkin)
+
+    def _checkout(self, dbapi_connection, *_):
+        self.checked_out += 1
+        self.checkouts += 1
+        self.peak = max(self.peak, self.checked_out)
+        self._since[id(dbapi_connection)] = time.perf_counter()
+
+    def _checkin(self, dbapi_connection, *_):
+        self.checked_out -= 1
+        self.hold_seconds += time.perf_counter() - self._since.pop(id(dbapi_connection), time.perf_counter())
+
+
+async def run(mode: str, requests: int, concurrency: int) -> None:
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-'), 'pool.db')}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(autoflush=False, bind=engine)
+    sessions = Counter()
+
+    def eager_session():
+        sessions["created"] += 1
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def lazy_session():
+        db = LazySession(session_factory)
+        try:
+            yield db
+        finally:
+            sessions["created"] += db.is_open
+            db.close()
+
+    app.dependency_overrides[get_db_session] = eager_session if mode == "eager" else lazy_session
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        registered = await client.post("/auth/register", json={"username": "benchuser", "password": "benchpassword"})
+        user_id = registered.json()["id"]
+        for i in range(20):
+            await client.post("/auth/register", json={"username": f"bench{i}", "password": "benchpassword"})
+        client.cookies.clear()
+
+        probe = PoolProbe(engine)
+        sessions.clear()
+        rng = random.Random(3)
+        routes = rng.choices([(m, p) for m, p, _ in TRAFFIC_MIX], weights=[w for *_, w in TRAFFIC_MIX], k=requests)
+        queue = asyncio.Queue()
+        for route in routes:
+            queue.put_nowait(route)
+
+        statuses = Counter()
+
+        async def worker():
+            while not queue.empty():
+                method, path = queue.get_nowait()
+                # logout revokes the token it carries, so it goes without the shared cookie
+                cookies = {} if path == "/auth/logout" else {"token": registered.cookies["token"]}
+                response = await client.request(method, path.replace("{id}", str(user_id)), cookies=cookies)
+                statuses[response.status_code] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    app.dependency_overrides.clear()
+    engine.dispose()
+    print(
+        f"{mode:<6} sessions={sessions['created']:>6} checkouts={probe.checkouts:>6} peak_checked_out={probe.peak:>3} "
+        f"avg_hold={probe.hold_seconds / max(probe.checkouts, 1) * 1000:.3f}ms "
+        f"mean_occupancy={probe.hold_seconds / elapsed:.2f} conns req/s={requests / elapsed:,.0f} statuses={dict(statuses)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=4_000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    for mode in ["eager", "lazy"]:
+        asyncio.run(run(mode, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Per-call cost of every SQLAlchemy UserRepository method, split into time spent in the SQLite
+driver and ORM overhead (statement construction, compilation, result processing).
+
+The driver time is measured by replaying the exact SQL and parameters a method issued on a raw
+sqlite3 connection, so `orm` is everything the repository adds on top of SQLite itself.
+Another implementation can be compared with --repository module:Class.
+
+    poetry run python -m benchmarks.bench_repository_overhead --rows 100000 --iterations 2000
+"""
+import argparse
+import importlib
+import random
+import sqlite3
+from statistics import median
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import measure, seeded_engine
+
+
+def load(path: str):
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--repository", default="src.repositories.impl.user_repository_sql_alchemy:UserRepository")
+    args = parser.parse_args()
+
+    engine = seeded_engine(args.rows)
+    session = sessionmaker(autoflush=False, bind=engine)()
+    repository = load(args.repository)(db=session)
+    raw = sqlite3.connect(engine.url.database)
+    rng = random.Random(1)
+    usernames = [row[0] for row in raw.execute("SELECT username FROM user ORDER BY random() LIMIT 1000")]
+
+    held = repository.get_by_id(7)
+
+    def random_id() -> int:
+        return rng.randint(1, args.rows)
+
+    calls = {
+        "get_by_id": lambda: repository.get_by_id(random_id()),
+        # the request still holds the user, e.g. get_current_user then get_user_by_id
+        "get_by_id (loaded)": lambda: repository.get_by_id(held.id),
+        "get_by_username": lambda: repository.get_by_username(rng.choice(usernames)),
+        "user_does_exist": lambda: repository.user_does_exist(rng.choice(usernames)),
+        "get_by_ids (50)": lambda: repository.get_by_ids([random_id() for _ in range(50)]),
+        "get_users (50)": lambda: repository.get_users(rng.randint(0, 1000), 50),
+        "get_users (active, username desc)": lambda: repository.get_users(rng.randint(0, 1000), 50, is_active=True, sort_by="username", order="desc"),
+        "search_by_username_prefix": lambda: repository.search_by_username_prefix(rng.choice(usernames)[:2], 20),
+        "get_count": lambda: repository.get_count(),
+    }
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, parameters, context, executemany: statements.append((statement, parameters)))
+
+    print(f"{'method':<36} {'total':>9} {'driver':>9} {'orm':>9}")
+    for name, call in calls.items():
+        for _ in range(50):
+            call()
+        statements.clear()
+        total = median(measure(call, args.iterations))
+        issued = statements[: len(statements) // args.iterations or 0] if statements else []
+        replays = [
+            median(measure(lambda statement=statement, parameters=parameters: raw.execute(statement, parameters).fetchall(), args.iterations))
+            for statement, parameters in issued
+        ]
+        driver = sum(replays)
+        print(f"{name:<36} {total * 1000:>7.1f}us {driver * 1000:>7.1f}us {(total - driver) * 1000:>7.1f}us")
+        session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Cost of issuing and validating the auth cookie in each session mode.
+
+jwt            : HMAC-signed self-contained token (default)
+server/memory  : opaque id in the sharded in-memory store
+server/sqlite  : opaque id in the persistent SQLite store
+
+    poetry run python -m benchmarks.bench_session_modes --sessions 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src.database.models.user import User
+from src.services.cookie_service import CookieService
+from src.sessions.impl.memory_session_store import MemorySessionStore
+from src.sessions.impl.sqlite_session_store import SQLiteSessionStore
+
+
+def ops_per_second(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100_000, help="live sessions in the store while validating")
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    sqlite_path = os.path.join(tempfile.mkdtemp(prefix="bench-"), "sessions.db")
+    services = {
+        "jwt": CookieService(),
+        "server/memory": CookieService(session_store=MemorySessionStore()),
+        "server/sqlite": CookieService(session_store=SQLiteSessionStore(f"sqlite:///{sqlite_path}")),
+    }
+    users = [User(id=i, username=f"user{i}", password="") for i in range(1_000)]
+    rng = random.Random(1)
+
+    print(f"{'mode':<15} {'create ops/s':>14} {'validate ops/s':>16}")
+    for mode, service in services.items():
+        live = args.sessions if mode != "jwt" else 1_000
+        tokens = [service.create_token(users[i % len(users)]) for i in range(live)]
+        create = ops_per_second(lambda: service.create_token(rng.choice(users)), args.iterations // 4)
+        validate = ops_per_second(lambda: service.validate_token(rng.choice(tokens)), args.iterations)
+        print(f"{mode:<15} {create:>14,.0f} {validate:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
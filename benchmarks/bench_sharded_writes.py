@@ -0,0 +1,67 @@
+"""
+Registration throughput of several worker processes writing to 1 vs N SQLite shards.
+
+Each process saves users through a ShardedUserRepository (as /auth/register does, minus bcrypt)
+with its own sessions, like one uvicorn worker. With one shard every commit queues on the same
+database lock, with N shards commits of users of different shards go in parallel.
+
+    poetry run python -m benchmarks.bench_sharded_writes --workers 4 --shards 4
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.base import Base
+from src.database.models.user import User
+from src.repositories.impl.user_repository_sharded import ShardedUserRepository
+from src.repositories.impl.user_repository_sql_alchemy import UserRepository
+from benchmarks.common import SEED_PASSWORD_HASH, summary
+
+
+def register(urls: list[str], worker: int, users: int) -> list[float]:
+    engines = [create_engine(url, connect_args={"timeout": 30}) for url in urls]
+    sessions = [sessionmaker(autoflush=False, bind=engine)() for engine in engines]
+    repository = ShardedUserRepository([UserRepository(db=session) for session in sessions])
+    latencies = []
+    for i in range(users):
+        start = time.perf_counter()
+        repository.save(User(username=f"w{worker}-{i}", password=SEED_PASSWORD_HASH))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run(shards: int, workers: int, users: int) -> None:
+    directory = tempfile.mkdtemp(prefix="bench-shards-")
+    urls = [f"sqlite:///{os.path.join(directory, f'users-{i}.db')}" for i in range(shards)]
+    for url in urls:
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        results = pool.starmap(register, [(urls, worker, users) for worker in range(workers)])
+    elapsed = time.perf_counter() - start
+    latencies = [latency for result in results for latency in result]
+    print(f"shards={shards:<3} {len(latencies) / elapsed:>8,.0f} registrations/s  {summary(latencies)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--users", type=int, default=500, help="registrations per worker")
+    args = parser.parse_args()
+
+    print(f"{args.workers} worker processes, {args.users} registrations each")
+    for shards in sorted({1, args.shards}):
+        run(shards, args.workers, args.users)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Username prefix search over a large user table.
+
+Compares UserRepository.search_by_username_prefix (range scan on ix_user_username)
+against a LIKE '%x%' full scan, and fails if the indexed search p99 is not sub-millisecond.
+
+    poetry run python -m benchmarks.bench_username_search --rows 1000000
+"""
+import argparse
+import random
+import sys
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from benchmarks.common import seeded_engine, measure, summary, random_username
+from src.database.models.user import User
+from src.repositories.impl.user_repository_sql_alchemy import UserRepository
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--db", help="SQLite file to (re)use, a temporary one by default")
+    args = parser.parse_args()
+
+    print(f"seeding {args.rows} users...")
+    engine = seeded_engine(args.rows, args.db)
+    rng = random.Random(7)
+    prefixes = [random_username(rng)[: rng.randint(1, 4)] for _ in range(args.iterations)]
+    cursors = iter(prefixes * 2)
+
+    with Session(engine) as db:
+        repository = UserRepository(db=db)
+        # warm the page cache and the statement cache before timing
+        for prefix in prefixes[:100]:
+            repository.search_by_username_prefix(prefix, args.limit)
+
+        def first_page():
+            repository.search_by_username_prefix(next(cursors), args.limit)
+            db.expunge_all()
+
+        indexed = measure(first_page, args.iterations)
+
+        def next_page():
+            prefix = next(cursors)
+            page = repository.search_by_username_prefix(prefix, args.limit)
+            if page:
+                repository.search_by_username_prefix(prefix, args.limit, after=page[-1].username)
+            db.expunge_all()
+
+        paged = measure(next_page, args.iterations // 2)
+
+        def like_scan():
+            db.execute(select(User).where(User.username.like(f"%{next(cursors)}%")).limit(args.limit)).all()
+
+        like = measure(like_scan, 20)
+
+    print(f"prefix search, first page : {summary(indexed)}")
+    print(f"prefix search, two pages  : {summary(paged)}")
+    print(f"LIKE '%x%' scan (baseline): {summary(like)}")
+
+    p99 = sorted(indexed)[int(len(indexed) * 0.99) - 1]
+    if p99 >= 1.0:
+        print(f"FAIL: indexed prefix search p99 {p99:.3f}ms is not sub-millisecond")
+        return 1
+    print("OK: indexed prefix search stays sub-millisecond")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Benchmarks are plain scripts, run from the project root:
+    poetry run python -m benchmarks.bench_username_search --rows 1000000
+"""
+import os
+import random
+import string
+import tempfile
+import time
+from statistics import quantiles
+from typing import Callable
+
+from sqlalchemy import create_engine, insert, Engine
+
+from src.database.base import Base
+from src.database.models.user import User
+
+# bcrypt hash of "password" (cost 4), seeded users are never meant to be secure
+SEED_PASSWORD_HASH = "$2b$04$bSnCSSsNgQSyQFnAnAoP8OBL0xMaj3TjM0HrqDECJB4fwITwYC4s2"
+
+
+def random_username(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase + string.digits, k=rng.randint(6, 20)))
+
+
+def seeded_engine(rows: int, path: str | None = None, seed: int = 42) -> Engine:
+    """Creates a SQLite database with the real schema and `rows` users with unique random usernames."""
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+
+    rng = random.Random(seed)
+    seen: set[str] = set()
+    batch_size = 50_000
+    with engine.begin() as connection:
+        connection.exec_driver_sql("PRAGMA journal_mode = OFF")
+        connection.exec_driver_sql("PRAGMA synchronous = OFF")
+        while len(seen) < rows:
+            batch = []
+            while len(batch) < batch_size and len(seen) < rows:
+                username = random_username(rng)
+                if username not in seen:
+                    seen.add(username)
+                    batch.append({"username": username, "password": SEED_PASSWORD_HASH, "is_active": True})
+            connection.execute(insert(User), batch)
+    return engine
+
+
+def measure(func: Callable[[], object], iterations: int) -> list[float]:
+    """Wall time of each call, in milliseconds."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summary(timings: list[float]) -> str:
+    cuts = quantiles(timings, n=100)
+    return f"p50={cuts[49]:.3f}ms p95={cuts[94]:.3f}ms p99={cuts[98]:.3f}ms max={max(timings):.3f}ms"
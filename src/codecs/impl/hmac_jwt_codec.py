@@ -0,0 +1,75 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from jose import JWTError, ExpiredSignatureError
+from src.codecs.jwt_codec import JWTCodec
+
+_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class HMACJWTCodec(JWTCodec):
+    """
+    Standard library fast path for HS256/HS384/HS512.
+
+    The header segment and the keyed HMAC state are computed once; signing copies the
+    prepared HMAC instead of re-deriving the key pads, and a token whose header is the
+    exact one we issue skips header parsing. Tokens stay interoperable with jose/PyJWT.
+    """
+
+    name = "hmac"
+
+    def __init__(self, secret_key: str, algorithm: str):
+        super().__init__(secret_key, algorithm)
+        if algorithm not in _DIGESTS:
+            raise ValueError(f"{self.name} codec only supports {', '.join(_DIGESTS)}, got {algorithm}")
+        self._mac = hmac.new(secret_key.encode("utf-8"), digestmod=_DIGESTS[algorithm])
+        self._header = _b64encode(json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":")).encode())
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(self, claims: dict) -> str:
+        signing_input = self._header + b"." + _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return (signing_input + b"." + _b64encode(self._sign(signing_input))).decode("ascii")
+
+    def decode(self, token: str) -> dict:
+        try:
+            raw = token.encode("ascii")
+            signing_input, signature = raw.rsplit(b".", 1)
+            header, payload = signing_input.split(b".", 1)
+            if header != self._header and json.loads(_b64decode(header)).get("alg") != self.algorithm:
+                raise JWTError("The specified alg value is not allowed")
+            if not hmac.compare_digest(self._sign(signing_input), _b64decode(signature)):
+                raise JWTError("Signature verification failed.")
+            claims = json.loads(_b64decode(payload))
+        except JWTError:
+            raise
+        except (ValueError, TypeError, AttributeError, binascii.Error) as e:
+            raise JWTError(f"Invalid token: {e}")
+        if not isinstance(claims, dict):
+            raise JWTError("Invalid payload")
+        self._validate_times(claims)
+        return claims
+
+    def _validate_times(self, claims: dict) -> None:
+        now = time.time()
+        for claim in ("exp", "nbf", "iat"):
+            if claim in claims and not isinstance(claims[claim], (int, float)):
+                raise JWTError(f"Invalid {claim} claim")
+        if "exp" in claims and now >= claims["exp"]:
+            raise ExpiredSignatureError("Signature has expired.")
+        if "nbf" in claims and now < claims["nbf"]:
+            raise JWTError("The token is not yet valid (nbf)")
@@ -0,0 +1,19 @@
+from jose import jwt, jwk
+from src.codecs.jwt_codec import JWTCodec
+
+class JoseJWTCodec(JWTCodec):
+    """python-jose backend, supports every algorithm jose does."""
+
+    name = "jose"
+
+    def __init__(self, secret_key: str, algorithm: str):
+        super().__init__(secret_key, algorithm)
+        # jose rebuilds the key object on every call when given the raw secret
+        self._key = jwk.construct(secret_key, algorithm)
+        self._algorithms = [algorithm]
+
+    def encode(self, claims: dict) -> str:
+        return jwt.encode(claims, self._key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        return jwt.decode(token, self._key, algorithms=self._algorithms)
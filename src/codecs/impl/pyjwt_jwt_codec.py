@@ -0,0 +1,25 @@
+import jwt as pyjwt
+from jose import JWTError, ExpiredSignatureError
+from src.codecs.jwt_codec import JWTCodec
+
+class PyJWTCodec(JWTCodec):
+    """PyJWT backend, only available when the optional `pyjwt` package is installed."""
+
+    name = "pyjwt"
+
+    def __init__(self, secret_key: str, algorithm: str):
+        super().__init__(secret_key, algorithm)
+        self._algorithms = [algorithm]
+        # PyJWT normalizes the key on every call unless it already gets the prepared one
+        self._key = pyjwt.get_algorithm_by_name(algorithm).prepare_key(secret_key)
+
+    def encode(self, claims: dict) -> str:
+        return pyjwt.encode(claims, self._key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return pyjwt.decode(token, self._key, algorithms=self._algorithms)
+        except pyjwt.ExpiredSignatureError as e:
+            raise ExpiredSignatureError(str(e))
+        except pyjwt.InvalidTokenError as e:
+            raise JWTError(str(e))
@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+
+class JWTCodec(ABC):
+    """
+    Signs and verifies compact JWTs for one algorithm and key.
+
+    Implementations receive JSON-ready claims (`exp` as an int, `iat` as a float with microseconds,
+    which RFC 7519 NumericDates allow; decode returns them as they were signed) and
+    must raise `jose.JWTError` on any invalid token and `jose.ExpiredSignatureError` on an
+    expired one, so callers do not depend on the backend.
+    Keys are prepared once in `__init__`, codecs are meant to live for the whole process.
+    """
+
+    name: str
+
+    def __init__(self, secret_key: str, algorithm: str):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+
+    @abstractmethod
+    def encode(self, claims: dict) -> str:
+        pass
+
+    @abstractmethod
+    def decode(self, token: str) -> dict:
+        pass
@@ -0,0 +1,145 @@
+import itertools
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Literal
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+# frames of the profiler itself and of imports say nothing about where the app allocates
+_IGNORED_FRAMES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+@dataclass
+class RouteAllocations:
+    """
+    Memory a route template's requests left allocated: traced bytes and Python memory blocks
+    still in use when each request ended, minus those in use when it started, summed.
+    Requests running at the same time are counted in each other's numbers.
+    """
+    route: str
+    requests: int = 0
+    allocated_bytes: int = 0
+    allocations: int = 0
+    max_allocated_bytes: int = 0
+
+
+@dataclass(frozen=True)
+class AllocationSite:
+    location: list[str]
+    size_bytes: int
+    count: int
+    size_diff_bytes: int = 0
+    count_diff: int = 0
+
+
+@dataclass(frozen=True)
+class TakenSnapshot:
+    id: int
+    taken_at: float
+    traced_bytes: int
+    snapshot: tracemalloc.Snapshot
+
+
+class AllocationProfiler:
+    """
+    Opt-in tracemalloc instrumentation of this worker (ALLOCATION_PROFILING): allocations per route
+    template, recorded by AllocationProfilingMiddleware, top allocation sites and snapshots kept to
+    be diffed later, served under /admin/profiling. Nothing is traced until start() is called.
+    """
+
+    def __init__(self, frames: int = 10, max_snapshots: int = 5):
+        self.frames = frames
+        self.max_snapshots = max_snapshots
+        self._lock = threading.Lock()
+        self._routes: dict[str, RouteAllocations] = {}
+        self._snapshots: OrderedDict[int, TakenSnapshot] = OrderedDict()
+        self._snapshot_ids = itertools.count(1)
+
+    @property
+    def enabled(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def stop(self) -> None:
+        """Stops tracing and frees the traces, the snapshots and the per-route numbers."""
+        tracemalloc.stop()
+        with self._lock:
+            self._routes.clear()
+            self._snapshots.clear()
+
+    @staticmethod
+    def mark() -> tuple[int, int]:
+        """What a request starts from, handed back to record() when it ends."""
+        return tracemalloc.get_traced_memory()[0], sys.getallocatedblocks()
+
+    def record(self, route: str, mark: tuple[int, int]) -> None:
+        allocated_bytes = tracemalloc.get_traced_memory()[0] - mark[0]
+        allocations = sys.getallocatedblocks() - mark[1]
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteAllocations(route)
+            stats.requests += 1
+            stats.allocated_bytes += allocated_bytes
+            stats.allocations += allocations
+            stats.max_allocated_bytes = max(stats.max_allocated_bytes, allocated_bytes)
+
+    def routes(self) -> list[RouteAllocations]:
+        """Per-route numbers, the routes leaving most memory allocated first."""
+        with self._lock:
+            return sorted((RouteAllocations(**vars(stats)) for stats in self._routes.values()), key=lambda stats: -stats.allocated_bytes)
+
+    def reset_routes(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def top(self, limit: int = 20, group_by: GroupBy = "lineno") -> list[AllocationSite]:
+        """Sites holding the most traced memory right now."""
+        statistics = self._take().statistics(group_by)[:limit]
+        return [AllocationSite(self._location(stat.traceback), stat.size, stat.count) for stat in statistics]
+
+    def take_snapshot(self) -> TakenSnapshot:
+        """Keeps a snapshot to diff later, the oldest is dropped past max_snapshots."""
+        taken = TakenSnapshot(next(self._snapshot_ids), time.time(), tracemalloc.get_traced_memory()[0], self._take())
+        with self._lock:
+            self._snapshots[taken.id] = taken
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return taken
+
+    def snapshots(self) -> list[TakenSnapshot]:
+        with self._lock:
+            return list(self._snapshots.values())
+
+    def get_snapshot(self, id: int) -> TakenSnapshot | None:
+        with self._lock:
+            return self._snapshots.get(id)
+
+    def diff(self, snapshot: TakenSnapshot, base: TakenSnapshot, limit: int = 20, group_by: GroupBy = "lineno") -> list[AllocationSite]:
+        """Sites whose memory grew the most from `base` to `snapshot`."""
+        statistics = snapshot.snapshot.compare_to(base.snapshot, group_by)[:limit]
+        return [
+            AllocationSite(self._location(stat.traceback), stat.size, stat.count, stat.size_diff, stat.count_diff)
+            for stat in statistics
+        ]
+
+    @staticmethod
+    def _take() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED_FRAMES)
+
+    @staticmethod
+    def _location(traceback: tracemalloc.Traceback) -> list[str]:
+        # most recent call first
+        return [f"{frame.filename}:{frame.lineno}" for frame in reversed(traceback)]
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    id: int
+    type: str
+    data: dict = field(default_factory=dict)
+
+
+class Subscription:
+    """
+    Bounded buffer of one subscriber. The hub fills it from any thread and the subscriber
+    drains it on its event loop with `get`.
+    """
+
+    def __init__(self, max_buffer: int):
+        self.max_buffer = max_buffer
+        self.closed = False
+        self.evicted = False
+        self._events: deque[ChangeEvent] = deque()
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+
+    async def get(self, timeout: float) -> ChangeEvent | None:
+        """Next event, or None once closed and drained or after `timeout` seconds without events."""
+        while not self._events:
+            if self.closed:
+                return None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._events.popleft()
+
+    def _push(self, event: ChangeEvent) -> bool:
+        if len(self._events) >= self.max_buffer:
+            return False
+        self._events.append(event)
+        return self._wake()
+
+    def _close(self, evicted: bool = False) -> None:
+        self.closed = True
+        self.evicted = evicted
+        self._wake()
+
+    def _wake(self) -> bool:
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+            return True
+        except RuntimeError:
+            # the subscriber's loop is gone
+            return False
+
+
+class ChangeHub:
+    """
+    In-process broadcast of change events to every subscriber.
+
+    Events get increasing ids and the last `history_size` ones are kept in a ring buffer, so a
+    subscriber can resume after the id of the last event it saw. When that id is no longer in
+    the ring (or comes from before a restart) it gets a single "reset" event instead, meaning
+    it must resync from scratch and then follow from the reset's id.
+    A subscriber whose buffer is full is evicted rather than slowing down publishers.
+    """
+
+    def __init__(self, history_size: int = 1024, subscriber_buffer: int = 256):
+        self.subscriber_buffer = subscriber_buffer
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._history: deque[ChangeEvent] = deque(maxlen=history_size)
+        self._subscribers: set[Subscription] = set()
+        self._closed = False
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, type: str, data: dict | None = None) -> ChangeEvent:
+        with self._lock:
+            self._last_id += 1
+            event = ChangeEvent(self._last_id, type, data or {})
+            self._history.append(event)
+            slow = [subscription for subscription in self._subscribers if not subscription._push(event)]
+            for subscription in slow:
+                self._subscribers.discard(subscription)
+                subscription._close(evicted=True)
+        return event
+
+    def subscribe(self, after: int | None = None) -> Subscription:
+        """Must be called from the subscriber's event loop."""
+        subscription = Subscription(self.subscriber_buffer)
+        with self._lock:
+            if after is not None and after != self._last_id:
+                oldest = self._history[0].id if self._history else self._last_id + 1
+                if oldest - 1 <= after < self._last_id:
+                    subscription._events.extend(event for event in self._history if event.id > after)
+                else:
+                    subscription._events.append(ChangeEvent(self._last_id, "reset"))
+            if self._closed:
+                subscription._close()
+            else:
+                self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def close(self) -> None:
+        """Ends every subscription, e.g. on shutdown, later subscribers only get the backlog."""
+        with self._lock:
+            self._closed = True
+            for subscription in self._subscribers:
+                subscription._close()
+            self._subscribers.clear()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
@@ -0,0 +1,87 @@
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml")
+
+
+class Encoder(ABC):
+    """Incremental compressor: `compress` returns what can be sent now, `finish` ends the stream."""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def finish(self, data: bytes = b"") -> bytes:
+        pass
+
+
+class GzipEncoder(Encoder):
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        # sync flush so every chunk of a stream reaches the client right away
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder(Encoder):
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+def available_encodings(gzip_level: int, brotli_quality: int) -> dict[str, Callable[[], Encoder]]:
+    """Encoder factories by content-coding, in server preference order. "br" needs `brotli` installed."""
+    encodings = {}
+    if brotli is not None:
+        encodings["br"] = lambda: BrotliEncoder(brotli_quality)
+    encodings["gzip"] = lambda: GzipEncoder(gzip_level)
+    return encodings
+
+
+def negotiate(accept_encoding: str, supported: list[str]) -> str | None:
+    """
+    Best of `supported` for an Accept-Encoding header (RFC 9110): highest q-value first, then the
+    server's order. "*" covers codings not listed, q=0 refuses one. None means identity.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";", 1)[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith("+json")
@@ -0,0 +1,54 @@
+import time
+from typing import Callable
+
+
+class AdaptiveLimit:
+    """
+    Concurrency limit of a group of routes, adjusted by AIMD on the latency of completed requests.
+
+    While requests finish within `target_latency` and at least half of the limit is in use, the
+    limit grows by 1/limit per request, about one more slot per `limit` requests. A request slower
+    than the target, or answered 503/504, multiplies it by `backoff`, at most once per
+    `target_latency`: the requests completing right after it saw the same overload. The limit stays
+    between `minimum` and `maximum`. Used from the event loop only, so it takes no lock.
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        minimum: float,
+        maximum: float,
+        target_latency: float,
+        backoff: float = 0.8,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("Concurrency limits must satisfy 1 <= minimum <= initial <= maximum")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.clock = clock
+        self.in_flight = 0
+        self._last_decrease = float("-inf")
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: float, overloaded: bool = False) -> None:
+        """Frees the slot of a request that took `latency` seconds, `overloaded` when it failed for lack of capacity."""
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        if overloaded or latency > self.target_latency:
+            now = self.clock()
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+                self._last_decrease = now
+        elif in_flight * 2 >= self.limit:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Literal
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding='utf-8', extra="ignore")
@@ -6,8 +7,81 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Tokens this close to exp are re-issued by the auth middleware (sliding sessions), server-side
+    # sessions are extended once per window instead. 0 disables it
+    TOKEN_REFRESH_WINDOW_MINUTES: int = 5
     COOKIE_SECURE: bool = False
+    # Time budget of a request, enforced in SQLite queries and before bcrypt. 0 disables it, see @deadline
+    REQUEST_DEADLINE_SECONDS: float = 10
     DEFAULT_PUBLIC_PATHS: set = {"/", "/docs", "/openapi.json"}
+    # Adaptive (AIMD on latency) per-worker concurrency limits by route group, see @concurrency_limit.
+    # "auth": the bcrypt endpoints, "default": every other route. Requests over the limit get a 503.
+    # Off by default: the target latencies must fit the deployment (bcrypt cost, CPUs) or good requests are shed
+    CONCURRENCY_LIMIT_ENABLED: bool = False
+    CONCURRENCY_LIMITS: dict[str, dict[str, float]] = {
+        "auth": {"initial": 4, "minimum": 1, "maximum": 64, "target_latency": 1.0},
+        "default": {"initial": 32, "minimum": 4, "maximum": 512, "target_latency": 0.25},
+    }
+    CONCURRENCY_RETRY_AFTER_SECONDS: int = 1
+    # Usernames allowed on the /admin endpoints
+    ADMIN_USERNAMES: set[str] = set()
+    # tracemalloc allocations per route and allocation sites at /admin/profiling, costly: off unless debugging.
+    # Frames kept per allocation traceback, snapshots kept for diffing
+    ALLOCATION_PROFILING: bool = False
+    ALLOCATION_PROFILING_FRAMES: int = 10
+    ALLOCATION_PROFILING_MAX_SNAPSHOTS: int = 5
+    # Requests recorded for python -m src.replay, to CAPTURE_FILE.<pid>. Off when unset
+    CAPTURE_FILE: str | None = None
+    CAPTURE_MAX_SESSIONS: int = 100_000
+    # python -m src.serve: worker processes, 0 for one per CPU of the container's quota. Workers keep
+    # revocations, jobs, idempotency keys and the change feed to themselves, see src.serve.multi_worker_problems
+    WEB_CONCURRENCY: int = 1
+    # Open DB connections, run bcrypt and a JWT decode and fill caches before serving, see src.core.warmup
+    WARMUP_ON_STARTUP: bool = True
     SQLALCHEMY_DATABASE_URL: str = "sqlite:///./app.db"
+    # "memory": process-local users for tests and benchmarks, lost on restart.
+    # "sharded": users spread by username hash over the SQLite databases of USER_SHARD_URLS
+    USER_REPOSITORY: Literal["sqlalchemy", "memory", "sharded"] = "sqlalchemy"
+    USER_SHARD_URLS: list[str] = []
+    MAX_BATCH_SIZE: int = 100
+    # DELETE /users job: ids per short delete transaction, pause between them for waiting writers.
+    # The pause must outlast SQLite's busy-handler sleeps (up to 50ms at first) or writers starve
+    DELETE_ALL_CHUNK_SIZE: int = 1000
+    DELETE_ALL_PAUSE_SECONDS: float = 0.05
+    JOBS_MAX_KEPT: int = 100
+    # "jwt": self-contained signed cookie. "server": opaque session id resolved in SESSION_STORE
+    SESSION_MODE: Literal["jwt", "server"] = "jwt"
+    SESSION_STORE: Literal["memory", "sqlite"] = "memory"
+    SESSION_SHARDS: int = 16
+    SESSION_SQLITE_URL: str = "sqlite:///./sessions.db"
+    # "auto": stdlib HMAC fast path for HS* algorithms, python-jose otherwise
+    JWT_BACKEND: Literal["auto", "jose", "hmac", "pyjwt"] = "auto"
+    # Embed the UserDTO in the JWT so /users/me can answer without the database
+    TOKEN_EMBED_USER_CLAIMS: bool = False
+    # Let repeated valid logins skip bcrypt for LOGIN_CACHE_TTL_SECONDS, see VerifiedCredentials
+    LOGIN_CACHE_ENABLED: bool = False
+    LOGIN_CACHE_TTL_SECONDS: float = 60
+    LOGIN_CACHE_MAX_ENTRIES: int = 10_000
+    REVOCATION_MAX_ENTRIES: int = 100_000
+    REVOCATION_JOURNAL_PATH: str | None = None
+    # Responses replayed to retries carrying the same Idempotency-Key
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_MAX_ENTRIES: int = 10_000
+    # /users/changes: events kept for resuming, per-subscriber buffer before eviction, keep-alive period
+    CHANGE_FEED_HISTORY_SIZE: int = 1024
+    CHANGE_FEED_SUBSCRIBER_BUFFER: int = 256
+    CHANGE_FEED_HEARTBEAT_SECONDS: float = 15
+    # JSON lines written by a background thread, to LOG_FILE or stdout when unset
+    LOG_LEVEL: str = "INFO"
+    LOG_FILE: str | None = None
+    LOG_QUEUE_SIZE: int = 10_000
+    LOG_BATCH_SIZE: int = 100
+    LOG_FLUSH_INTERVAL_SECONDS: float = 0.5
+    # Fraction of successful (< 400) requests written to the access log, errors are always written
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    # Responses smaller than this are not compressed. gzip level 1-9, brotli quality 0-11 (if installed)
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
 
 settings = Settings()
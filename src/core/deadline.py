@@ -0,0 +1,38 @@
+import time
+from contextvars import ContextVar, Token
+
+# monotonic time by which the current request must be done, None when unbounded
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The current request ran out of time, answered with 504 by the exception handlers."""
+
+    def __init__(self, message: str = "Request deadline exceeded"):
+        super().__init__(message)
+        self.message = message
+
+
+def set_deadline(seconds: float | None) -> Token:
+    """Bounds the current context (and the threads it is copied into) to `seconds` from now."""
+    return _deadline.set(time.monotonic() + seconds if seconds else None)
+
+
+def reset_deadline(token: Token) -> None:
+    _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the deadline, None without one. Negative once exceeded."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    deadline = _deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def check_deadline() -> None:
+    if expired():
+        raise DeadlineExceeded()
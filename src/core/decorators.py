@@ -4,3 +4,21 @@ def public(func: Callable) -> Callable:
     setattr(func, "_is_public", True)
     return func
 
+def idempotent(func: Callable) -> Callable:
+    """POST endpoints honouring the Idempotency-Key header, see IdempotencyMiddleware."""
+    setattr(func, "_is_idempotent", True)
+    return func
+
+def deadline(seconds: float | None) -> Callable[[Callable], Callable]:
+    """Overrides REQUEST_DEADLINE_SECONDS for an endpoint, None for no deadline (e.g. streams)."""
+    def decorator(func: Callable) -> Callable:
+        setattr(func, "_deadline_seconds", seconds)
+        return func
+    return decorator
+
+def concurrency_limit(group: str | None) -> Callable[[Callable], Callable]:
+    """Adaptive concurrency limit group of an endpoint (CONCURRENCY_LIMITS), None to never shed it."""
+    def decorator(func: Callable) -> Callable:
+        setattr(func, "_concurrency_group", group)
+        return func
+    return decorator
@@ -0,0 +1,32 @@
+import threading
+import time
+
+
+class Readiness:
+    """
+    Lifecycle of this worker as seen by the load balancer: "starting" until the warmup is done,
+    "ready" while it serves, "draining" once shutdown begins so traffic moves to other workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "starting"
+        self.started_at = time.time()
+        self.ready_at: float | None = None
+        # seconds each warmup step took, see src.core.warmup
+        self.warmup: dict[str, float] = {}
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+
+    def mark_ready(self, warmup: dict[str, float] | None = None) -> None:
+        with self._lock:
+            if self.state == "starting":
+                self.state = "ready"
+                self.ready_at = time.time()
+                self.warmup = warmup or {}
+
+    def mark_draining(self) -> None:
+        with self._lock:
+            self.state = "draining"
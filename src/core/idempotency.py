@@ -0,0 +1,58 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from src.core.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    # hash of the request body the response was produced for
+    fingerprint: str
+
+
+class IdempotencyStore:
+    """
+    Responses of requests sent with an Idempotency-Key, kept for `ttl_seconds`.
+
+    The first request with a key runs, later ones with the same key get its stored response.
+    Requests arriving while the first one is still running wait for it instead of running too.
+    5xx responses and failures are not stored, so the next retry runs again.
+    Entries are per process: with several workers a retry landing elsewhere runs once more there.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._responses: TTLCache[str, StoredResponse] = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, call: Callable[[], Awaitable[StoredResponse]]) -> tuple[StoredResponse, bool]:
+        """Returns the response for key and whether it is a replay of an earlier request."""
+        while True:
+            stored = self._responses.get(key)
+            if stored is not None:
+                return stored, True
+            pending = self._in_flight.get(key)
+            if pending is None:
+                break
+            # shielded so a client disconnecting here does not cancel the original request
+            response = await asyncio.shield(pending)
+            if response is not None:
+                return response, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        response = None
+        try:
+            response = await call()
+            if response.status_code < 500:
+                self._responses.set(key, response)
+            return response, False
+        finally:
+            del self._in_flight[key]
+            # on failure waiters get None and the first of them runs the request itself
+            future.set_result(response)
+
+    def clear(self) -> None:
+        self._responses.clear()
@@ -0,0 +1,40 @@
+import threading
+from collections import Counter
+
+
+class Metrics:
+    """
+    Process-wide counters and gauges, labelled with keyword arguments and rendered in the Prometheus text format.
+    Counts are per worker process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Counter[tuple[str, tuple[tuple[str, str], ...]]] = Counter()
+
+    def increment(self, name: str, amount: int = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += amount
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """For gauges: replaces the value instead of adding to it."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = value
+
+    def get(self, name: str, **labels: str) -> int:
+        return self._counters[(name, tuple(sorted(labels.items())))]
+
+    def render(self) -> str:
+        with self._lock:
+            counters = sorted(self._counters.items())
+        lines = []
+        for (name, labels), value in counters:
+            label_text = ",".join(f'{label}="{label_value}"' for label, label_value in labels)
+            lines.append(f"{name}{{{label_text}}} {value}" if labels else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
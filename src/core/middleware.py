@@ -1,14 +1,38 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+import uuid
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.core.deadline import set_deadline, reset_deadline
+from src.core.concurrency_limit import AdaptiveLimit
+from src.core.allocation_profiler import AllocationProfiler
+from src.core.traffic_capture import CapturedRequest, TrafficRecorder, body_shape
+from src.core.metrics import Metrics
+from src.core.structured_logging import request_id
+from src.core.config import settings
+from src.core.idempotency import IdempotencyStore, StoredResponse
+from src.core.compression import Encoder, available_encodings, negotiate, is_compressible
 from src.services.cookie_service import CookieService
+from src.dependencies.metrics_di import get_metrics
 from fastapi.responses import JSONResponse
 from src.schemas.error import ErrorDTO
 from fastapi import Request
 from jose import JWTError
 
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("src.access")
+
 class JWTCookieAuthMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, public_paths: set, dispatch = None):
+    def __init__(self, app, public_paths: set, dispatch = None, cookie_service: CookieService | None = None):
         super().__init__(app, dispatch)
-        self.cookie_service = CookieService()
+        # JWT or server-side session mode is decided by the CookieService (settings.SESSION_MODE)
+        self.cookie_service = cookie_service or CookieService()
         self.public_paths = public_paths
     
     async def dispatch(self, request: Request, call_next: callable):
@@ -17,8 +41,15 @@ class JWTCookieAuthMiddleware(BaseHTTPMiddleware):
         
         try:
             token = self.cookie_service.get_token(request)
-            self.cookie_service.validate_token(token)
-            return await call_next(request)
+            payload = self.cookie_service.validate_token(token)
+            # validated once, the endpoints read the claims from here
+            request.state.token_claims = payload
+            refreshed_token = self.cookie_service.refresh_token(payload, token)
+            response = await call_next(request)
+            # Sliding session, unless the endpoint itself set or cleared the cookie
+            if refreshed_token and not any(value.startswith(f"{self.cookie_service.key}=") for value in response.headers.getlist("set-cookie")):
+                self.cookie_service.set_token_cookie(response, refreshed_token)
+            return response
         except JWTError:
             return JSONResponse(
                 status_code=401,
@@ -29,7 +60,7 @@ class JWTCookieAuthMiddleware(BaseHTTPMiddleware):
                     ).model_dump()
             )
         except Exception as e:
-            print("Exception middleware: ", e, "type: ", type(e))
+            logger.exception("Unhandled error while authenticating the request", extra={"fields": {"path": request.url.path}})
             return JSONResponse(
                 status_code=500,
                 content=ErrorDTO(
@@ -38,4 +69,366 @@ class JWTCookieAuthMiddleware(BaseHTTPMiddleware):
                     detail=[]
                 ).model_dump()
         )
-    
+
+
+class IdempotencyMiddleware:
+    """
+    Replays the stored response of POST requests to `paths` that repeat an Idempotency-Key,
+    without running the endpoint again (no password hashing, no database work).
+    Reusing a key with a different body is rejected with 422.
+    """
+
+    header = b"idempotency-key"
+
+    def __init__(self, app: ASGIApp, paths: set, store: IdempotencyStore | None = None):
+        self.app = app
+        self.paths = paths
+        self.store = store or IdempotencyStore(max_entries=settings.IDEMPOTENCY_MAX_ENTRIES, ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+        key = dict(scope["headers"]).get(self.header)
+        if key is None:
+            return await self.app(scope, receive, send)
+        if not 0 < len(key) <= 255:
+            return await self._error(400, "Idempotency-Key must be between 1 and 255 characters")(scope, receive, send)
+
+        body = await self._read_body(receive)
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        async def call() -> StoredResponse:
+            return await self._call_app(scope, body, fingerprint)
+
+        response, replayed = await self.store.run(f"{scope['path']}:{key.decode('latin-1')}", call)
+        if replayed and response.fingerprint != fingerprint:
+            return await self._error(422, "Idempotency-Key was already used with a different request body")(scope, receive, send)
+        headers = response.headers + [(b"idempotent-replayed", b"true")] if replayed else response.headers
+        await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": response.body})
+
+    async def _call_app(self, scope: Scope, body: bytes, fingerprint: str) -> StoredResponse:
+        start: Message = {}
+        chunks: list[bytes] = []
+        body_sent = False
+
+        async def receive() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return {"type": "http.disconnect"}
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return StoredResponse(status_code=start["status"], headers=list(start.get("headers", [])), body=b"".join(chunks), fingerprint=fingerprint)
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    def _error(status_code: int, message: str) -> JSONResponse:
+        return JSONResponse(status_code=status_code, content=ErrorDTO(status_code=status_code, message=message, detail=[]).model_dump())
+
+
+class DeadlineMiddleware:
+    """
+    Sets the deadline of each request in a contextvar (src.core.deadline), copied into the threads
+    running its sync dependencies and endpoints. `routes` are tried in order like the router does,
+    so endpoints decorated with @deadline get their own budget.
+    """
+
+    def __init__(self, app: ASGIApp, default_seconds: float | None, routes: list[tuple[BaseRoute, float | None]] | None = None):
+        self.app = app
+        self.default_seconds = default_seconds
+        self.routes = routes or []
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = set_deadline(self._seconds_for(scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_deadline(token)
+
+    def _seconds_for(self, scope: Scope) -> float | None:
+        for route, seconds in self.routes:
+            if route.matches(scope)[0] == Match.FULL:
+                return seconds
+        return self.default_seconds
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Sheds load before it queues: each request takes a slot of its route's group (@concurrency_limit,
+    `default_group` otherwise) and, when the group's adaptive limit is reached, is answered 503 with
+    Retry-After at once instead of waiting for a thread, the database or bcrypt until its deadline.
+    Limits, requests in flight and rejections are exported on /metrics, labelled by group.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: dict[str, AdaptiveLimit] | None = None,
+        routes: list[tuple[BaseRoute, str | None]] | None = None,
+        default_group: str = "default",
+        retry_after_seconds: int = 1,
+        metrics: Metrics | None = None,
+    ):
+        self.app = app
+        self.limits = limits if limits is not None else {group: AdaptiveLimit(**config) for group, config in settings.CONCURRENCY_LIMITS.items()}
+        self.routes = routes or []
+        self.default_group = default_group
+        self.retry_after_seconds = retry_after_seconds
+        self.metrics = metrics or get_metrics()
+        for group, limit in self.limits.items():
+            self._export(group, limit)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        group = self._group_for(scope)
+        limit = self.limits.get(group) if group is not None else None
+        if limit is None:
+            return await self.app(scope, receive, send)
+        if not limit.try_acquire():
+            self.metrics.increment("concurrency_rejected_total", group=group)
+            return await self._rejection()(scope, receive, send)
+
+        self._export(group, limit)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            limit.release(time.perf_counter() - start, overloaded=status_code in (503, 504))
+            self._export(group, limit)
+
+    def _group_for(self, scope: Scope) -> str | None:
+        for route, group in self.routes:
+            if route.matches(scope)[0] == Match.FULL:
+                return group
+        return self.default_group
+
+    def _export(self, group: str, limit: AdaptiveLimit) -> None:
+        self.metrics.set("concurrency_limit", round(limit.limit, 2), group=group)
+        self.metrics.set("concurrency_in_flight", limit.in_flight, group=group)
+
+    def _rejection(self) -> JSONResponse:
+        return JSONResponse(
+            status_code=503,
+            content=ErrorDTO(status_code=503, message="Server overloaded, retry later", detail=[]).model_dump(),
+            headers={"Retry-After": str(self.retry_after_seconds)},
+        )
+
+
+class AllocationProfilingMiddleware:
+    """
+    Records what each request leaves allocated under its route template (see AllocationProfiler).
+    Only added by set_up when ALLOCATION_PROFILING is on, so it costs nothing otherwise.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: AllocationProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.profiler.enabled:
+            return await self.app(scope, receive, send)
+        mark = self.profiler.mark()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # set by the router once it matched, the same scope dict is passed down
+            route = scope.get("route")
+            self.profiler.record(getattr(route, "path", "<unmatched>"), mark)
+
+
+class TrafficCaptureMiddleware:
+    """
+    Records every routed request for replay (see TrafficRecorder and src.replay): route template,
+    path and query parameters, the shape of its JSON body, status, duration and session pseudonym.
+    Only added by set_up when CAPTURE_FILE is set. Event streams are not recorded.
+    """
+
+    max_body_size = 64 * 1024
+
+    def __init__(self, app: ASGIApp, recorder: TrafficRecorder, cookie_name: str = "token"):
+        self.app = app
+        self.recorder = recorder
+        self.cookie_name = cookie_name
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request = Request(scope)
+        session = self.recorder.session_for(request.cookies.get(self.cookie_name))
+        chunks: list[bytes] = []
+        size = 0
+        status_code = 500
+        streaming = False
+        start = time.perf_counter()
+        started_at = time.time()
+
+        async def capturing_receive() -> Message:
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request" and size <= self.max_body_size:
+                chunks.append(message.get("body", b""))
+                size += len(chunks[-1])
+            return message
+
+        async def capturing_send(message: Message) -> None:
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                streaming = headers.get("content-type", "").startswith("text/event-stream")
+                for cookie in headers.getlist("set-cookie"):
+                    name, _, value = cookie.partition(";")[0].partition("=")
+                    if name.strip() == self.cookie_name and value.strip('" '):
+                        self.recorder.continue_session(value.strip('" '), session)
+            await send(message)
+
+        try:
+            await self.app(scope, capturing_receive, capturing_send)
+        finally:
+            route = scope.get("route")
+            if route is not None and not streaming:
+                self.recorder.record(CapturedRequest(
+                    ts=round(started_at, 6),
+                    session=session,
+                    method=scope["method"],
+                    route=route.path,
+                    status=status_code,
+                    ms=round((time.perf_counter() - start) * 1000, 3),
+                    path_params={key: str(value) for key, value in scope.get("path_params", {}).items()},
+                    query=list(request.query_params.multi_items()),
+                    body=self._body_shape(b"".join(chunks), size),
+                ))
+
+    def _body_shape(self, body: bytes, size: int):
+        if not body or size > self.max_body_size:
+            return None
+        try:
+            return body_shape(json.loads(body))
+        except ValueError:
+            return None
+
+
+class AccessLogMiddleware:
+    """
+    Gives every request a correlation id, taken from a well-formed X-Request-ID header or generated,
+    available to every log record through the `request_id` contextvar and echoed in the response.
+    Writes one access record per request: all errors, and `sample_rate` of the successful ones.
+    """
+
+    header = b"x-request-id"
+    valid_request_id = re.compile(rb"^[A-Za-z0-9._-]{1,64}$")
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        incoming = dict(scope["headers"]).get(self.header)
+        current_id = incoming.decode() if incoming and self.valid_request_id.match(incoming) else uuid.uuid4().hex
+        token = request_id.set(current_id)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (self.header, current_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if status_code >= 400 or random.random() < self.sample_rate:
+                access_logger.info("%s %s %s", scope["method"], scope["path"], status_code, extra={"fields": {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                    "client": scope["client"][0] if scope.get("client") else None,
+                }})
+            request_id.reset(token)
+
+
+class CompressionMiddleware:
+    """
+    Compresses compressible responses (JSON, text) with the best coding the client accepts.
+    Complete bodies under `minimum_size` bytes go out as they are; streamed bodies are compressed
+    chunk by chunk and each chunk is flushed, so nothing is buffered whole.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings(gzip_level, brotli_quality)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept_encoding = dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1")
+        coding = negotiate(accept_encoding, list(self.encodings)) if accept_encoding else None
+        start: Message | None = None
+        encoder: Encoder | None = None
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+            if start is not None:
+                encoder = self._encoder_for(start, coding, body, more_body)
+                await send(start)
+                start = None
+            if encoder is None:
+                return await send(message)
+            compressed = encoder.compress(body) if more_body else encoder.finish(body)
+            await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
+
+    def _encoder_for(self, start: Message, coding: str | None, body: bytes, more_body: bool) -> Encoder | None:
+        """Encoder for this response, adjusting its headers, or None to send it as it is."""
+        headers = MutableHeaders(scope=start)
+        if start["status"] < 200 or start["status"] in (204, 304) or "content-encoding" in headers:
+            return None
+        if not is_compressible(headers.get("content-type", "")):
+            return None
+        headers.add_vary_header("Accept-Encoding")
+        if coding is None or (not more_body and len(body) < self.minimum_size):
+            return None
+        headers["content-encoding"] = coding
+        if "content-length" in headers:
+            del headers["content-length"]
+        return self.encodings[coding]()
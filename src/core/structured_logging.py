@@ -0,0 +1,157 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import TextIO
+from src.core.config import settings
+from src.dependencies.metrics_di import get_metrics
+
+# correlation id of the request being handled, set by AccessLogMiddleware
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# every logger of the application is a child of this one ("src.core.middleware", ...)
+APP_LOGGER = "src"
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with the request id and the `fields` passed in `extra`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.Handler):
+    """
+    Hands records over to the writer thread without ever waiting: the message, traceback and
+    request id are resolved here, on the caller's thread, and records are dropped (and counted)
+    when the queue is full rather than stalling the event loop.
+    """
+
+    def __init__(self, records: queue.Queue):
+        super().__init__()
+        self.records = records
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            record.request_id = request_id.get()
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            self.records.put_nowait(record)
+        except queue.Full:
+            get_metrics().increment("log_records_dropped_total")
+        except Exception:
+            self.handleError(record)
+
+
+class BatchingWriter:
+    """
+    Background thread draining the queue into a stream: it waits up to `flush_interval` for a
+    first record, takes up to `batch_size` more that are already queued, and writes them with one
+    call and one flush.
+    """
+
+    _stop = object()
+
+    def __init__(self, records: queue.Queue, stream: TextIO, formatter: logging.Formatter, batch_size: int, flush_interval: float):
+        self.records = records
+        self.stream = stream
+        self.formatter = formatter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Writes what is still queued and ends the thread."""
+        if self._thread.is_alive():
+            self.records.put(self._stop)
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self.records.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = any(record is self._stop for record in batch)
+            lines = [self.formatter.format(record) for record in batch if record is not self._stop]
+            if lines:
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except Exception:
+                    time.sleep(self.flush_interval)
+            if stopping:
+                return
+
+
+_writer: BatchingWriter | None = None
+
+
+def setup_logging(stream: TextIO | None = None) -> BatchingWriter:
+    """
+    Sends every record of the "src" loggers through a NonBlockingQueueHandler to a BatchingWriter
+    on LOG_FILE (stdout when unset), as JSON lines. Idempotent, the writer is flushed at exit.
+    """
+    global _writer
+    if _writer is not None:
+        return _writer
+    records: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    if stream is None:
+        stream = open(settings.LOG_FILE, "a", encoding="utf-8") if settings.LOG_FILE else sys.stdout
+    _writer = BatchingWriter(records, stream, JSONFormatter(), settings.LOG_BATCH_SIZE, settings.LOG_FLUSH_INTERVAL_SECONDS)
+    _writer.start()
+    atexit.register(_writer.stop)
+
+    logger = logging.getLogger(APP_LOGGER)
+    logger.setLevel(settings.LOG_LEVEL)
+    logger.addHandler(NonBlockingQueueHandler(records))
+    # uvicorn's root handlers would write every record a second time, synchronously
+    logger.propagate = False
+    return _writer
+
+
+def _restart_after_fork() -> None:
+    """
+    The writer thread does not survive a fork (src.serve preloads the app, then forks workers):
+    each child gets its own writer, on a new queue since the old one may have been locked mid-put.
+    """
+    global _writer
+    if _writer is None:
+        return
+    records: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    for handler in logging.getLogger(APP_LOGGER).handlers:
+        if isinstance(handler, NonBlockingQueueHandler):
+            handler.records = records
+    _writer = BatchingWriter(records, _writer.stream, _writer.formatter, _writer.batch_size, _writer.flush_interval)
+    _writer.start()
+    atexit.register(_writer.stop)
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
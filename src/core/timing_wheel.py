@@ -0,0 +1,65 @@
+import time
+from typing import Callable, Hashable, Iterator
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel used to expire keys without scanning every entry.
+
+    A key scheduled at `expires_at` goes to the bucket of its tick; advancing the wheel
+    only visits the buckets of the ticks that elapsed since the last call. Deadlines further
+    than one revolution stay in their bucket until the right round comes.
+    The wheel does not own the data: callers re-check the real expiry of what `advance` yields,
+    which makes rescheduling a key (sliding TTL) a plain second `schedule` call.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 512, clock: Callable[[], float] = time.time):
+        self.tick_seconds = tick_seconds
+        self.slots = slots
+        self.clock = clock
+        self._buckets: list[list[tuple[Hashable, float]]] = [[] for _ in range(slots)]
+        self._current_tick = self._tick(clock())
+
+    def _tick(self, timestamp: float) -> int:
+        return int(timestamp // self.tick_seconds)
+
+    def schedule(self, key: Hashable, expires_at: float) -> None:
+        tick = max(self._tick(expires_at), self._current_tick + 1)
+        self._buckets[tick % self.slots].append((key, expires_at))
+
+    def advance(self, now: float | None = None) -> Iterator[Hashable]:
+        """Yields the keys whose deadline is at or before `now`, visiting only the elapsed buckets."""
+        now = self.clock() if now is None else now
+        now_tick = self._tick(now)
+        if now_tick <= self._current_tick:
+            return
+        first_tick = self._current_tick + 1
+        # After a full revolution every bucket has been elapsed once
+        last_tick = min(now_tick, self._current_tick + self.slots)
+        self._current_tick = now_tick
+        for tick in range(first_tick, last_tick + 1):
+            bucket = self._buckets[tick % self.slots]
+            if not bucket:
+                continue
+            pending = [(key, expires_at) for key, expires_at in bucket if expires_at > now]
+            expired = [key for key, expires_at in bucket if expires_at <= now]
+            self._buckets[tick % self.slots] = pending
+            yield from expired
+
+    def soonest(self, is_live: Callable[[Hashable, float], bool]) -> Hashable | None:
+        """
+        The key with the earliest deadline among those `is_live(key, expires_at)` accepts (keys
+        deleted or rescheduled by the caller are still in the wheel), None when there is none.
+        Visits the buckets in tick order from now and stops at the first one holding a live key
+        due this round; only deadlines beyond one revolution need a scan of every bucket.
+        """
+        for tick in range(self._current_tick + 1, self._current_tick + self.slots + 1):
+            round_end = (tick + 1) * self.tick_seconds
+            due = [(expires_at, key) for key, expires_at in self._buckets[tick % self.slots] if expires_at < round_end and is_live(key, expires_at)]
+            if due:
+                return min(due, key=lambda entry: entry[0])[1]
+        later = [(expires_at, key) for bucket in self._buckets for key, expires_at in bucket if is_live(key, expires_at)]
+        return min(later, key=lambda entry: entry[0])[1] if later else None
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets)
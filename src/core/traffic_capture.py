@@ -0,0 +1,139 @@
+import atexit
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+from src.core.structured_logging import BatchingWriter
+from src.core.ttl_cache import TTLCache
+from src.dependencies.metrics_di import get_metrics
+
+
+def body_shape(value: Any) -> Any:
+    """
+    The structure of a JSON body without its values: strings become "str:<length>", numbers
+    "int" / "float", so {"username": "alice", "password": "pa55word"} is captured as
+    {"username": "str:5", "password": "str:8"}.
+    """
+    if isinstance(value, dict):
+        return {key: body_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [body_shape(item) for item in value]
+    if isinstance(value, str):
+        return f"str:{len(value)}"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "null"
+
+
+@dataclass
+class CapturedRequest:
+    """One line of a capture file, see TrafficRecorder."""
+    ts: float
+    session: str
+    method: str
+    route: str
+    status: int
+    ms: float
+    path_params: dict[str, str] = field(default_factory=dict)
+    query: list[tuple[str, str]] = field(default_factory=list)
+    body: Any = None
+
+
+def read_capture(paths: Iterable[str]) -> list[CapturedRequest]:
+    """The requests of one or more capture files (one per worker), in arrival order."""
+    requests = []
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    entry["query"] = [tuple(pair) for pair in entry.get("query", [])]
+                    requests.append(CapturedRequest(**entry))
+    return sorted(requests, key=lambda request: request.ts)
+
+
+class _CaptureFormatter(logging.Formatter):
+    def format(self, record: CapturedRequest) -> str:
+        entry = {key: value for key, value in vars(record).items() if value or key == "status"}
+        return json.dumps(entry, separators=(",", ":"))
+
+
+class TrafficRecorder:
+    """
+    Appends captured requests to `path`, one compact JSON object per line, for src.replay.
+
+    Records go through a bounded queue to the BatchingWriter thread of structured_logging and are
+    dropped, counted as capture_records_dropped_total, when it is full. Each process writes its own
+    `path.<pid>` file, so the workers forked by src.serve never interleave their writes.
+
+    Sessions are pseudonyms: a request without a token cookie starts a new random one, and every
+    token set in its response (login, sliding refresh) is mapped to it, so the requests a client
+    makes with that token replay as the same session. Tokens are only kept as keyed digests.
+    """
+
+    def __init__(self, path: str, max_sessions: int = 100_000, session_ttl_seconds: float = 3600, queue_size: int = 10_000, batch_size: int = 100, flush_interval: float = 0.5):
+        self.path = path
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._key = secrets.token_bytes(32)
+        self._sessions: TTLCache[bytes, str] = TTLCache(max_entries=max_sessions, ttl_seconds=session_ttl_seconds)
+        self._lock = threading.Lock()
+        self._pid: int | None = None
+        self._records: queue.Queue | None = None
+        self._writer: BatchingWriter | None = None
+
+    @property
+    def process_path(self) -> str:
+        return f"{self.path}.{os.getpid()}"
+
+    def session_for(self, token: str | None) -> str:
+        """Pseudonym of the session a token belongs to, a new one without a token."""
+        if not token:
+            return secrets.token_hex(6)
+        digest = self._digest(token)
+        return self._sessions.get_or_set(digest, lambda: digest.hex()[:12])
+
+    def continue_session(self, token: str, session: str) -> None:
+        """Requests made with `token`, just issued to `session`, belong to it."""
+        self._sessions.set(self._digest(token), session)
+
+    def record(self, request: CapturedRequest) -> None:
+        try:
+            self._queue().put_nowait(request)
+        except queue.Full:
+            get_metrics().increment("capture_records_dropped_total")
+
+    def stop(self) -> None:
+        """Writes what is still queued."""
+        if self._writer is not None and self._pid == os.getpid():
+            self._writer.stop()
+            self._writer.stream.close()
+            self._writer = None
+            self._pid = None
+
+    def _queue(self) -> queue.Queue:
+        # started lazily, and again in each forked worker: threads do not survive a fork
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._records = queue.Queue(maxsize=self.queue_size)
+                    stream = open(self.process_path, "a", encoding="utf-8")
+                    self._writer = BatchingWriter(self._records, stream, _CaptureFormatter(), self.batch_size, self.flush_interval)
+                    self._writer.start()
+                    self._pid = os.getpid()
+                    atexit.register(self.stop)
+        return self._records
+
+    def _digest(self, token: str) -> bytes:
+        return hmac.new(self._key, token.encode("utf-8"), hashlib.sha256).digest()
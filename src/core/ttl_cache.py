@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe, size-bounded map whose entries expire `ttl_seconds` after being set.
+
+    Entries are kept in insertion order, so with a shared TTL the oldest entry is also the
+    first to expire: expired entries are dropped from the head on writes and the head is
+    evicted when the cache is full. Every operation is O(1) amortized.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            return self._get(key, self.clock())
+
+    def set(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        with self._lock:
+            self._set(key, value, ttl_seconds, self.clock())
+
+    def get_or_set(self, key: K, factory: Callable[[], V], ttl_seconds: float | None = None) -> V:
+        """Returns the live value for key or stores factory()'s; concurrent callers get the same value."""
+        with self._lock:
+            now = self.clock()
+            value = self._get(key, now)
+            if value is None:
+                value = factory()
+                self._set(key, value, ttl_seconds, now)
+            return value
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return entry[0] if entry is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: K, now: float) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._entries[key]
+            return None
+        return entry[0]
+
+    def _set(self, key: K, value: V, ttl_seconds: float | None, now: float) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (value, now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds))
+        while self._entries:
+            oldest_key, (_, expires_at) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[oldest_key]
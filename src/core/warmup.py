@@ -0,0 +1,98 @@
+import logging
+import time
+from typing import Callable
+import bcrypt
+from sqlalchemy import Engine, text
+from src.core.config import settings
+from src.database.session import engine as main_engine, get_session_factory, get_shard_engines, get_shard_session_factories
+from src.dependencies.codecs_di import get_jwt_codec
+from src.dependencies.events_di import get_change_hub
+from src.dependencies.jobs_di import get_job_registry
+from src.dependencies.metrics_di import get_metrics
+from src.dependencies.repositories_di import get_user_repository_factory
+from src.dependencies.sessions_di import get_profile_versions, get_revocation_store, get_session_store
+
+logger = logging.getLogger(__name__)
+
+# bcrypt of "warmup" at cost 4: loads and exercises bcrypt without spending a login's worth of CPU
+_WARMUP_PASSWORD = b"warmup"
+_WARMUP_HASH = b"$2b$04$yztpDEkI7KyNK83MWVoOBOaG1SZQiAe/DYfrTdRQrpVsdukCf6Yyq"
+
+
+def open_pool_connections(engine: Engine) -> int:
+    """
+    Checks out as many connections as the pool keeps, all at once, and returns them, so the first
+    requests find them open instead of connecting. Returns how many were opened.
+    """
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = []
+    try:
+        for _ in range(size):
+            connection = engine.connect()
+            connection.execute(text("SELECT 1"))
+            connections.append(connection)
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def prime_repository() -> None:
+    """Runs the common repository reads once so their statements are compiled and cached."""
+    with get_user_repository_factory(get_session_factory(), get_shard_session_factories())() as user_repository:
+        user_repository.get_by_username("")
+        user_repository.user_does_exist("")
+        user_repository.get_by_id(0)
+        user_repository.get_count()
+        user_repository.get_users(0, 10)
+        user_repository.search_by_username_prefix("a", 10)
+
+
+def check_password() -> None:
+    if not bcrypt.checkpw(_WARMUP_PASSWORD, _WARMUP_HASH):
+        raise RuntimeError("bcrypt rejected the warmup password")
+
+
+def decode_token() -> None:
+    codec = get_jwt_codec(settings.JWT_BACKEND, settings.SECRET_KEY, settings.ALGORITHM)
+    codec.decode(codec.encode({"sub": "warmup", "exp": int(time.time()) + 60}))
+
+
+def prime_caches() -> None:
+    """Builds the per-process singletons the first request would otherwise build."""
+    get_change_hub()
+    get_job_registry()
+    get_metrics()
+    get_profile_versions()
+    get_revocation_store()
+    if settings.SESSION_MODE == "server":
+        get_session_store()
+
+
+def _database_engines() -> list[Engine]:
+    if settings.USER_REPOSITORY == "memory":
+        return []
+    if settings.USER_REPOSITORY == "sharded":
+        return list(get_shard_engines())
+    return [main_engine]
+
+
+def warm_up() -> dict[str, float]:
+    """
+    Everything a worker does once before it reports ready, see Readiness. Returns the seconds
+    each step took. A failing step raises, the worker must not serve without its database.
+    """
+    steps: list[tuple[str, Callable[[], object]]] = [
+        *((f"pool:{engine.url.database or engine.url}", lambda engine=engine: open_pool_connections(engine)) for engine in _database_engines()),
+        ("repository", prime_repository),
+        ("bcrypt", check_password),
+        ("jwt", decode_token),
+        ("caches", prime_caches),
+    ]
+    durations = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        durations[name] = round(time.perf_counter() - start, 6)
+    logger.info("Warmup done", extra={"fields": {"warmup": durations}})
+    return durations
@@ -0,0 +1,147 @@
+"""
+Online backfills for Alembic migrations.
+
+Filling a new column with one UPDATE holds SQLite's write lock for the whole table, so the app
+cannot log in or register anyone until it ends. `backfill` updates the rows in id-range batches
+instead, one short transaction each with a pause in between, and records after every batch the
+last id done, so a run that is interrupted resumes from there. In a migration:
+
+    from src.database.backfill import backfill
+
+    def upgrade() -> None:
+        op.add_column("user", sa.Column("username_lower", sa.String(30), nullable=True))
+        # commits the migration so far, its transaction would otherwise keep the lock
+        with op.get_context().autocommit_block():
+            backfill(
+                op.get_bind().engine,
+                "user_username_lower",
+                "UPDATE user SET username_lower = lower(username)"
+                " WHERE id BETWEEN :first_id AND :last_id AND username_lower IS NULL",
+            )
+
+The update must be idempotent: the batch running when a run is interrupted is done again.
+Rows inserted after the backfill starts are not visited, the app must already write the column.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable
+from sqlalchemy import Column, Engine, Executable, Integer, MetaData, String, Table, bindparam, delete, func, insert, select, text, update
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1_000
+# long enough for writers waiting on the lock to get it between batches
+PAUSE_SECONDS = 0.05
+PROGRESS_INTERVAL_SECONDS = 5.0
+
+# ignored by autogenerate, see alembic/env.py
+CHECKPOINT_TABLE = "alembic_backfill"
+
+_checkpoints = Table(
+    CHECKPOINT_TABLE,
+    MetaData(),
+    Column("name", String(255), primary_key=True),
+    Column("last_id", Integer, nullable=False),
+    # highest id to backfill, fixed when the first run starts so a resumed run stops at the same id
+    Column("upper_id", Integer, nullable=False),
+    Column("rows", Integer, nullable=False),
+)
+
+
+@dataclass
+class BackfillProgress:
+    """`rows` counts every run of the backfill, `batches` and `elapsed` only this one."""
+    name: str
+    last_id: int
+    upper_id: int
+    rows: int
+    batches: int
+    elapsed: float
+    # rows done by the runs this one resumed
+    resumed_rows: int = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rate of this run, the rows done before it resumed do not count."""
+        return (self.rows - self.resumed_rows) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.last_id >= self.upper_id
+
+
+def backfill(
+    engine: Engine,
+    name: str,
+    statement: str | Executable,
+    table: str = "user",
+    batch_size: int = BATCH_SIZE,
+    pause_seconds: float = PAUSE_SECONDS,
+    on_progress: Callable[[BackfillProgress], None] | None = None,
+    progress_interval: float = PROGRESS_INTERVAL_SECONDS,
+) -> BackfillProgress:
+    """
+    Runs `statement` over the rows of `table` in batches of up to `batch_size` ids, passing each
+    batch's bounds as the :first_id and :last_id parameters. Each batch and its checkpoint are
+    committed together, `name` identifies the checkpoint and is deleted once the backfill is done.
+    `on_progress` is called every `progress_interval` seconds and at the end, by default it logs.
+    """
+    if isinstance(statement, str):
+        statement = text(statement)
+    report = on_progress or _log_progress
+    source = Table(table, MetaData(), Column("id", Integer, primary_key=True))
+    _checkpoints.create(engine, checkfirst=True)
+
+    with engine.begin() as connection:
+        checkpoint = connection.execute(select(_checkpoints).where(_checkpoints.c.name == name)).one_or_none()
+        if checkpoint is None:
+            first_id, upper_id = connection.execute(select(func.min(source.c.id), func.max(source.c.id))).one()
+            if first_id is None:
+                return BackfillProgress(name, 0, 0, 0, 0, 0.0)
+            last_id, rows = first_id - 1, 0
+            connection.execute(insert(_checkpoints).values(name=name, last_id=last_id, upper_id=upper_id, rows=rows))
+        else:
+            last_id, upper_id, rows = checkpoint.last_id, checkpoint.upper_id, checkpoint.rows
+            logger.info("Resuming backfill %s after id %s", name, last_id)
+
+    # keyset batches: the next batch_size ids wherever they are, sparse ids cost no empty batches
+    next_ids = select(source.c.id).where(source.c.id > bindparam("after_id")).order_by(source.c.id).limit(batch_size).subquery()
+    batch_end = select(func.max(next_ids.c.id))
+    save_checkpoint = update(_checkpoints).where(_checkpoints.c.name == name)
+    resumed_rows = rows
+    progress = BackfillProgress(name, last_id, upper_id, rows, 0, 0.0, resumed_rows)
+    start = last_report = time.perf_counter()
+    reported = False
+    while last_id < upper_id:
+        with engine.begin() as connection:
+            batch_last_id = connection.scalar(batch_end, {"after_id": last_id})
+            if batch_last_id is None:
+                break
+            batch_last_id = min(batch_last_id, upper_id)
+            rows += connection.execute(statement, {"first_id": last_id + 1, "last_id": batch_last_id}).rowcount
+            last_id = batch_last_id
+            connection.execute(save_checkpoint.values(last_id=last_id, rows=rows))
+        now = time.perf_counter()
+        progress = BackfillProgress(name, last_id, upper_id, rows, progress.batches + 1, now - start, resumed_rows)
+        reported = now - last_report >= progress_interval
+        if reported:
+            report(progress)
+            last_report = now
+        time.sleep(pause_seconds)
+
+    with engine.begin() as connection:
+        connection.execute(delete(_checkpoints).where(_checkpoints.c.name == name))
+    if not (progress.done and reported):
+        # the last ids may have been deleted meanwhile
+        progress.last_id = upper_id
+        report(progress)
+    return progress
+
+
+def _log_progress(progress: BackfillProgress) -> None:
+    logger.info(
+        "Backfill %s: %s rows, up to id %s of %s, %.0f rows/s%s",
+        progress.name, progress.rows, progress.last_id, progress.upper_id, progress.rows_per_second,
+        ", done" if progress.done else "",
+    )
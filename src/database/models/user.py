@@ -1,9 +1,14 @@
 from src.database.base import Base
-from sqlalchemy import String, Boolean
+from sqlalchemy import String, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 class User(Base):
     __tablename__ = "user"
+    __table_args__ = (
+        # Filtering on is_active while sorting by id or username, see UserRepository.get_users
+        Index("ix_user_is_active_id", "is_active", "id"),
+        Index("ix_user_is_active_username", "is_active", "username"),
+    )
     
     def __init__(self, username:str, password:str, is_active:bool = True, **kw):
         super().__init__(**kw)
@@ -0,0 +1,72 @@
+"""
+Moves the users of a sharded repository onto a new set of shards.
+
+Every user is copied, id included, to the target shard of its username bucket, so ids, passwords
+and is_active are preserved and no id changes. Run it with writes stopped, then point
+USER_SHARD_URLS at the targets:
+
+    poetry run python -m src.database.reshard \\
+        --source sqlite:///./users-0.db sqlite:///./users-1.db \\
+        --target sqlite:///./users-new-0.db sqlite:///./users-new-1.db sqlite:///./users-new-2.db
+"""
+import argparse
+from sqlalchemy import Engine, create_engine, func, insert, select
+from src.database.base import Base
+from src.database.models.user import User as UserModel
+from src.repositories.impl.user_repository_sharded import SHARD_BUCKETS, username_bucket
+
+BATCH_SIZE = 5_000
+
+
+def reshard(sources: list[Engine], targets: list[Engine], batch_size: int = BATCH_SIZE) -> list[int]:
+    """
+    Copies every user of `sources` to `targets`, returns how many users each target got.
+    Targets must be empty, a batch of at most `batch_size` rows is written per target transaction.
+    """
+    if not 0 < len(targets) <= SHARD_BUCKETS:
+        raise ValueError(f"Between 1 and {SHARD_BUCKETS} target shards are supported, got {len(targets)}")
+    for target in targets:
+        Base.metadata.create_all(target)
+        with target.connect() as connection:
+            if connection.scalar(select(func.count()).select_from(UserModel)):
+                raise ValueError(f"Target shard {target.url} already has users")
+
+    columns = [UserModel.id, UserModel.username, UserModel.password, UserModel.is_active]
+    copied = [0] * len(targets)
+    for source in sources:
+        with source.connect() as connection:
+            rows = connection.execution_options(yield_per=batch_size).execute(select(*columns).order_by(UserModel.id))
+            for batch in rows.partitions():
+                by_target: dict[int, list[dict]] = {}
+                for row in batch:
+                    by_target.setdefault(username_bucket(row.username) % len(targets), []).append(row._asdict())
+                for index, users in by_target.items():
+                    with targets[index].begin() as target_connection:
+                        target_connection.execute(insert(UserModel), users)
+                    copied[index] += len(users)
+
+    expected = 0
+    for source in sources:
+        with source.connect() as connection:
+            expected += connection.scalar(select(func.count()).select_from(UserModel))
+    if sum(copied) != expected:
+        raise RuntimeError(f"Copied {sum(copied)} users out of {expected}, were writes stopped?")
+    return copied
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", nargs="+", required=True, help="current USER_SHARD_URLS, in order")
+    parser.add_argument("--target", nargs="+", required=True, help="new shard URLs, in order")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    if set(args.source) & set(args.target):
+        parser.error("targets must be new databases, not sources")
+
+    copied = reshard([create_engine(url) for url in args.source], [create_engine(url) for url in args.target], args.batch_size)
+    for url, count in zip(args.target, copied):
+        print(f"{url}: {count} users")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Fills the user table with synthetic users, millions in minutes instead of hours of /auth/register.
+
+Only a handful of bcrypt hashes of one password are computed, every user reuses one of them, so
+all seeded users log in with that password. Rows go in through bulk core INSERTs with SQLite tuned
+for loading (no journal, no fsync) while it runs, to the repository USER_REPOSITORY selects:
+
+    poetry run python -m src.database.seed --users 1000000 --inactive-ratio 0.1 --common-prefixes al jo --common-prefix-ratio 0.3
+
+Stop the app first: a crash while loading without a journal can corrupt the database.
+"""
+import argparse
+import random
+import string
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+import bcrypt
+from sqlalchemy import Connection, Engine, func, insert, select
+from src.database.models.user import User as UserModel
+from src.repositories.user_repository import UserRepository
+from src.repositories.impl.user_repository_sharded import SHARD_BUCKETS, username_bucket
+
+BATCH_SIZE = 50_000
+USERNAME_ALPHABET = string.ascii_lowercase + string.digits
+# usernames are VARCHAR(30)
+MAX_USERNAME_LENGTH = 30
+_INSERT_IGNORING_DUPLICATES = insert(UserModel).prefix_with("OR IGNORE", dialect="sqlite")
+
+
+@dataclass(frozen=True)
+class UserDistribution:
+    """Shape of the generated users: username lengths, share of inactive users and of popular prefixes."""
+    min_length: int = 6
+    max_length: int = 20
+    inactive_ratio: float = 0.0
+    # e.g. ("al", "jo") with ratio 0.3: 30% of the usernames start with one of them, for prefix search
+    common_prefixes: tuple[str, ...] = ()
+    common_prefix_ratio: float = 0.0
+
+    def __post_init__(self):
+        if not 1 <= self.min_length <= self.max_length <= MAX_USERNAME_LENGTH:
+            raise ValueError(f"Username lengths must satisfy 1 <= min <= max <= {MAX_USERNAME_LENGTH}")
+        if not (0 <= self.inactive_ratio <= 1 and 0 <= self.common_prefix_ratio <= 1):
+            raise ValueError("Ratios must be between 0 and 1")
+        if any(len(prefix) >= self.min_length for prefix in self.common_prefixes):
+            raise ValueError("Common prefixes must be shorter than the minimum username length")
+
+
+def hash_passwords(password: str, count: int, rounds: int = 12) -> list[str]:
+    """`count` bcrypt hashes of password, each with its own salt. 12 rounds is what /auth/register uses."""
+    return [bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8") for _ in range(count)]
+
+
+def generate_users(count: int, password_hashes: list[str], distribution: UserDistribution = UserDistribution(), seed: int = 42) -> Iterator[dict]:
+    """`count` rows with unique usernames, reproducible for a given seed."""
+    rng = random.Random(seed)
+    seen: set[str] = set()
+    while len(seen) < count:
+        length = rng.randint(distribution.min_length, distribution.max_length)
+        prefix = ""
+        if distribution.common_prefixes and rng.random() < distribution.common_prefix_ratio:
+            prefix = rng.choice(distribution.common_prefixes)
+        username = prefix + "".join(rng.choices(USERNAME_ALPHABET, k=length - len(prefix)))
+        if username in seen:
+            continue
+        seen.add(username)
+        yield {
+            "username": username,
+            "password": password_hashes[len(seen) % len(password_hashes)],
+            "is_active": rng.random() >= distribution.inactive_ratio,
+        }
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# PRAGMAs set for loading: no journal, no fsync, a 256 MiB page cache, temporary tables in memory
+_LOADING_PRAGMAS = {"journal_mode": "OFF", "synchronous": "OFF", "cache_size": "-262144", "temp_store": "MEMORY"}
+
+
+def _tune_for_loading(connection: Connection) -> Callable[[], None]:
+    """Applies loading pragmas on a SQLite connection and returns a function restoring the previous ones."""
+    if connection.dialect.name != "sqlite":
+        return lambda: None
+    previous = {name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in _LOADING_PRAGMAS}
+    for name, value in _LOADING_PRAGMAS.items():
+        connection.exec_driver_sql(f"PRAGMA {name} = {value}")
+    connection.commit()
+
+    def restore() -> None:
+        # the connection goes back to the pool, the app must not inherit the loading settings
+        for name, value in previous.items():
+            connection.exec_driver_sql(f"PRAGMA {name} = {value}")
+        connection.commit()
+    return restore
+
+
+def seed_engine(engine: Engine, rows: Iterable[dict], batch_size: int = BATCH_SIZE, on_batch: Callable[[int], None] | None = None) -> int:
+    """
+    Bulk inserts rows into the user table of engine, one executemany and one commit per batch.
+    Usernames that already exist are skipped, returns how many users were inserted.
+    """
+    inserted = 0
+    with engine.connect() as connection:
+        restore = _tune_for_loading(connection)
+        try:
+            for batch in _batches(rows, batch_size):
+                inserted += _insert(connection, batch)
+                if on_batch:
+                    on_batch(inserted)
+        finally:
+            restore()
+    return inserted
+
+
+def _insert(connection: Connection, rows: list[dict]) -> int:
+    """One executemany in its own transaction, usernames that already exist are skipped."""
+    with connection.begin():
+        return connection.execute(_INSERT_IGNORING_DUPLICATES, rows).rowcount
+
+
+def seed_shards(engines: list[Engine], rows: Iterable[dict], batch_size: int = BATCH_SIZE, on_batch: Callable[[int], None] | None = None) -> int:
+    """
+    Bulk inserts rows into the shards of a ShardedUserRepository: each row goes to the shard of
+    its username bucket with the id that repository would give it, `n * SHARD_BUCKETS + bucket`.
+    """
+    next_sequence = []
+    for engine in engines:
+        with engine.connect() as connection:
+            next_sequence.append((connection.scalar(select(func.max(UserModel.id))) or 0) // SHARD_BUCKETS + 1)
+
+    inserted = 0
+    with ExitStack() as stack:
+        # one connection per shard, tuned for the whole load and restored when it ends or fails
+        connections = [stack.enter_context(engine.connect()) for engine in engines]
+        for connection in connections:
+            stack.callback(_tune_for_loading(connection))
+        for batch in _batches(rows, batch_size):
+            by_shard: dict[int, list[dict]] = {}
+            for row in batch:
+                bucket = username_bucket(row["username"])
+                shard = bucket % len(engines)
+                by_shard.setdefault(shard, []).append({**row, "id": next_sequence[shard] * SHARD_BUCKETS + bucket})
+                next_sequence[shard] += 1
+            for shard, shard_rows in by_shard.items():
+                inserted += _insert(connections[shard], shard_rows)
+            if on_batch:
+                on_batch(inserted)
+    return inserted
+
+
+def seed_repository(repository: UserRepository, rows: Iterable[dict]) -> int:
+    """Saves rows one by one through any UserRepository, e.g. the in-memory one of a test or benchmark."""
+    count = 0
+    for row in rows:
+        repository.save(UserModel(**row))
+        count += 1
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, required=True)
+    parser.add_argument("--password", default="password", help="password every seeded user logs in with")
+    parser.add_argument("--password-hashes", type=int, default=8, help="distinct bcrypt hashes of it to spread over the users")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost, 12 like /auth/register")
+    parser.add_argument("--min-length", type=int, default=6)
+    parser.add_argument("--max-length", type=int, default=20)
+    parser.add_argument("--inactive-ratio", type=float, default=0.0)
+    parser.add_argument("--common-prefixes", nargs="*", default=[])
+    parser.add_argument("--common-prefix-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    from src.core.config import settings
+    from src.database.session import engine, get_shard_engines
+    distribution = UserDistribution(args.min_length, args.max_length, args.inactive_ratio, tuple(args.common_prefixes), args.common_prefix_ratio)
+
+    start = time.perf_counter()
+    password_hashes = hash_passwords(args.password, args.password_hashes, args.rounds)
+    print(f"{len(password_hashes)} bcrypt hashes in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+
+    def report(inserted: int) -> None:
+        elapsed = time.perf_counter() - start
+        print(f"{inserted:,} users, {inserted / elapsed:,.0f} rows/s", flush=True)
+
+    rows = generate_users(args.users, password_hashes, distribution, args.seed)
+    if settings.USER_REPOSITORY == "sharded":
+        inserted = seed_shards(list(get_shard_engines()), rows, args.batch_size, report)
+    elif settings.USER_REPOSITORY == "sqlalchemy":
+        inserted = seed_engine(engine, rows, args.batch_size, report)
+    else:
+        parser.error(f"USER_REPOSITORY={settings.USER_REPOSITORY} lives in the app process, seed it with seed_repository")
+    elapsed = time.perf_counter() - start
+    print(f"Seeded {inserted:,} of {args.users:,} users in {elapsed:.1f}s ({inserted / elapsed:,.0f} rows/s), password {args.password!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,179 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+import os
+from functools import lru_cache
+from sqlalchemy import create_engine, event, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker, Session, ORMExecuteState
+from typing import Callable, Generator
 from src.core.config import settings
+from src.database.base import Base
+from src.core.deadline import DeadlineExceeded, check_deadline, expired, remaining
+
+# SQLite VM instructions between two deadline checks of a running statement
+DEADLINE_CHECK_INSTRUCTIONS = 10_000
+SQLITE_BUSY_TIMEOUT_MS = 5_000
+
+
+def enforce_deadlines(engine: Engine) -> None:
+    """
+    Makes statements honour the request deadline (src.core.deadline): none starts once it has passed,
+    a running SQLite statement is interrupted through the progress handler, and lock waits are cut
+    down to the time left. The resulting errors are raised as DeadlineExceeded.
+    """
+    is_sqlite = engine.dialect.name == "sqlite"
+
+    @event.listens_for(engine, "connect")
+    def install_progress_handler(dbapi_connection, _connection_record):
+        if is_sqlite:
+            dbapi_connection.set_progress_handler(_interrupt_if_expired, DEADLINE_CHECK_INSTRUCTIONS)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def check_before_execute(conn, cursor, statement, parameters, context, executemany):
+        check_deadline()
+        time_left = remaining()
+        if is_sqlite and time_left is not None and time_left * 1000 < SQLITE_BUSY_TIMEOUT_MS:
+            cursor.connection.execute(f"PRAGMA busy_timeout = {max(int(time_left * 1000), 1)}")
+            conn.connection.info["busy_timeout_bounded"] = True
+
+    @event.listens_for(engine, "checkin")
+    def restore_busy_timeout(dbapi_connection, connection_record):
+        if dbapi_connection is not None and connection_record.info.pop("busy_timeout_bounded", False):
+            dbapi_connection.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+
+    @event.listens_for(engine, "handle_error")
+    def raise_deadline_exceeded(exception_context):
+        # only the errors the deadline causes, an IntegrityError raised past it is still an IntegrityError
+        if expired() and _is_deadline_error(exception_context.sqlalchemy_exception, exception_context.original_exception):
+            raise DeadlineExceeded()
+
+
+def _is_deadline_error(sqlalchemy_exception: Exception | None, original_exception: Exception) -> bool:
+    """The progress handler's "interrupted", or "database is locked" after a lock wait cut short by the deadline."""
+    if not isinstance(sqlalchemy_exception, OperationalError):
+        return False
+    message = str(original_exception)
+    return "interrupted" in message or "database is locked" in message
+
+
+def _interrupt_if_expired() -> int:
+    return 1 if expired() else 0
 
 
 engine = create_engine(settings.SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+enforce_deadlines(engine)
 SessionLocal = sessionmaker(autoflush=False, autocommit=False, bind=engine)
 
 
+class LazySession:
+    """
+    Stand-in for a Session that is only created on its first use, so requests that
+    never touch the database (e.g. /auth/logout) never build a session or close one.
+
+    Once created, the pooled connection is still checked out on the first query and returned
+    on commit like any Session, and in addition a read in a transaction that has written nothing
+    (no pending changes, no flush, no INSERT/UPDATE/DELETE) releases it as soon as its rows are
+    fetched instead of holding it until the end of the request.
+    Loaded objects stay usable since the session does not expire them on commit.
+    """
+
+    def __init__(self, session_factory: Callable[..., Session] = SessionLocal):
+        self._session_factory = session_factory
+        self._session: Session | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._session is not None
+
+    def _get_session(self) -> Session:
+        if self._session is None:
+            self._session = self._session_factory(expire_on_commit=False)
+            event.listen(self._session, "do_orm_execute", _release_after_read)
+            event.listen(self._session, "after_flush", _mark_written)
+            event.listen(self._session, "after_transaction_end", _forget_writes)
+        return self._session
+
+    def __getattr__(self, name: str):
+        return getattr(self._get_session(), name)
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+
+
+_WROTE = "wrote_in_transaction"
+
+
+def _mark_written(session: Session, _flush_context=None) -> None:
+    session.info[_WROTE] = True
+
+
+def _forget_writes(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_WROTE, None)
+
+
+def _release_after_read(orm_execute_state: ORMExecuteState):
+    session = orm_execute_state.session
+    if not orm_execute_state.is_select:
+        # ORM or Core DML, text() included: the transaction now has writes to keep
+        _mark_written(session)
+        return None
+    if session.info.get(_WROTE) or session.new or session.dirty or session.deleted:
+        return None
+    # buffer the rows, then end the read transaction to give the connection back to the pool
+    frozen_result = orm_execute_state.invoke_statement().freeze()
+    session.commit()
+    return frozen_result()
+
+
+def _forget_inherited_connections() -> None:
+    # a forked worker must not reuse the parent's pooled connections, it opens its own
+    engine.dispose(close=False)
+    if get_shard_engines.cache_info().currsize:
+        for shard_engine in get_shard_engines():
+            shard_engine.dispose(close=False)
+
+
 def get_db_session() -> Generator[Session, None, None]:
-    db = SessionLocal()
+    db = LazySession()
     try:
         yield db 
     finally:
         db.close()
+
+
+def get_session_factory() -> Callable[[], Session]:
+    """Sessions for work outliving the request, e.g. background jobs, which open and close their own."""
+    return SessionLocal
+
+
+@lru_cache
+def get_shard_engines() -> tuple[Engine, ...]:
+    """
+    One engine per USER_SHARD_URLS database, in order (the order decides which users live where).
+    Migrations only run on the main database, shards get their tables created here.
+    """
+    engines = []
+    for url in settings.USER_SHARD_URLS:
+        shard_engine = create_engine(url, connect_args={"check_same_thread": False})
+        enforce_deadlines(shard_engine)
+        Base.metadata.create_all(shard_engine)
+        engines.append(shard_engine)
+    return tuple(engines)
+
+
+@lru_cache
+def get_shard_session_factories() -> tuple[Callable[..., Session], ...]:
+    return tuple(sessionmaker(autoflush=False, autocommit=False, bind=shard_engine) for shard_engine in get_shard_engines())
+
+
+def get_shard_db_sessions() -> Generator[list[Session], None, None]:
+    """A LazySession per shard, only the shards a request touches open a session."""
+    sessions = [LazySession(factory) for factory in get_shard_session_factories()]
+    try:
+        yield sessions
+    finally:
+        for db in sessions:
+            db.close()
+
+
+os.register_at_fork(after_in_child=_forget_inherited_connections)
@@ -0,0 +1,15 @@
+from functools import lru_cache
+from src.core.config import settings
+from src.core.traffic_capture import TrafficRecorder
+
+@lru_cache
+def get_traffic_recorder() -> TrafficRecorder:
+    """Recorder of this process's requests, used by TrafficCaptureMiddleware when CAPTURE_FILE is set."""
+    return TrafficRecorder(
+        settings.CAPTURE_FILE,
+        max_sessions=settings.CAPTURE_MAX_SESSIONS,
+        session_ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        queue_size=settings.LOG_QUEUE_SIZE,
+        batch_size=settings.LOG_BATCH_SIZE,
+        flush_interval=settings.LOG_FLUSH_INTERVAL_SECONDS,
+    )
@@ -0,0 +1,35 @@
+from functools import lru_cache
+from importlib import import_module
+from src.core.config import settings
+from src.codecs.jwt_codec import JWTCodec
+
+JWT_CODECS = {
+    "jose": ("src.codecs.impl.jose_jwt_codec", "JoseJWTCodec"),
+    "hmac": ("src.codecs.impl.hmac_jwt_codec", "HMACJWTCodec"),
+    "pyjwt": ("src.codecs.impl.pyjwt_jwt_codec", "PyJWTCodec"),
+}
+
+def available_jwt_codecs() -> list[str]:
+    """Backends whose optional dependencies are installed."""
+    available = []
+    for name, (module, _) in JWT_CODECS.items():
+        try:
+            import_module(module)
+            available.append(name)
+        except ImportError:
+            continue
+    return available
+
+@lru_cache
+def get_jwt_codec(backend: str | None = None, secret_key: str | None = None, algorithm: str | None = None) -> JWTCodec:
+    """
+    One codec per (backend, key, algorithm) for the whole process, so keys are prepared once.
+    "auto" picks the HMAC fast path for HS* algorithms and python-jose for the rest.
+    """
+    backend = backend or settings.JWT_BACKEND
+    algorithm = algorithm or settings.ALGORITHM
+    if backend == "auto":
+        backend = "hmac" if algorithm.startswith("HS") else "jose"
+    module, class_name = JWT_CODECS[backend]
+    codec_class = getattr(import_module(module), class_name)
+    return codec_class(secret_key or settings.SECRET_KEY, algorithm)
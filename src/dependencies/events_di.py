@@ -0,0 +1,8 @@
+from functools import lru_cache
+from src.core.config import settings
+from src.core.change_hub import ChangeHub
+
+@lru_cache
+def get_change_hub() -> ChangeHub:
+    """User changes published by the repositories of this process, streamed at /users/changes."""
+    return ChangeHub(history_size=settings.CHANGE_FEED_HISTORY_SIZE, subscriber_buffer=settings.CHANGE_FEED_SUBSCRIBER_BUFFER)
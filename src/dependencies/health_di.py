@@ -0,0 +1,7 @@
+from functools import lru_cache
+from src.core.health import Readiness
+
+@lru_cache
+def get_readiness() -> Readiness:
+    """State of this worker, set by the app lifespan and served at /health/ready."""
+    return Readiness()
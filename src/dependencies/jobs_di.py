@@ -0,0 +1,8 @@
+from functools import lru_cache
+from src.core.config import settings
+from src.jobs.job_registry import JobRegistry
+
+@lru_cache
+def get_job_registry() -> JobRegistry:
+    """Background jobs of this process, e.g. DELETE /users, queried at /users/jobs/{id}."""
+    return JobRegistry(max_jobs=settings.JOBS_MAX_KEPT)
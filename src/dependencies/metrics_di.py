@@ -0,0 +1,7 @@
+from functools import lru_cache
+from src.core.metrics import Metrics
+
+@lru_cache
+def get_metrics() -> Metrics:
+    """Counters of this process, served at /metrics."""
+    return Metrics()
@@ -0,0 +1,8 @@
+from functools import lru_cache
+from src.core.allocation_profiler import AllocationProfiler
+from src.core.config import settings
+
+@lru_cache
+def get_allocation_profiler() -> AllocationProfiler:
+    """Allocation profiler of this process, started in set_up when ALLOCATION_PROFILING is on."""
+    return AllocationProfiler(frames=settings.ALLOCATION_PROFILING_FRAMES, max_snapshots=settings.ALLOCATION_PROFILING_MAX_SNAPSHOTS)
@@ -1,7 +1,45 @@
-from src.database.session import get_db_session
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, ContextManager, Iterator
+from src.core.config import settings
+from src.database.session import get_db_session, get_session_factory, get_shard_db_sessions, get_shard_session_factories
+from src.repositories.user_repository import UserRepository as UserRepositoryABC
 from src.repositories.impl.user_repository_sql_alchemy import *
+from src.repositories.impl.user_repository_memory import MemoryUserRepository
+from src.repositories.impl.user_repository_sharded import ShardedUserRepository
 from sqlalchemy.orm import Session
 from fastapi import Depends
 
-def get_user_repository(db: Session = Depends(get_db_session)) -> UserRepository:
+@lru_cache
+def get_memory_user_repository() -> MemoryUserRepository:
+    """One in-memory repository per process, its users live as long as the process."""
+    return MemoryUserRepository()
+
+def get_user_repository(db: Session = Depends(get_db_session), shard_dbs: list[Session] = Depends(get_shard_db_sessions)) -> UserRepositoryABC:
+    if settings.USER_REPOSITORY == "memory":
+        return get_memory_user_repository()
+    if settings.USER_REPOSITORY == "sharded":
+        return ShardedUserRepository([UserRepository(db=shard_db) for shard_db in shard_dbs])
     return UserRepository(db=db)
+
+def get_user_repository_factory(
+    session_factory: Callable[[], Session] = Depends(get_session_factory),
+    shard_session_factories: tuple[Callable[[], Session], ...] = Depends(get_shard_session_factories),
+) -> Callable[[], ContextManager[UserRepositoryABC]]:
+    """Repositories with their own session, for jobs running after the request has ended."""
+    @contextmanager
+    def open_user_repository() -> Iterator[UserRepositoryABC]:
+        if settings.USER_REPOSITORY == "memory":
+            yield get_memory_user_repository()
+            return
+        factories = shard_session_factories if settings.USER_REPOSITORY == "sharded" else [session_factory]
+        dbs = [factory() for factory in factories]
+        try:
+            if settings.USER_REPOSITORY == "sharded":
+                yield ShardedUserRepository([UserRepository(db=db) for db in dbs])
+            else:
+                yield UserRepository(db=dbs[0])
+        finally:
+            for db in dbs:
+                db.close()
+    return open_user_repository
@@ -1,14 +1,33 @@
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Request, status
+from src.core.config import settings
 from src.repositories.impl.user_repository_sql_alchemy import UserRepository
 from src.services.user_service import UserService
-from src.dependencies.repositories_di import get_user_repository
+from src.dependencies.repositories_di import get_user_repository, get_user_repository_factory
+from src.dependencies.jobs_di import get_job_registry
+from src.jobs.job_registry import JobRegistry
 from src.services.cookie_service import CookieService
+from src.sessions.verified_credentials import VerifiedCredentials
+from src.dependencies.sessions_di import get_verified_credentials
 
 def get_cookie_service() -> CookieService:
     return CookieService()
 
-def get_user_service(user_repository: UserRepository = Depends(get_user_repository), cookie_service: CookieService = Depends(get_cookie_service)) -> UserService:
-    return UserService(user_repository, cookie_service)
+def get_user_service(
+    user_repository: UserRepository = Depends(get_user_repository),
+    cookie_service: CookieService = Depends(get_cookie_service),
+    job_registry: JobRegistry = Depends(get_job_registry),
+    user_repository_factory = Depends(get_user_repository_factory),
+    verified_credentials: VerifiedCredentials | None = Depends(get_verified_credentials),
+) -> UserService:
+    return UserService(user_repository, cookie_service, job_registry, user_repository_factory, verified_credentials)
+
+
+def get_admin_user(request: Request, user_service: UserService = Depends(get_user_service)):
+    """The authenticated user if listed in ADMIN_USERNAMES, 403 otherwise."""
+    user = user_service.get_current_user(request)
+    if user.username not in settings.ADMIN_USERNAMES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return user
 
 
 #shorthand
@@ -0,0 +1,43 @@
+from functools import lru_cache
+from src.core.config import settings
+from src.sessions.session_store import SessionStore
+from src.sessions.revocation_store import RevocationStore
+from src.sessions.profile_versions import ProfileVersions
+from src.sessions.verified_credentials import VerifiedCredentials
+from src.core.ttl_cache import TTLCache
+
+@lru_cache
+def get_session_store() -> SessionStore:
+    """One store per process, shared by the middleware and every CookieService."""
+    if settings.SESSION_STORE == "sqlite":
+        from src.sessions.impl.sqlite_session_store import SQLiteSessionStore
+        return SQLiteSessionStore(settings.SESSION_SQLITE_URL)
+    from src.sessions.impl.memory_session_store import MemorySessionStore
+    return MemorySessionStore(shards=settings.SESSION_SHARDS)
+
+@lru_cache
+def get_revocation_store() -> RevocationStore:
+    """Revoked JWT ids of this process, replayed from REVOCATION_JOURNAL_PATH when set."""
+    return RevocationStore(max_entries=settings.REVOCATION_MAX_ENTRIES, journal_path=settings.REVOCATION_JOURNAL_PATH)
+
+@lru_cache
+def get_profile_versions() -> ProfileVersions:
+    """Versions of the user claims embedded in tokens (TOKEN_EMBED_USER_CLAIMS)."""
+    return ProfileVersions()
+
+@lru_cache
+def get_refreshed_tokens() -> TTLCache[str, str]:
+    """jti of a token being slid -> its replacement, so concurrent requests mint a single new token."""
+    return TTLCache(max_entries=100_000, ttl_seconds=settings.TOKEN_REFRESH_WINDOW_MINUTES * 60)
+
+@lru_cache
+def get_slid_sessions() -> TTLCache[str, bool]:
+    """Server-side sessions this process slid in the current refresh window, touched again after it."""
+    return TTLCache(max_entries=100_000, ttl_seconds=settings.TOKEN_REFRESH_WINDOW_MINUTES * 60)
+
+@lru_cache
+def get_verified_credentials() -> VerifiedCredentials | None:
+    """Recent successful logins of this process, None unless LOGIN_CACHE_ENABLED."""
+    if not settings.LOGIN_CACHE_ENABLED:
+        return None
+    return VerifiedCredentials(max_entries=settings.LOGIN_CACHE_MAX_ENTRIES, ttl_seconds=settings.LOGIN_CACHE_TTL_SECONDS)
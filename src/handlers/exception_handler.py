@@ -3,6 +3,8 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from src.schemas.error import ErrorDTO
 from pydantic import ValidationError
+from src.core.deadline import DeadlineExceeded
+from src.dependencies.metrics_di import get_metrics
 
 
 class ExceptionHandler:
@@ -40,6 +42,15 @@ class ExceptionHandler:
             status_code=exc.status_code,
             content=ErrorDTO(status_code=exc.status_code, message=exc.detail).model_dump(),
         )
-        
-
 
+    async def deadline_exceeded_handler(self, request: Request, exc: DeadlineExceeded):
+        """
+        Requests that ran out of time (REQUEST_DEADLINE_SECONDS), counted per route.
+        """
+        route = request.scope.get("route")
+        get_metrics().increment("deadline_exceeded_total", route=getattr(route, "path", request.url.path))
+        status_code = status.HTTP_504_GATEWAY_TIMEOUT
+        return JSONResponse(
+            status_code=status_code,
+            content=ErrorDTO(status_code=status_code, message=exc.message).model_dump(),
+        )
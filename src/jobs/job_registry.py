@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Literal
+
+logger = logging.getLogger(__name__)
+
+JobState = Literal["pending", "running", "succeeded", "failed"]
+
+
+@dataclass
+class Job:
+    """Progress of a background job, updated by the job itself while it runs."""
+    kind: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    state: JobState = "pending"
+    total: int = 0
+    processed: int = 0
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in ("pending", "running")
+
+    @property
+    def progress(self) -> float:
+        if self.state == "succeeded":
+            return 1.0
+        return min(self.processed / self.total, 1.0) if self.total else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Items processed per second since the job started."""
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+
+class JobRegistry:
+    """
+    Runs jobs on a small thread pool and keeps the last `max_jobs` of them for status queries.
+    Only finished jobs are evicted, the oldest first: a pending or running job stays queryable
+    even when every kept job is still active. At most one job of each kind is active:
+    submitting a kind that is already running returns it.
+    Jobs are per process and do not survive a restart.
+    """
+
+    def __init__(self, max_jobs: int = 100, workers: int = 1):
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jobs")
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+
+    def submit(self, kind: str, run: Callable[[Job], None]) -> Job:
+        with self._lock:
+            for job in self._jobs.values():
+                if job.kind == kind and job.is_active:
+                    return job
+            job = Job(kind=kind)
+            self._jobs[job.id] = job
+            self._evict_finished()
+        self._executor.submit(self._run, job, run)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def wait(self, job: Job, timeout: float | None = None) -> bool:
+        """Blocks until the job finished, True unless `timeout` expired first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while job.is_active:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def _evict_finished(self) -> None:
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        finished = [job_id for job_id, job in self._jobs.items() if not job.is_active][:excess]
+        for job_id in finished:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _run(job: Job, run: Callable[[Job], None]) -> None:
+        job.state = "running"
+        job.started_at = time.time()
+        try:
+            run(job)
+            job.state = "succeeded"
+        except Exception as e:
+            logger.exception("Job failed", extra={"fields": {"job_id": job.id, "kind": job.kind}})
+            job.error = str(e)
+            job.state = "failed"
+        finally:
+            job.finished_at = time.time()
@@ -1,26 +1,62 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from src.routers import routers
 from fastapi.routing import APIRoute
 from src.handlers import exception_handlers
-from src.core.middleware import JWTCookieAuthMiddleware
+from src.core.middleware import JWTCookieAuthMiddleware, IdempotencyMiddleware, DeadlineMiddleware, AccessLogMiddleware, CompressionMiddleware, ConcurrencyLimitMiddleware, AllocationProfilingMiddleware, TrafficCaptureMiddleware
+from src.core.structured_logging import setup_logging
 from src.core.config import settings
+from src.core.warmup import warm_up
+from src.dependencies.health_di import get_readiness
+from src.dependencies.profiling_di import get_allocation_profiler
+from src.dependencies.capture_di import get_traffic_recorder
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # the worker only starts accepting connections, and /health/ready only answers 200, once warm
+    readiness = get_readiness()
+    warmup = await run_in_threadpool(warm_up) if settings.WARMUP_ON_STARTUP else {}
+    readiness.mark_ready(warmup)
+    yield
+    readiness.mark_draining()
 
 app = FastAPI(
     description="API REST",
     version="1.0.1",
-    exception_handlers=exception_handlers
+    exception_handlers=exception_handlers,
+    lifespan=lifespan
 )
 
 def set_up():
+    setup_logging()
     public_paths = set(settings.DEFAULT_PUBLIC_PATHS)
+    idempotent_paths = set()
+    route_deadlines = []
+    route_groups = []
     for router in routers:
         app.include_router(router)
     for route in app.routes:
         if isinstance(route, APIRoute):
             if getattr(route.endpoint, "_is_public", False):
                 public_paths.add(route.path)
+            if getattr(route.endpoint, "_is_idempotent", False):
+                idempotent_paths.add(route.path)
+            route_deadlines.append((route, getattr(route.endpoint, "_deadline_seconds", settings.REQUEST_DEADLINE_SECONDS)))
+            route_groups.append((route, getattr(route.endpoint, "_concurrency_group", "default")))
     
     app.add_middleware(JWTCookieAuthMiddleware, public_paths=public_paths)
+    app.add_middleware(IdempotencyMiddleware, paths=idempotent_paths)
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE, gzip_level=settings.COMPRESSION_LEVEL, brotli_quality=settings.COMPRESSION_BROTLI_QUALITY)
+    app.add_middleware(DeadlineMiddleware, default_seconds=settings.REQUEST_DEADLINE_SECONDS, routes=route_deadlines)
+    if settings.CONCURRENCY_LIMIT_ENABLED:
+        app.add_middleware(ConcurrencyLimitMiddleware, routes=route_groups, retry_after_seconds=settings.CONCURRENCY_RETRY_AFTER_SECONDS)
+    app.add_middleware(AccessLogMiddleware, sample_rate=settings.ACCESS_LOG_SAMPLE_RATE)
+    if settings.CAPTURE_FILE:
+        app.add_middleware(TrafficCaptureMiddleware, recorder=get_traffic_recorder())
+    if settings.ALLOCATION_PROFILING:
+        get_allocation_profiler().start()
+        app.add_middleware(AllocationProfilingMiddleware, profiler=get_allocation_profiler())
 
 
 set_up()
\ No newline at end of file
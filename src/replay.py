@@ -0,0 +1,161 @@
+"""
+Replays requests captured with CAPTURE_FILE against the app and compares latencies.
+
+Each captured session runs as its own client, with its own cookies, sending its requests in the
+captured order at their captured offsets divided by --speed (a request never starts before the
+previous one of its session ended). Bodies are rebuilt from their captured shapes; every session
+gets a fresh account, registered beforehand when the session logs in without registering first.
+Prints per route the recorded and replayed latency percentiles and the statuses that differ.
+
+    poetry run python -m src.replay capture.jsonl.* --url http://127.0.0.1:8000 --speed 4
+
+Without --url the app is driven in process, as configured by the environment.
+"""
+import argparse
+import asyncio
+import random
+import re
+import secrets
+import string
+import time
+from dataclasses import dataclass
+from statistics import quantiles
+from typing import Any, Callable
+
+import httpx
+
+from src.core.traffic_capture import CapturedRequest, read_capture
+
+REGISTER_ROUTE = "/auth/register"
+LOGIN_ROUTE = "/auth/login"
+CREDENTIAL_FIELDS = ("username", "password")
+_PATH_PARAM = re.compile(r"{(\w+)(?::\w+)?}")
+
+
+@dataclass
+class ReplayedRequest:
+    captured: CapturedRequest
+    status: int
+    ms: float
+
+
+def build_path(route: str, path_params: dict[str, str]) -> str:
+    return _PATH_PARAM.sub(lambda match: path_params[match.group(1)], route)
+
+
+def build_body(shape: Any, credentials: dict[str, str], rng: random.Random) -> Any:
+    """A body with the captured shape, the session's credentials in its username and password."""
+    if isinstance(shape, dict):
+        return {key: credentials[key] if key in credentials else build_body(value, credentials, rng) for key, value in shape.items()}
+    if isinstance(shape, list):
+        return [build_body(item, credentials, rng) for item in shape]
+    if isinstance(shape, str) and shape.startswith("str:"):
+        return "".join(rng.choices(string.ascii_lowercase, k=int(shape[4:])))
+    return {"int": 1, "float": 1.0, "bool": True}.get(shape)
+
+
+def session_credentials(sessions: list[str]) -> dict[str, dict[str, str]]:
+    """A new account per session, unique to this replay so it can run twice against one database."""
+    run = secrets.token_hex(2)
+    return {session: {"username": f"rp{run}{session}"[:30], "password": f"replay-{session}"} for session in sessions}
+
+
+def needs_account(requests: list[CapturedRequest]) -> bool:
+    """Whether a session logs in before (or without) registering, so its account must exist."""
+    for request in requests:
+        if request.route == REGISTER_ROUTE:
+            return False
+        if request.route == LOGIN_ROUTE:
+            return True
+    return False
+
+
+async def replay(
+    captured: list[CapturedRequest],
+    new_client: Callable[[], httpx.AsyncClient],
+    speed: float = 1.0,
+    seed: int = 42,
+) -> list[ReplayedRequest]:
+    sessions: dict[str, list[CapturedRequest]] = {}
+    for request in captured:
+        sessions.setdefault(request.session, []).append(request)
+    credentials = session_credentials(list(sessions))
+    clients = {session: new_client() for session in sessions}
+    rng = random.Random(seed)
+
+    await asyncio.gather(*(
+        clients[session].post(REGISTER_ROUTE, json=credentials[session])
+        for session, requests in sessions.items() if needs_account(requests)
+    ))
+    for client in clients.values():
+        # only the cookies of the session's own logins count
+        client.cookies.clear()
+
+    results: list[ReplayedRequest] = []
+    first_ts = captured[0].ts if captured else 0.0
+    start = time.perf_counter()
+
+    async def run_session(session: str, requests: list[CapturedRequest]) -> None:
+        client = clients[session]
+        for request in requests:
+            await asyncio.sleep(max(0.0, start + (request.ts - first_ts) / speed - time.perf_counter()))
+            body = build_body(request.body, credentials[session], rng) if request.body is not None else None
+            sent = time.perf_counter()
+            response = await client.request(request.method, build_path(request.route, request.path_params), params=request.query, json=body)
+            results.append(ReplayedRequest(request, response.status_code, (time.perf_counter() - sent) * 1000))
+
+    try:
+        await asyncio.gather(*(run_session(session, requests) for session, requests in sessions.items()))
+    finally:
+        for client in clients.values():
+            await client.aclose()
+    return results
+
+
+def _percentiles(timings: list[float]) -> str:
+    if len(timings) < 2:
+        return f"{timings[0]:>8.1f} {timings[0]:>8.1f} {timings[0]:>8.1f}"
+    cuts = quantiles(timings, n=100)
+    return f"{cuts[49]:>8.1f} {cuts[94]:>8.1f} {cuts[98]:>8.1f}"
+
+
+def report(results: list[ReplayedRequest]) -> str:
+    """Per route: requests, recorded and replayed p50/p95/p99 in ms, and replayed statuses that differ."""
+    by_route: dict[tuple[str, str], list[ReplayedRequest]] = {}
+    for result in results:
+        by_route.setdefault((result.captured.method, result.captured.route), []).append(result)
+    lines = [f"{'route':<32} {'count':>6} {'recorded p50/p95/p99 ms':>26} {'replayed p50/p95/p99 ms':>26} {'status diff':>11}"]
+    for (method, route), route_results in sorted(by_route.items(), key=lambda item: -len(item[1])):
+        recorded = _percentiles([result.captured.ms for result in route_results])
+        replayed = _percentiles([result.ms for result in route_results])
+        mismatches = sum(result.status != result.captured.status for result in route_results)
+        lines.append(f"{method + ' ' + route:<32} {len(route_results):>6} {recorded:>26} {replayed:>26} {mismatches:>11}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", nargs="+", help="capture files, one per worker")
+    parser.add_argument("--url", help="server to replay against, the app in process when omitted")
+    parser.add_argument("--speed", type=float, default=1.0, help="2 replays twice as fast as captured")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    captured = read_capture(args.capture)
+    if args.url:
+        new_client = lambda: httpx.AsyncClient(base_url=args.url, timeout=None)
+    else:
+        from src.main import app
+        new_client = lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay", timeout=None)
+
+    sessions = len({request.session for request in captured})
+    print(f"Replaying {len(captured)} requests of {sessions} sessions at {args.speed}x")
+    start = time.perf_counter()
+    results = asyncio.run(replay(captured, new_client, args.speed))
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+    print(report(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from src.database.models.user import User as UserModel
+from src.repositories.user_repository import UserRepository, parse_user_id
+from src.dependencies.sessions_di import get_profile_versions
+from src.dependencies.events_di import get_change_hub
+from src.schemas.user import UserDTO
+
+class MemoryUserRepository(UserRepository):
+    """
+    Process-local UserRepository for tests and benchmarks, no SQLite or ORM involved.
+
+    Users are kept in hash indexes by id and by username, and in sorted lists of ids and of
+    usernames, one for every user and one per is_active value, so every get_users filter/sort
+    combination is a slice and prefix search is a bisect. Counts are read from the list sizes.
+    Indexes follow the values the user had on its last save, mutations hold a single lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._last_id = 0
+        self._by_id: dict[int, UserModel] = {}
+        self._by_username: dict[str, UserModel] = {}
+        # id -> (username, is_active) as indexed, an update moves the user out of these keys
+        self._indexed: dict[int, tuple[str, bool]] = {}
+        self._sorted_ids: dict[bool | None, list[int]] = {None: [], True: [], False: []}
+        self._sorted_usernames: dict[bool | None, list[str]] = {None: [], True: [], False: []}
+
+    def get_by_username(self, username: str) -> UserModel | None:
+        return self._by_username.get(username)
+
+    def save(self, user: UserModel) -> UserModel | None:
+        with self._lock:
+            is_update = user.id is not None and user.id in self._by_id
+            if user.id is None:
+                user.id = self._last_id + 1
+            self._last_id = max(self._last_id, user.id)
+            if user.is_active is None:
+                user.is_active = True
+            current = self._by_username.get(user.username)
+            if current is not None and current.id != user.id:
+                raise ValueError(f"Username {user.username!r} already exists")
+            if is_update:
+                self._unindex(user.id)
+            self._index(user)
+        if is_update:
+            # user claims embedded in tokens are stale now
+            get_profile_versions().bump(user.id)
+        get_change_hub().publish("updated" if is_update else "created", UserDTO.model_validate(user).model_dump())
+        return user
+
+    def delete(self, user: UserModel) -> None:
+        with self._lock:
+            if user.id in self._by_id:
+                self._unindex(user.id)
+        get_profile_versions().bump(user.id)
+        get_change_hub().publish("deleted", {"id": user.id})
+
+    def get_by_id(self, id: int) -> UserModel | None:
+        return self._by_id.get(parse_user_id(id))
+
+    def get_by_ids(self, ids: list[int]) -> list[UserModel]:
+        return [self._by_id[id] for id in dict.fromkeys(ids) if id in self._by_id]
+
+    def delete_all(self) -> None:
+        with self._lock:
+            self._by_id.clear()
+            self._by_username.clear()
+            self._indexed.clear()
+            for index in [*self._sorted_ids.values(), *self._sorted_usernames.values()]:
+                index.clear()
+        get_profile_versions().bump_all()
+        get_change_hub().publish("cleared")
+
+    def get_id_bounds(self) -> tuple[int, int] | None:
+        with self._lock:
+            ids = self._sorted_ids[None]
+            return (ids[0], ids[-1]) if ids else None
+
+    def next_id_range(self, after_id: int, size: int) -> tuple[int, int] | None:
+        with self._lock:
+            ids = self._sorted_ids[None]
+            start = bisect_right(ids, after_id)
+            chunk = ids[start:start + size]
+            return (chunk[0], chunk[-1]) if chunk else None
+
+    def delete_id_range(self, first_id: int, last_id: int) -> int:
+        with self._lock:
+            ids = self._sorted_ids[None]
+            doomed = ids[bisect_left(ids, first_id):bisect_right(ids, last_id)]
+            for id in doomed:
+                self._unindex(id)
+        get_profile_versions().bump_all()
+        get_change_hub().publish("deleted_range", {"first_id": first_id, "last_id": last_id})
+        return len(doomed)
+
+    def user_does_exist(self, username: str) -> bool:
+        return username in self._by_username
+
+    def get_users(self, offset: int, limit: int, is_active: bool | None = None, sort_by: str = "id", order: str = "asc") -> list[UserModel]:
+        with self._lock:
+            if sort_by == "username":
+                keys, lookup = self._sorted_usernames[is_active], self._by_username
+            else:
+                keys, lookup = self._sorted_ids[is_active], self._by_id
+            if order == "desc":
+                end = max(len(keys) - offset, 0)
+                page = keys[max(end - limit, 0):end][::-1]
+            else:
+                page = keys[offset:offset + limit]
+            return [lookup[key] for key in page]
+
+    def search_by_username_prefix(self, prefix: str, limit: int, after: str | None = None) -> list[UserModel]:
+        with self._lock:
+            usernames = self._sorted_usernames[None]
+            start = bisect_right(usernames, after) if after is not None and after >= prefix else bisect_left(usernames, prefix)
+            page = []
+            for username in usernames[start:start + limit]:
+                if not username.startswith(prefix):
+                    break
+                page.append(self._by_username[username])
+            return page
+
+    def get_count(self, is_active: bool | None = None) -> int:
+        return len(self._sorted_ids[is_active])
+
+    def get_total_pages(self, limit: int) -> int:
+        return self.get_count() // limit + 1 if self.get_count() % limit != 0 else self.get_count() // limit
+
+    def _index(self, user: UserModel) -> None:
+        is_active = bool(user.is_active)
+        self._by_id[user.id] = user
+        self._by_username[user.username] = user
+        self._indexed[user.id] = (user.username, is_active)
+        for key in (None, is_active):
+            insort(self._sorted_ids[key], user.id)
+            insort(self._sorted_usernames[key], user.username)
+
+    def _unindex(self, id: int) -> None:
+        username, is_active = self._indexed.pop(id)
+        del self._by_id[id]
+        del self._by_username[username]
+        for key in (None, is_active):
+            ids = self._sorted_ids[key]
+            del ids[bisect_left(ids, id)]
+            usernames = self._sorted_usernames[key]
+            del usernames[bisect_left(usernames, username)]
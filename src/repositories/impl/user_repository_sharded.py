@@ -0,0 +1,125 @@
+import heapq
+import zlib
+from functools import lru_cache
+from itertools import islice
+from operator import attrgetter
+from sqlalchemy import ScalarSelect, func, inspect, select
+from src.database.models.user import User as UserModel
+from src.dependencies.events_di import get_change_hub
+from src.repositories.user_repository import UserRepository, parse_user_id
+from src.repositories.impl.user_repository_sql_alchemy import UserRepository as SQLAlchemyUserRepository
+
+# Usernames hash into this many buckets and buckets are spread over the shards (bucket % shards),
+# so it is also the maximum number of shards. Changing it changes where every user lives.
+SHARD_BUCKETS = 1024
+
+
+def username_bucket(username: str) -> int:
+    """Stable across processes and restarts, unlike hash()."""
+    return zlib.crc32(username.encode("utf-8")) % SHARD_BUCKETS
+
+
+def id_bucket(id: int) -> int:
+    return id % SHARD_BUCKETS
+
+
+@lru_cache
+def _next_id(bucket: int) -> ScalarSelect:
+    """
+    Id of a new user of `bucket` on its shard, computed inside the INSERT itself: the statement
+    holds the shard's write lock while reading max(id), so concurrent writers never get the same id.
+    """
+    return select((func.coalesce(func.max(UserModel.id), 0) // SHARD_BUCKETS + 1) * SHARD_BUCKETS + bucket).scalar_subquery()
+
+
+class ShardedUserRepository(UserRepository):
+    """
+    UserRepository over several SQLite databases, one SQLAlchemy UserRepository per shard.
+
+    A user lives on the shard of its username's bucket (crc32 % SHARD_BUCKETS) and its id is
+    `n * SHARD_BUCKETS + bucket`, so ids are unique across shards and a lookup by id or by
+    username goes to a single shard. The username is therefore the shard key and cannot change.
+    Unique usernames are enforced by each shard's index, equal usernames share a shard.
+
+    get_users, search_by_username_prefix and counts query every shard and merge the sorted
+    results, a page at `offset` reads `offset + limit` rows from each shard.
+    Since ids carry the bucket rather than the shard, resharding (src.database.reshard) moves
+    rows between databases without changing any id.
+    """
+
+    def __init__(self, shards: list[SQLAlchemyUserRepository]):
+        if not 0 < len(shards) <= SHARD_BUCKETS:
+            raise ValueError(f"Between 1 and {SHARD_BUCKETS} shards are supported, got {len(shards)}")
+        self.shards = shards
+
+    def shard_for_username(self, username: str) -> SQLAlchemyUserRepository:
+        return self.shards[username_bucket(username) % len(self.shards)]
+
+    def shard_for_id(self, id: int) -> SQLAlchemyUserRepository:
+        return self.shards[id_bucket(id) % len(self.shards)]
+
+    def get_by_username(self, username: str) -> UserModel | None:
+        return self.shard_for_username(username).get_by_username(username)
+
+    def save(self, user: UserModel) -> UserModel | None:
+        if user.id is None:
+            user.id = _next_id(username_bucket(user.username))
+        elif inspect(user).attrs.username.history.deleted:
+            raise ValueError("The username is the shard key of a user and cannot be changed")
+        return self.shard_for_username(user.username).save(user)
+
+    def delete(self, user: UserModel) -> None:
+        self.shard_for_id(user.id).delete(user)
+
+    def get_by_id(self, id: int) -> UserModel | None:
+        key = parse_user_id(id)
+        return self.shard_for_id(key).get_by_id(key) if key is not None else None
+
+    def get_by_ids(self, ids: list[int]) -> list[UserModel]:
+        by_shard: dict[int, list[int]] = {}
+        for id in ids:
+            by_shard.setdefault(id_bucket(id) % len(self.shards), []).append(id)
+        return [user for shard, shard_ids in by_shard.items() for user in self.shards[shard].get_by_ids(shard_ids)]
+
+    def delete_all(self) -> None:
+        for shard in self.shards:
+            shard.delete_all(publish=False)
+        # one event for the whole repository, once every shard is empty
+        get_change_hub().publish("cleared")
+
+    def get_id_bounds(self) -> tuple[int, int] | None:
+        bounds = [bounds for shard in self.shards if (bounds := shard.get_id_bounds()) is not None]
+        if not bounds:
+            return None
+        return min(first_id for first_id, _ in bounds), max(last_id for _, last_id in bounds)
+
+    def next_id_range(self, after_id: int, size: int) -> tuple[int, int] | None:
+        # ending at the lowest of the shards' chunk ends keeps every shard's delete within `size` rows
+        ranges = [chunk for shard in self.shards if (chunk := shard.next_id_range(after_id, size)) is not None]
+        if not ranges:
+            return None
+        return min(first_id for first_id, _ in ranges), min(last_id for _, last_id in ranges)
+
+    def delete_id_range(self, first_id: int, last_id: int) -> int:
+        deleted = sum(shard.delete_id_range(first_id, last_id, publish=False) for shard in self.shards)
+        get_change_hub().publish("deleted_range", {"first_id": first_id, "last_id": last_id})
+        return deleted
+
+    def user_does_exist(self, username: str) -> bool:
+        return self.shard_for_username(username).user_does_exist(username)
+
+    def get_users(self, offset: int, limit: int, is_active: bool | None = None, sort_by: str = "id", order: str = "asc") -> list[UserModel]:
+        pages = [shard.get_users(0, offset + limit, is_active=is_active, sort_by=sort_by, order=order) for shard in self.shards]
+        key = attrgetter("username" if sort_by == "username" else "id")
+        return list(islice(heapq.merge(*pages, key=key, reverse=order == "desc"), offset, offset + limit))
+
+    def search_by_username_prefix(self, prefix: str, limit: int, after: str | None = None) -> list[UserModel]:
+        pages = [shard.search_by_username_prefix(prefix, limit, after) for shard in self.shards]
+        return list(islice(heapq.merge(*pages, key=attrgetter("username")), limit))
+
+    def get_count(self, is_active: bool | None = None) -> int:
+        return sum(shard.get_count(is_active) for shard in self.shards)
+
+    def get_total_pages(self, limit: int) -> int:
+        count = self.get_count()
+        return count // limit + 1 if count % limit != 0 else count // limit
@@ -1,40 +1,133 @@
+from functools import lru_cache
 from sqlalchemy.orm import Session
-from sqlalchemy import exists
+from sqlalchemy import Select, select, exists, func, delete, bindparam, inspect
 from src.database.models.user import User as UserModel
-from src.repositories.user_repository import UserRepository
+from src.repositories.user_repository import UserRepository, parse_user_id
+from src.dependencies.sessions_di import get_profile_versions
+from src.dependencies.events_di import get_change_hub
+from src.schemas.user import UserDTO
+
+# Statements are built once with bound parameters and reused on every call, so no call pays for
+# constructing them and each is compiled once into SQLAlchemy's compiled cache.
+_BY_USERNAME = select(UserModel).where(UserModel.username == bindparam("username")).limit(1)
+_USERNAME_EXISTS = select(exists().where(UserModel.username == bindparam("username")))
+_BY_IDS = select(UserModel).where(UserModel.id.in_(bindparam("ids", expanding=True)))
+_COUNT = select(func.count()).select_from(UserModel)
+_COUNT_BY_IS_ACTIVE = _COUNT.where(UserModel.is_active == bindparam("is_active"))
+_ID_BOUNDS = select(func.min(UserModel.id), func.max(UserModel.id))
+_IDS_AFTER = select(UserModel.id).where(UserModel.id > bindparam("after_id")).order_by(UserModel.id).limit(bindparam("size"))
+_DELETE_ID_RANGE = delete(UserModel).where(UserModel.id.between(bindparam("first_id"), bindparam("last_id")))
 
 class UserRepository(UserRepository):
     def __init__(self, db: Session):
         self.db = db
-    
+
     def get_by_username(self, username:str) -> UserModel | None: 
-        return self.db.query(UserModel).where(UserModel.username == username).first()
+        return self.db.scalars(_BY_USERNAME, {"username": username}).first()
 
     def save(self, user: UserModel) -> UserModel | None:
+        # not `user.id is not None`: new users of a sharded repository come with an id expression
+        is_update = inspect(user).has_identity
         self.db.add(user)
         self.db.commit()
         self.db.refresh(user)
+        if is_update:
+            # user claims embedded in tokens are stale now
+            get_profile_versions().bump(user.id)
+        get_change_hub().publish("updated" if is_update else "created", UserDTO.model_validate(user).model_dump())
         return user
     
     def delete(self, user: UserModel) -> None:
         self.db.delete(user)
         self.db.commit()
+        get_profile_versions().bump(user.id)
+        get_change_hub().publish("deleted", {"id": user.id})
     
     def get_by_id(self, id:int) -> UserModel | None:
-        return self.db.query(UserModel).where(UserModel.id == id).first()
+        key = parse_user_id(id)
+        # identity map first, so a user already loaded by this session costs no query
+        return self.db.get(UserModel, key) if key is not None else None
+
+    def get_by_ids(self, ids: list[int]) -> list[UserModel]:
+        if not ids:
+            return []
+        return list(self.db.scalars(_BY_IDS, {"ids": ids}))
+
+    def delete_all(self, publish: bool = True) -> None:
+        """`publish=False` leaves the event to a caller clearing several of them, ShardedUserRepository."""
+        self.db.execute(delete(UserModel))
+        self.db.commit()
+        get_profile_versions().bump_all()
+        if publish:
+            get_change_hub().publish("cleared")
+    
+    def get_id_bounds(self) -> tuple[int, int] | None:
+        first_id, last_id = self.db.execute(_ID_BOUNDS).one()
+        return (first_id, last_id) if first_id is not None else None
+
+    def next_id_range(self, after_id: int, size: int) -> tuple[int, int] | None:
+        ids = self.db.scalars(_IDS_AFTER, {"after_id": after_id, "size": size}).all()
+        return (ids[0], ids[-1]) if ids else None
 
-    def delete_all(self) -> None:
-        self.db.query(UserModel).delete()
+    def delete_id_range(self, first_id: int, last_id: int, publish: bool = True) -> int:
+        # a primary key range scan: the write lock is held for this chunk only
+        deleted = self.db.execute(_DELETE_ID_RANGE, {"first_id": first_id, "last_id": last_id}).rowcount
         self.db.commit()
+        get_profile_versions().bump_all()
+        if publish:
+            get_change_hub().publish("deleted_range", {"first_id": first_id, "last_id": last_id})
+        return deleted
     
     def user_does_exist(self, username:str) -> bool:
-        return self.db.query(exists().where(UserModel.username == username)).scalar()
+        return self.db.scalar(_USERNAME_EXISTS, {"username": username})
     
-    def get_users(self, offset: int, limit: int) -> list[UserModel]:
-        return self.db.query(UserModel).offset(offset).limit(limit).all()
+    def get_users(self, offset: int, limit: int, is_active: bool | None = None, sort_by: str = "id", order: str = "asc") -> list[UserModel]:
+        # Every filter/sort combination is served by an index: the primary key, ix_user_username,
+        # ix_user_is_active_id or ix_user_is_active_username
+        statement = _page_statement(is_active is not None, sort_by, order)
+        return list(self.db.scalars(statement, {"is_active": is_active, "offset": offset, "limit": limit}))
     
-    def get_count(self) -> int:
-        return self.db.query(UserModel).count()
+    def search_by_username_prefix(self, prefix: str, limit: int, after: str | None = None) -> list[UserModel]:
+        # A half-open range on username instead of LIKE 'x%' so SQLite can scan ix_user_username
+        upper_bound = _prefix_upper_bound(prefix)
+        statement = _prefix_statement(upper_bound is not None, after is not None)
+        return list(self.db.scalars(statement, {"prefix": prefix, "upper_bound": upper_bound, "after": after, "limit": limit}))
+
+    def get_count(self, is_active: bool | None = None) -> int:
+        if is_active is None:
+            return self.db.scalar(_COUNT)
+        return self.db.scalar(_COUNT_BY_IS_ACTIVE, {"is_active": is_active})
     
     def get_total_pages(self, limit: int) -> int:
-        return self.get_count() // limit + 1 if self.get_count() % limit != 0 else self.get_count() // limit
\ No newline at end of file
+        count = self.get_count()
+        return count // limit + 1 if count % limit != 0 else count // limit
+
+
+def _prefix_upper_bound(prefix: str) -> str | None:
+    """Smallest string greater than every string starting with prefix, None if unbounded."""
+    for i in range(len(prefix) - 1, -1, -1):
+        if ord(prefix[i]) < 0x10FFFF:
+            return prefix[:i] + chr(ord(prefix[i]) + 1)
+    return None
+
+
+@lru_cache
+def _page_statement(filtered: bool, sort_by: str, order: str) -> Select:
+    """get_users statement for one filter/sort shape, there are 12 of them."""
+    column = UserModel.username if sort_by == "username" else UserModel.id
+    statement = select(UserModel)
+    if filtered:
+        statement = statement.where(UserModel.is_active == bindparam("is_active"))
+    statement = statement.order_by(column.desc() if order == "desc" else column.asc())
+    return statement.offset(bindparam("offset")).limit(bindparam("limit"))
+
+
+@lru_cache
+def _prefix_statement(bounded: bool, resumed: bool) -> Select:
+    """search_by_username_prefix statement, with or without an upper bound and an 'after' cursor."""
+    statement = select(UserModel).where(UserModel.username >= bindparam("prefix"))
+    if bounded:
+        statement = statement.where(UserModel.username < bindparam("upper_bound"))
+    if resumed:
+        statement = statement.where(UserModel.username > bindparam("after"))
+    return statement.order_by(UserModel.username).limit(bindparam("limit"))
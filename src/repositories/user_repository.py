@@ -19,22 +19,53 @@ class UserRepository(ABC):
     def get_by_id(self, id:int) -> UserModel | None:
         pass
 
+    @abstractmethod
+    def get_by_ids(self, ids: list[int]) -> list[UserModel]:
+        pass
+
     @abstractmethod
     def delete_all(self) -> None:
         pass
 
+    @abstractmethod
+    def get_id_bounds(self) -> tuple[int, int] | None:
+        """Lowest and highest user id, None without users."""
+        pass
+
+    @abstractmethod
+    def next_id_range(self, after_id: int, size: int) -> tuple[int, int] | None:
+        """First and last id of the next `size` users with an id above after_id, None when there are none."""
+        pass
+
+    @abstractmethod
+    def delete_id_range(self, first_id: int, last_id: int) -> int:
+        """Deletes the users with first_id <= id <= last_id in one short transaction, returns how many."""
+        pass
+
     @abstractmethod
     def user_does_exist(self, username:str) -> bool:
         pass
 
     @abstractmethod
-    def get_users(self, offset: int, limit: int) -> list[UserModel]:
+    def get_users(self, offset: int, limit: int, is_active: bool | None = None, sort_by: str = "id", order: str = "asc") -> list[UserModel]:
+        pass
+
+    @abstractmethod
+    def search_by_username_prefix(self, prefix: str, limit: int, after: str | None = None) -> list[UserModel]:
         pass
 
     @abstractmethod
-    def get_count(self) -> int:
+    def get_count(self, is_active: bool | None = None) -> int:
         pass
 
     @abstractmethod
     def get_total_pages(self, limit: int) -> int:  
         pass
+
+
+def parse_user_id(id: int | str) -> int | None:
+    """Primary key for an id taken from the path, None when it cannot be one (e.g. a UUID)."""
+    try:
+        return int(id)
+    except (TypeError, ValueError):
+        return None
@@ -1,9 +1,10 @@
 # general imports to every file in this directory
 from fastapi import APIRouter
 from fastapi import status, APIRouter, Depends, Response, Request
-from src.core.decorators import public
+from src.core.decorators import public, idempotent, deadline, concurrency_limit
 # imports to append APIRouters of dynamic way in the list routers
 import importlib
+import logging
 from pathlib import Path
 from typing import List
 
@@ -25,4 +26,4 @@ for file in current_dir.glob("*.py"):
             if isinstance(attr, APIRouter):
                 routers.append(attr)
     except ImportError as e:
-        print(f"Error while importing module {file.name}: {e}")
+        logging.getLogger(__name__).exception("Error while importing router module %s", file.name)
@@ -0,0 +1,67 @@
+from src.routers import *
+from typing import Literal
+from fastapi import HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from src.core.allocation_profiler import AllocationProfiler
+from src.dependencies.profiling_di import get_allocation_profiler
+from src.dependencies.services_di import get_admin_user
+from src.schemas.profiling import AllocationSiteDTO, RouteAllocationDTO, SnapshotDTO
+
+router = APIRouter(
+    prefix="/admin/profiling",
+    tags=["admin"],
+    dependencies=[Depends(get_admin_user)]
+)
+
+def get_enabled_profiler(profiler: AllocationProfiler = Depends(get_allocation_profiler)) -> AllocationProfiler:
+    if not profiler.enabled:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Allocation profiling is off, start the app with ALLOCATION_PROFILING=true")
+    return profiler
+
+ProfilerDep = Depends(get_enabled_profiler)
+GroupByQuery = Query("lineno", description="Group allocation sites by line, by file or by whole traceback")
+LimitQuery = Query(20, ge=1, le=200, description="Sites to return")
+
+@router.get("/routes", status_code=status.HTTP_200_OK, response_model=list[RouteAllocationDTO])
+async def route_allocations(profiler: AllocationProfiler = ProfilerDep) -> list[RouteAllocationDTO]:
+    """Memory left allocated by the requests of each route template in this worker, largest first."""
+    return [RouteAllocationDTO.model_validate(stats) for stats in profiler.routes()]
+
+@router.delete("/routes", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_route_allocations(profiler: AllocationProfiler = ProfilerDep) -> None:
+    profiler.reset_routes()
+
+@router.get("/top", status_code=status.HTTP_200_OK, response_model=list[AllocationSiteDTO])
+async def top_allocations(
+    limit: int = LimitQuery,
+    group_by: Literal["lineno", "filename", "traceback"] = GroupByQuery,
+    profiler: AllocationProfiler = ProfilerDep
+) -> list[AllocationSiteDTO]:
+    """Allocation sites holding the most memory right now."""
+    sites = await run_in_threadpool(profiler.top, limit, group_by)
+    return [AllocationSiteDTO.model_validate(site) for site in sites]
+
+@router.post("/snapshots", status_code=status.HTTP_201_CREATED, response_model=SnapshotDTO)
+async def take_snapshot(profiler: AllocationProfiler = ProfilerDep) -> SnapshotDTO:
+    """Keeps a snapshot of the traced memory, to diff against a later one."""
+    return SnapshotDTO.model_validate(await run_in_threadpool(profiler.take_snapshot))
+
+@router.get("/snapshots", status_code=status.HTTP_200_OK, response_model=list[SnapshotDTO])
+async def list_snapshots(profiler: AllocationProfiler = ProfilerDep) -> list[SnapshotDTO]:
+    return [SnapshotDTO.model_validate(snapshot) for snapshot in profiler.snapshots()]
+
+@router.get("/snapshots/{snapshot_id}/diff", status_code=status.HTTP_200_OK, response_model=list[AllocationSiteDTO])
+async def diff_snapshots(
+    snapshot_id: int,
+    base: int = Query(..., description="Id of the earlier snapshot to compare with"),
+    limit: int = LimitQuery,
+    group_by: Literal["lineno", "filename", "traceback"] = GroupByQuery,
+    profiler: AllocationProfiler = ProfilerDep
+) -> list[AllocationSiteDTO]:
+    """Allocation sites that grew the most between snapshot `base` and this one."""
+    snapshot, base_snapshot = profiler.get_snapshot(snapshot_id), profiler.get_snapshot(base)
+    for id, found in ((snapshot_id, snapshot), (base, base_snapshot)):
+        if found is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Snapshot {id} not found")
+    sites = await run_in_threadpool(profiler.diff, snapshot, base_snapshot, limit, group_by)
+    return [AllocationSiteDTO.model_validate(site) for site in sites]
@@ -0,0 +1,25 @@
+import time
+from src.routers import *
+from fastapi.responses import JSONResponse
+from src.core.health import Readiness
+from src.dependencies.health_di import get_readiness
+from src.schemas.health import HealthDTO
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+@public
+@concurrency_limit(None)
+@router.get("/live", status_code=status.HTTP_200_OK, response_model=HealthDTO)
+async def live(readiness: Readiness = Depends(get_readiness)) -> HealthDTO:
+    """The process answers: restart it only when this fails, not while it warms up or drains."""
+    return HealthDTO(status="alive", uptime_seconds=round(time.time() - readiness.started_at, 3))
+
+@public
+@concurrency_limit(None)
+@router.get("/ready", status_code=status.HTTP_200_OK, response_model=HealthDTO, responses={503: {"model": HealthDTO}})
+async def ready(readiness: Readiness = Depends(get_readiness)):
+    """200 once warmed up, 503 while starting or draining so the load balancer sends traffic elsewhere."""
+    health = HealthDTO(status=readiness.state, uptime_seconds=round(time.time() - readiness.started_at, 3), warmup=readiness.warmup)
+    if not readiness.is_ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=health.model_dump())
+    return health
@@ -0,0 +1,11 @@
+from src.routers import *
+from fastapi.responses import PlainTextResponse
+from src.core.metrics import Metrics
+from src.dependencies.metrics_di import get_metrics
+
+router = APIRouter(tags=["metrics"])
+
+@concurrency_limit(None)
+@router.get("/metrics", status_code=status.HTTP_200_OK, response_class=PlainTextResponse)
+async def metrics(metrics: Metrics = Depends(get_metrics)) -> str:
+    return metrics.render()
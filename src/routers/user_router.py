@@ -1,7 +1,15 @@
 from src.routers import *
 from src.dependencies.services_di import get_user_service, get_injected_user_service
 from src.services.user_service import UserService
-from src.schemas.user import UserDTO
+from src.schemas.user import UserDTO, UserBatchDTO, UserSearchDTO
+from src.schemas.job import JobDTO
+import json
+from typing import AsyncIterator
+from fastapi import Query, Header
+from fastapi.responses import StreamingResponse
+from src.core.config import settings
+from src.core.change_hub import ChangeHub, Subscription
+from src.dependencies.events_di import get_change_hub
 from src.schemas.pagination import PaginationParams, get_pagination_params, PaginationResponse
 
 router = APIRouter(
@@ -11,16 +19,72 @@ router = APIRouter(
 )
 UserServiceDep = Depends(get_injected_user_service)
 
-@router.delete("", status_code=status.HTTP_200_OK)
-async def delete_all(user_service: UserService = UserServiceDep):
-    user_service.delete_all()
-    return {"message": "All users deleted"}
+@router.delete("", status_code=status.HTTP_202_ACCEPTED, response_model=JobDTO)
+async def delete_all(response: Response, user_service: UserService = UserServiceDep) -> JobDTO:
+    """Starts deleting every user in the background, follow it at the returned Location."""
+    job = user_service.delete_all()
+    response.headers["Location"] = f"/users/jobs/{job.id}"
+    return JobDTO.model_validate(job)
+
+@router.get("/jobs/{job_id}", status_code=status.HTTP_200_OK, response_model=JobDTO)
+async def get_job(job_id: str, user_service: UserService = UserServiceDep) -> JobDTO:
+    return JobDTO.model_validate(user_service.get_job(job_id))
 
 @router.get("/me", status_code=status.HTTP_200_OK, response_model=UserDTO)
 async def get_current_user(request: Request, user_service: UserService = UserServiceDep) -> UserDTO:
     user = user_service.get_current_user(request)
     return UserDTO.model_validate(user)
 
+@router.get("/batch", status_code=status.HTTP_200_OK, response_model=UserBatchDTO)
+async def get_users_by_ids(ids: list[int] = Query(..., description="User ids, repeated: ?ids=1&ids=2"), user_service: UserService = UserServiceDep) -> UserBatchDTO:
+    return user_service.get_users_by_ids(ids)
+
+@router.get("/search", status_code=status.HTTP_200_OK, response_model=UserSearchDTO)
+async def search_users(
+    prefix: str = Query(..., min_length=1, max_length=30, description="Username prefix"),
+    limit: int = Query(10, ge=1, le=100, description="Elements per page"),
+    after: str | None = Query(None, max_length=30, description="next_cursor of the previous page"),
+    user_service: UserService = UserServiceDep
+) -> UserSearchDTO:
+    return user_service.search_users(prefix, limit, after)
+
+@deadline(None)
+@concurrency_limit(None)
+@router.get("/changes", status_code=status.HTTP_200_OK, response_class=StreamingResponse)
+async def user_changes(
+    after: int | None = Query(None, ge=0, description="Id of the last event seen, resumes right after it"),
+    last_event_id: int | None = Header(None, alias="Last-Event-ID"),
+    hub: ChangeHub = Depends(get_change_hub)
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream of user changes: created, updated (UserDTO), deleted ({"id"}),
+    deleted_range ({"first_id", "last_id"}, a chunk of DELETE /users) and cleared (every user).
+    A "reset" event means the resume point is gone: reload GET /users and follow from its id.
+    """
+    subscription = hub.subscribe(after if after is not None else last_event_id)
+    return StreamingResponse(
+        _stream_changes(hub, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def _stream_changes(hub: ChangeHub, subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        while True:
+            event = await subscription.get(timeout=settings.CHANGE_FEED_HEARTBEAT_SECONDS)
+            if event is not None:
+                yield f"id: {event.id}\nevent: {event.type}\ndata: {json.dumps(event.data)}\n\n"
+            elif subscription.evicted:
+                # too slow to keep up, the client reconnects with Last-Event-ID
+                yield "event: evicted\ndata: {}\n\n"
+                return
+            elif subscription.closed:
+                return
+            else:
+                yield ": keep-alive\n\n"
+    finally:
+        hub.unsubscribe(subscription)
+
 @router.get("/{id}", status_code=status.HTTP_200_OK, response_model=UserDTO)
 async def get_user_by_id(id:str, user_service: UserService = UserServiceDep) -> UserDTO:
     user = user_service.get_user_by_id(id)
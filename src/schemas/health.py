@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class HealthDTO(BaseModel):
+    status: str
+    uptime_seconds: float
+    # seconds spent in each warmup step, readiness only
+    warmup: Optional[dict[str, float]] = None
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class JobDTO(BaseModel):
+    model_config = {"from_attributes": True}
+
+    id: str
+    kind: str
+    state: str
+    total: int
+    processed: int
+    progress: float
+    throughput: float
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
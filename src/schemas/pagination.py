@@ -1,10 +1,16 @@
 from pydantic import BaseModel, Field
 from fastapi import Query
-from typing import List
+from typing import List, Literal, Optional
+
+SortBy = Literal["id", "username"]
+SortOrder = Literal["asc", "desc"]
 
 class PaginationParams(BaseModel):
     page: int = Field(default=1, ge=1)
     limit: int = Field(default=10, ge=1, le=100)  
+    is_active: Optional[bool] = None
+    sort_by: SortBy = "id"
+    order: SortOrder = "asc"
     @property
     def offset(self) -> int:
         return (self.page - 1) * self.limit
@@ -12,8 +18,11 @@ class PaginationParams(BaseModel):
 def get_pagination_params(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(10, ge=1, le=100, description="Elements per page"), 
+    is_active: Optional[bool] = Query(None, description="Only active (true) or inactive (false) users"),
+    sort_by: SortBy = Query("id", description="Field to sort by"),
+    order: SortOrder = Query("asc", description="Sort direction"),
 ) -> PaginationParams:
-    return PaginationParams(page=page, limit=limit)
+    return PaginationParams(page=page, limit=limit, is_active=is_active, sort_by=sort_by, order=order)
 
 class PaginationResponse(BaseModel):
     model_config = {"from_attributes": True}
@@ -21,4 +30,4 @@ class PaginationResponse(BaseModel):
     page: int
     limit: int
     total_pages: int
-    total_results: int
\ No newline at end of file
+    total_results: int
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+
+class RouteAllocationDTO(BaseModel):
+    model_config = {"from_attributes": True}
+
+    route: str
+    requests: int
+    allocated_bytes: int
+    allocations: int
+    max_allocated_bytes: int
+
+class AllocationSiteDTO(BaseModel):
+    model_config = {"from_attributes": True}
+
+    # file:line, most recent call first
+    location: list[str]
+    size_bytes: int
+    count: int
+    size_diff_bytes: int = 0
+    count_diff: int = 0
+
+class SnapshotDTO(BaseModel):
+    model_config = {"from_attributes": True}
+
+    id: int
+    taken_at: float
+    traced_bytes: int
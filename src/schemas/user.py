@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 
 class RegisterUserDTO(BaseModel):
     username: str = Field(..., min_length=3, max_length=30, description="Name must be between 3 and 30 characters.")
@@ -12,6 +12,15 @@ class UserDTO(BaseModel):
     username: str
     is_active: Optional[bool] = True
 
+class UserBatchDTO(BaseModel):
+    results: List[UserDTO]
+    missing: List[int] = []
+
+class UserSearchDTO(BaseModel):
+    results: List[UserDTO]
+    limit: int
+    next_cursor: Optional[str] = None
+
 class LoginUserDTO(BaseModel):
     username: str = Field(..., min_length=3, max_length=30, description="Name must be between 3 and 30 characters.")
     password: str = Field(..., min_length=8, description="Password must be at least 8 characters.")
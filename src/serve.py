@@ -0,0 +1,214 @@
+"""
+Production entry point: a pre-forking supervisor around uvicorn.
+
+    poetry run python -m src.serve --host 0.0.0.0 --port 8000
+
+The app is imported once in this process and the socket bound here, then WEB_CONCURRENCY workers
+(one per CPU of the container's quota when 0) are forked, so workers share the imported modules
+copy-on-write and the listening socket. Each worker runs its own event loop, uvloop and the
+httptools parser when installed, and only reports ready once the app lifespan has warmed it up,
+see src.core.warmup and /health/ready. SIGTERM and SIGINT are passed on to the workers, which
+finish their requests, and a worker that dies is replaced.
+
+Several workers do not share their process-local state, see multi_worker_problems(): the
+configurations that would lose or corrupt data are refused, the others only warned about.
+"""
+import argparse
+import logging
+import math
+import os
+import signal
+import socket
+import sys
+import time
+from importlib.util import find_spec
+
+from src.core.structured_logging import setup_logging
+
+CGROUP_V2_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_V1_CPU_QUOTA = "/sys/fs/cgroup/cpu/cpu.cfs_quota_us"
+CGROUP_V1_CPU_PERIOD = "/sys/fs/cgroup/cpu/cpu.cfs_period_us"
+# a worker crashing again within this many seconds of starting is restarted after a pause
+RESTART_BACKOFF_SECONDS = 1.0
+
+# run as __main__, named for the "src" logger of structured_logging
+logger = logging.getLogger("src.serve")
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path) as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_quota(
+    cpu_max: str = CGROUP_V2_CPU_MAX,
+    cfs_quota: str = CGROUP_V1_CPU_QUOTA,
+    cfs_period: str = CGROUP_V1_CPU_PERIOD,
+) -> float | None:
+    """CPUs the container may use per its cgroup (v2, else v1), None when unlimited or not in one."""
+    if (limit := _read(cpu_max)) is not None:
+        quota, _, period = limit.partition(" ")
+        if quota == "max" or not period:
+            return None
+        return int(quota) / int(period)
+    quota, period = _read(cfs_quota), _read(cfs_period)
+    if quota is None or period is None or int(quota) <= 0:
+        return None
+    return int(quota) / int(period)
+
+
+def available_cpus(**cgroup_paths: str) -> float:
+    """The cgroup quota when lower than the CPUs this process may run on, os.cpu_count() counts the host's."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    quota = cgroup_cpu_quota(**cgroup_paths)
+    return min(cpus, quota) if quota is not None else cpus
+
+
+def worker_count(configured: int | None = None, **cgroup_paths: str) -> int:
+    """WEB_CONCURRENCY when set, else (0) one worker per available CPU, a 1.5 CPU quota getting 2."""
+    if configured:
+        return configured
+    return max(1, math.ceil(available_cpus(**cgroup_paths)))
+
+
+def multi_worker_problems(settings) -> tuple[list[str], list[str]]:
+    """
+    What goes wrong when several workers serve `settings`: problems that lose or corrupt data,
+    then state each worker keeps to itself, so a request may see another worker's view of it.
+    """
+    errors, warnings = [], []
+    if settings.USER_REPOSITORY == "memory":
+        errors.append("USER_REPOSITORY=memory: each worker has its own users")
+    if settings.SESSION_MODE == "server" and settings.SESSION_STORE == "memory":
+        errors.append("SESSION_STORE=memory: a session only exists in the worker that created it, use SESSION_STORE=sqlite")
+    if settings.REVOCATION_JOURNAL_PATH:
+        errors.append("REVOCATION_JOURNAL_PATH: workers would append to one journal and replace it under each other when compacting")
+    if settings.SESSION_MODE == "jwt":
+        warnings.append("logouts and DELETE /users only revoke tokens in the worker serving them, use SESSION_MODE=server")
+    warnings.append("DELETE /users jobs, Idempotency-Key replays and the /users/changes feed are per worker")
+    return errors, warnings
+
+
+def event_loop() -> str:
+    return "uvloop" if find_spec("uvloop") else "asyncio"
+
+
+def http_parser() -> str:
+    return "httptools" if find_spec("httptools") else "h11"
+
+
+def bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket) -> None:
+    import uvicorn
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(
+        app,
+        loop=event_loop(),
+        http=http_parser(),
+        lifespan="on",
+        # requests are logged by AccessLogMiddleware
+        access_log=False,
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    """Forks the workers, replaces those that die and forwards shutdown signals to them."""
+
+    def __init__(self, app, sock: socket.socket, workers: int):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.children: dict[int, float] = {}
+        self.stopping = False
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.sock)
+            except BaseException:
+                logger.exception("Worker %s crashed", os.getpid())
+                code = 1
+            finally:
+                # os._exit skips atexit, so the log writer is flushed here
+                setup_logging().stop()
+                # never fall back into the supervisor loop of the parent
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+
+    def stop(self, signum, frame) -> None:
+        self.stopping = True
+        for pid in self.children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started_at = self.children.pop(pid, None)
+            if self.stopping or started_at is None:
+                continue
+            logger.warning("Worker exited, restarting", extra={"fields": {"pid": pid, "exit_code": os.waitstatus_to_exitcode(status)}})
+            if time.monotonic() - started_at < RESTART_BACKOFF_SECONDS:
+                time.sleep(RESTART_BACKOFF_SECONDS)
+            self.spawn()
+        return 0
+
+
+def main() -> None:
+    from src.core.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=settings.WEB_CONCURRENCY, help="0: one per CPU of the container's quota")
+    args = parser.parse_args()
+
+    # preloaded: workers inherit the imported app instead of each importing it
+    from src.main import app
+
+    workers = worker_count(args.workers)
+    if workers > 1:
+        errors, warnings = multi_worker_problems(settings)
+        for problem in errors:
+            logger.error("Refusing to start %s workers: %s", workers, problem)
+        if errors:
+            sys.exit(2)
+        for problem in warnings:
+            logger.warning("State not shared between workers: %s", problem)
+    sock = bind(args.host, args.port)
+    logger.info(
+        "Serving",
+        extra={"fields": {"address": f"{args.host}:{args.port}", "workers": workers, "loop": event_loop(), "http": http_parser()}},
+    )
+    sys.exit(Supervisor(app, sock, workers).run())
+
+
+if __name__ == "__main__":
+    main()
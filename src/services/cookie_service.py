@@ -1,19 +1,45 @@
+import secrets
+import time
 from datetime import datetime, timedelta, timezone 
 from src.database.models.user import User
 from src.core.config import settings
+from src.sessions.session_store import SessionStore
+from src.sessions.revocation_store import RevocationStore
+from src.sessions.profile_versions import ProfileVersions
+from src.dependencies.sessions_di import get_session_store, get_revocation_store, get_profile_versions, get_refreshed_tokens, get_slid_sessions
+from src.schemas.user import UserDTO
+from src.codecs.jwt_codec import JWTCodec
+from src.dependencies.codecs_di import get_jwt_codec
 from jose import jwt, JWTError
-from fastapi import Response
+from fastapi import Request, Response
 
 class CookieService:
-    def __init__(self):
+    def __init__(
+        self,
+        session_store: SessionStore | None = None,
+        revocation_store: RevocationStore | None = None,
+        codec: JWTCodec | None = None,
+        profile_versions: ProfileVersions | None = None
+    ):
         self.secret_key = settings.SECRET_KEY
         self.algorithm = settings.ALGORITHM
         self.expiration_time = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+        self.refresh_window = settings.TOKEN_REFRESH_WINDOW_MINUTES
         self.secure = settings.COOKIE_SECURE
         self.key = "token"
+        # With a session store the cookie holds an opaque session id instead of a JWT
+        if session_store is None and settings.SESSION_MODE == "server":
+            session_store = get_session_store()
+        self.session_store = session_store
+        self.revocation_store = revocation_store if revocation_store is not None else get_revocation_store()
+        self.codec = codec or get_jwt_codec(settings.JWT_BACKEND, self.secret_key, self.algorithm)
+        self.embed_user_claims = settings.TOKEN_EMBED_USER_CLAIMS
+        self.profile_versions = profile_versions if profile_versions is not None else get_profile_versions()
         
     def set_cookie(self, response: Response, user: User):
-        token = self.create_token(user)
+        self.set_token_cookie(response, self.create_token(user))
+
+    def set_token_cookie(self, response: Response, token: str):
         response.set_cookie(
             key="token",
             value=token,
@@ -26,39 +52,123 @@ class CookieService:
             key=self.key,
             path="/"
         )
+
+    def revoke_token(self, token: str | None):
+        """Invalidates the token server-side, a revoked JWT is rejected until its exp."""
+        if not token:
+            return
+        if self.session_store is not None:
+            self.session_store.delete(token)
+            return
+        try:
+            payload = self.codec.decode(token)
+        except JWTError:
+            return # already invalid or expired
+        if payload.get("jti"):
+            self.revocation_store.revoke(payload["jti"], payload["exp"], payload.get("iat", 0))
+
+    def revoke_all(self):
+        """Invalidates every token issued until now."""
+        if self.session_store is not None:
+            self.session_store.clear()
+        self.revocation_store.revoke_issued_before(round(time.time(), 6))
     
-    def create_token(self, user: User) -> str:
+    def create_token(self, user: User, embed_user_claims: bool | None = None) -> str:
         encode = {"sub": user.username, "id": user.id}
-        expires = datetime.now(timezone.utc) + timedelta(minutes=self.expiration_time)
-        encode.update({"exp": expires})
-        return jwt.encode(
-            encode,
-            self.secret_key,
-            algorithm=self.algorithm
-        )
+        if self.session_store is not None:
+            session_id = self.session_store.create(encode, ttl_seconds=self.expiration_time * 60)
+            # created with a full lifetime, nothing to slide until the next refresh window
+            get_slid_sessions().set(session_id, True)
+            return session_id
+        if self.embed_user_claims if embed_user_claims is None else embed_user_claims:
+            # usr/pv: the UserDTO at issue time and the profile version it was read at
+            encode.update({"usr": UserDTO.model_validate(user).model_dump(), "pv": self.profile_versions.stamp(user.id)})
+        return self._sign(encode)
+
+    def refresh_token(self, payload: dict, token: str | None = None) -> str | None:
+        """
+        A fresh token for a validated payload that expires within the refresh window, None otherwise.
+        Outside the window nothing is signed; inside it, every request carrying the same token
+        gets the same replacement. A server-side session `token` slides in the store instead and
+        keeps its id, see slide_session.
+        """
+        if self.session_store is not None:
+            if self.refresh_window and token:
+                self.slide_session(token)
+            return None
+        if not self.refresh_window or "exp" not in payload or "jti" not in payload:
+            return None
+        remaining = payload["exp"] - time.time()
+        if remaining > self.refresh_window * 60:
+            return None
+        claims = {key: value for key, value in payload.items() if key not in ("exp", "iat", "jti")}
+        if "usr" in claims and not self.profile_versions.is_current(claims["id"], claims.get("pv")):
+            claims.pop("usr")
+            claims.pop("pv", None)
+        return get_refreshed_tokens().get_or_set(payload["jti"], lambda: self._sign(claims), ttl_seconds=max(remaining, 1))
+
+    def slide_session(self, session_id: str) -> bool:
+        """
+        Extends a server-side session to a full ACCESS_TOKEN_EXPIRE_MINUTES from now, at most once
+        per refresh window and process so active sessions do not write to the store on every request.
+        """
+        slid = get_slid_sessions()
+        if slid.get(session_id):
+            return False
+        slid.set(session_id, True)
+        return self.session_store.touch(session_id, ttl_seconds=self.expiration_time * 60)
+
+    def _sign(self, encode: dict) -> str:
+        issued_at = datetime.now(timezone.utc)
+        expires = issued_at + timedelta(minutes=self.expiration_time)
+        # sub-second iat: revoke_all's floor is sub-second too, a token issued right after it must pass
+        encode.update({"exp": int(expires.timestamp()), "iat": round(issued_at.timestamp(), 6), "jti": secrets.token_urlsafe(16)})
+        return self.codec.encode(encode)
     
     def get_user_id_from_token(self, request: Response) -> str:
         token = self.get_token(request)
         if not token:
             return None
+        if self.session_store is not None:
+            claims = self.session_store.get(token)
+            return claims.get("id") if claims else None
         try:
-            payload = jwt.decode(
-                token,
-                self.secret_key,
-                algorithms=[self.algorithm]
-            )
+            payload = self.codec.decode(token)
+            if self.revocation_store.is_revoked(payload.get("jti"), payload.get("iat")):
+                return None
             return payload.get("id")
         except jwt.ExpiredSignatureError:
             return None
         except JWTError:
             return None
     
+    def get_user_from_claims(self, request: Request) -> UserDTO | None:
+        """
+        The user embedded in the token if its profile version is still current, None otherwise.
+        Reads the claims the auth middleware validated (request.state.token_claims), not the cookie.
+        """
+        payload = getattr(request.state, "token_claims", None)
+        if not payload or "usr" not in payload:
+            return None
+        if not self.profile_versions.is_current(payload["id"], payload.get("pv")):
+            return None
+        return UserDTO.model_validate(payload["usr"])
+
     def get_token(self, request: Response) -> str:
         return request.cookies.get(self.key)
     
-    def validate_token(self, token: str):
+    def validate_token(self, token: str) -> dict:
+        """The token claims, raises JWTError if the token is missing, invalid, expired or revoked."""
         if token is None or token.strip() == "":
             raise JWTError("Token is None")
-        jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        if self.session_store is not None:
+            claims = self.session_store.get(token)
+            if claims is None:
+                raise JWTError("Session not found or expired")
+            return claims
+        payload = self.codec.decode(token)
+        if self.revocation_store.is_revoked(payload.get("jti"), payload.get("iat")):
+            raise JWTError("Token revoked")
+        return payload
 
-       
\ No newline at end of file
+       
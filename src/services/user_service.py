@@ -1,20 +1,40 @@
 from src.database.models.user import User
 from src.repositories.impl.user_repository_sql_alchemy import UserRepository
-from src.schemas.user import RegisterUserDTO, LoginUserDTO
+from src.schemas.user import RegisterUserDTO, LoginUserDTO, UserBatchDTO, UserSearchDTO, UserDTO
 from fastapi import HTTPException, status, Response, Request
 from src.services.cookie_service import CookieService
 from src.schemas.pagination import PaginationParams, PaginationResponse
+from src.core.config import settings
+from src.core.deadline import check_deadline
+from src.jobs.job_registry import Job, JobRegistry
+from src.sessions.verified_credentials import VerifiedCredentials
+from typing import Callable, ContextManager
 import bcrypt
+import time
 
 class UserService:
-    def __init__(self, user_repository:UserRepository, cookie_service: CookieService):
+    def __init__(
+        self,
+        user_repository:UserRepository,
+        cookie_service: CookieService,
+        job_registry: JobRegistry | None = None,
+        user_repository_factory: Callable[[], ContextManager[UserRepository]] | None = None,
+        verified_credentials: VerifiedCredentials | None = None,
+    ):
         self.user_repository = user_repository
         self.cookie_service = cookie_service
+        self.job_registry = job_registry
+        # repositories with their own session, for background jobs
+        self.user_repository_factory = user_repository_factory
+        # logins that passed bcrypt recently (LOGIN_CACHE_ENABLED), None to always run bcrypt
+        self.verified_credentials = verified_credentials
         
     def register(self, register_user_dto: RegisterUserDTO, response: Response) -> User:
         if self.user_repository.user_does_exist(register_user_dto.username):
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username already exists")
         
+        # hashing can take a while and cannot be interrupted, do not start it past the deadline
+        check_deadline()
         password_bytes = register_user_dto.password.encode('utf-8')
         salt = bcrypt.gensalt()
         password_hashed = bcrypt.hashpw(password_bytes, salt)
@@ -28,19 +48,59 @@ class UserService:
         user = self.user_repository.get_by_username(login_user_dto.username)
         if not user or user is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        is_valid_password = bcrypt.checkpw(login_user_dto.password.encode('utf-8'), user.password.encode('utf-8'))
-        if not is_valid_password:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password")
+        password_bytes = login_user_dto.password.encode('utf-8')
+        if self.verified_credentials is None or not self.verified_credentials.is_verified(user.username, password_bytes, user.password):
+            check_deadline()
+            is_valid_password = bcrypt.checkpw(password_bytes, user.password.encode('utf-8'))
+            if not is_valid_password:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password")
+            if self.verified_credentials is not None:
+                self.verified_credentials.remember(user.username, password_bytes, user.password)
         self.cookie_service.set_cookie(response, user)
         return user
         
-    def delete_all(self):
-        self.user_repository.delete_all()
+    def delete_all(self) -> Job:
+        """Revokes every token right away and deletes the users in a background job, see delete_all_in_chunks."""
+        self.cookie_service.revoke_all()
+        return self.job_registry.submit("delete_all", self.delete_all_in_chunks)
+
+    def delete_all_in_chunks(self, job: Job) -> None:
+        """
+        Deletes the users existing when the job starts, DELETE_ALL_CHUNK_SIZE ids per transaction,
+        so the SQLite write lock is only held briefly and logins and registrations can interleave.
+        """
+        with self.user_repository_factory() as user_repository:
+            bounds = user_repository.get_id_bounds()
+            if bounds is None:
+                return
+            first_id, last_id = bounds
+            job.total = user_repository.get_count()
+            after_id = first_id - 1
+            # keyset chunks rather than fixed id strides, ids may be sparse (e.g. sharded ones)
+            while (chunk := user_repository.next_id_range(after_id, settings.DELETE_ALL_CHUNK_SIZE)) is not None:
+                chunk_first_id, chunk_last_id = chunk[0], min(chunk[1], last_id)
+                if chunk_first_id > last_id:
+                    break
+                job.processed += user_repository.delete_id_range(chunk_first_id, chunk_last_id)
+                after_id = chunk_last_id
+                # give writers waiting on the lock a chance before taking it again
+                time.sleep(settings.DELETE_ALL_PAUSE_SECONDS)
+
+    def get_job(self, job_id: str) -> Job:
+        job = self.job_registry.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job with id {job_id} not found")
+        return job
         
-    def logout(self, response: Response):
+    def logout(self, response: Response, request: Request | None = None):
+        if request is not None:
+            self.cookie_service.revoke_token(self.cookie_service.get_token(request))
         self.cookie_service.clean_cookies(response)
 
     def get_current_user(self, request: Request):
+        user = self.cookie_service.get_user_from_claims(request)
+        if user is not None:
+            return user
         id = self.cookie_service.get_user_id_from_token(request)
         return self.get_user_by_id(id)
     
@@ -50,10 +110,33 @@ class UserService:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"User with id {id} not found")
         return user
     
+    def get_users_by_ids(self, ids: list[int]) -> UserBatchDTO:
+        unique_ids = list(dict.fromkeys(ids))
+        if len(unique_ids) > settings.MAX_BATCH_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Batch size must not exceed {settings.MAX_BATCH_SIZE} ids"
+            )
+        users_by_id = {user.id: user for user in self.user_repository.get_by_ids(unique_ids)}
+        return UserBatchDTO(
+            results=[UserDTO.model_validate(users_by_id[id]) for id in unique_ids if id in users_by_id],
+            missing=[id for id in unique_ids if id not in users_by_id]
+        )
+
+    def search_users(self, prefix: str, limit: int, after: str | None = None) -> UserSearchDTO:
+        # Fetch one extra row to know whether there is a next page without a COUNT(*)
+        users = self.user_repository.search_by_username_prefix(prefix, limit + 1, after)
+        page = users[:limit]
+        return UserSearchDTO(
+            results=[UserDTO.model_validate(user) for user in page],
+            limit=limit,
+            next_cursor=page[-1].username if len(users) > limit else None
+        )
+
     def list_users(self, params: PaginationParams) -> PaginationResponse:
         limit = params.limit
-        users = self.user_repository.get_users(params.offset, limit)
-        total_results = self.user_repository.get_count()
+        users = self.user_repository.get_users(params.offset, limit, params.is_active, params.sort_by, params.order)
+        total_results = self.user_repository.get_count(params.is_active)
         total_pages = (total_results + limit - 1) // limit if total_results > 0 else 0
         return PaginationResponse(
             results=users,
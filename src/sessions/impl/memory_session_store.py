@@ -0,0 +1,81 @@
+import secrets
+import threading
+import time
+from typing import Callable
+from src.core.timing_wheel import TimingWheel
+from src.sessions.session_store import SessionStore
+
+
+class _Shard:
+    def __init__(self, clock: Callable[[], float]):
+        self.lock = threading.Lock()
+        self.sessions: dict[str, tuple[dict, float]] = {}
+        self.wheel = TimingWheel(clock=clock)
+
+    def expire(self, now: float) -> None:
+        for session_id in self.wheel.advance(now):
+            entry = self.sessions.get(session_id)
+            # the session may have been touched after it was scheduled
+            if entry is not None and entry[1] <= now:
+                del self.sessions[session_id]
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Process-local session store split in shards, each with its own lock and timing wheel,
+    so concurrent requests rarely contend and expiry never scans the whole table.
+    Sessions do not survive a restart and are not shared between workers.
+    """
+
+    def __init__(self, shards: int = 16, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._shards = [_Shard(clock) for _ in range(shards)]
+
+    def _shard(self, session_id: str) -> _Shard:
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def create(self, claims: dict, ttl_seconds: float) -> str:
+        session_id = secrets.token_urlsafe(32)
+        shard = self._shard(session_id)
+        now = self.clock()
+        expires_at = now + ttl_seconds
+        with shard.lock:
+            shard.expire(now)
+            shard.sessions[session_id] = (claims, expires_at)
+            shard.wheel.schedule(session_id, expires_at)
+        return session_id
+
+    def get(self, session_id: str) -> dict | None:
+        shard = self._shard(session_id)
+        now = self.clock()
+        with shard.lock:
+            shard.expire(now)
+            entry = shard.sessions.get(session_id)
+        if entry is None or entry[1] <= now:
+            return None
+        return entry[0]
+
+    def touch(self, session_id: str, ttl_seconds: float) -> bool:
+        shard = self._shard(session_id)
+        now = self.clock()
+        with shard.lock:
+            entry = shard.sessions.get(session_id)
+            if entry is None or entry[1] <= now:
+                return False
+            expires_at = now + ttl_seconds
+            shard.sessions[session_id] = (entry[0], expires_at)
+            shard.wheel.schedule(session_id, expires_at)
+        return True
+
+    def delete(self, session_id: str) -> None:
+        shard = self._shard(session_id)
+        with shard.lock:
+            shard.sessions.pop(session_id, None)
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.sessions.clear()
+
+    def __len__(self) -> int:
+        return sum(len(shard.sessions) for shard in self._shards)
@@ -0,0 +1,76 @@
+import json
+import secrets
+import time
+from typing import Callable
+from sqlalchemy import create_engine, MetaData, Table, Column, String, Text, Float, Index, select, insert, update, delete, event
+from src.sessions.session_store import SessionStore
+
+metadata = MetaData()
+
+session_table = Table(
+    "session",
+    metadata,
+    Column("id", String(64), primary_key=True),
+    Column("claims", Text, nullable=False),
+    Column("expires_at", Float, nullable=False),
+    Index("ix_session_expires_at", "expires_at"),
+)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Persistent session store: sessions survive restarts and are shared by every worker
+    pointing to the same file. Expired rows are filtered on read and purged in bulk
+    through the expires_at index every `purge_every` writes instead of on every request.
+    """
+
+    def __init__(self, url: str, purge_every: int = 1000, clock: Callable[[], float] = time.time):
+        self.engine = create_engine(url, connect_args={"check_same_thread": False})
+        event.listen(self.engine, "connect", _set_sqlite_pragmas)
+        metadata.create_all(self.engine)
+        self.purge_every = purge_every
+        self.clock = clock
+        self._writes = 0
+
+    def create(self, claims: dict, ttl_seconds: float) -> str:
+        session_id = secrets.token_urlsafe(32)
+        now = self.clock()
+        with self.engine.begin() as connection:
+            connection.execute(insert(session_table).values(id=session_id, claims=json.dumps(claims), expires_at=now + ttl_seconds))
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                connection.execute(delete(session_table).where(session_table.c.expires_at <= now))
+        return session_id
+
+    def get(self, session_id: str) -> dict | None:
+        with self.engine.connect() as connection:
+            claims = connection.execute(
+                select(session_table.c.claims).where(session_table.c.id == session_id, session_table.c.expires_at > self.clock())
+            ).scalar()
+        return json.loads(claims) if claims is not None else None
+
+    def touch(self, session_id: str, ttl_seconds: float) -> bool:
+        now = self.clock()
+        with self.engine.begin() as connection:
+            result = connection.execute(
+                update(session_table)
+                .where(session_table.c.id == session_id, session_table.c.expires_at > now)
+                .values(expires_at=now + ttl_seconds)
+            )
+        return result.rowcount == 1
+
+    def delete(self, session_id: str) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(delete(session_table).where(session_table.c.id == session_id))
+
+    def clear(self) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(delete(session_table))
+
+
+def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers validate sessions while another worker writes
+    cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.execute("PRAGMA synchronous = NORMAL")
+    cursor.close()
@@ -0,0 +1,55 @@
+import itertools
+import os
+import threading
+import time
+
+
+class ProfileVersions:
+    """
+    Tiny in-memory map telling whether the user claims embedded in a token are still current.
+
+    Versions come from one process-wide counter: `bump(user_id)` gives the user a new version and
+    `bump_all()` raises a floor every user is compared against, so only users changed since the
+    last `bump_all` take memory. Unknown users are at the floor.
+
+    The map is per process, so tokens carry `stamp()`: the version prefixed by an epoch new in
+    every process. Claims minted before a restart or by another worker never match it and are
+    read again from the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self._floor = 0
+        self._versions: dict[int, int] = {}
+        self._pid: int | None = None
+        self._epoch = ""
+
+    @property
+    def epoch(self) -> str:
+        # set again in each forked worker, the supervisor's would be shared by all of them
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._epoch = f"{time.time_ns():x}"
+                    self._pid = os.getpid()
+        return self._epoch
+
+    def current(self, user_id: int) -> int:
+        return max(self._versions.get(user_id, 0), self._floor)
+
+    def stamp(self, user_id: int) -> str:
+        """The current version of the user in this process, to embed in a token."""
+        return f"{self.epoch}.{self.current(user_id)}"
+
+    def is_current(self, user_id: int, stamp: str | None) -> bool:
+        return stamp == self.stamp(user_id)
+
+    def bump(self, user_id: int) -> None:
+        with self._lock:
+            self._versions[user_id] = next(self._counter)
+
+    def bump_all(self) -> None:
+        with self._lock:
+            self._floor = next(self._counter)
+            self._versions.clear()
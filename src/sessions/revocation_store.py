@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+from src.core.timing_wheel import TimingWheel
+from src.dependencies.metrics_di import get_metrics
+
+
+class RevocationStore:
+    """
+    Revoked JWT ids (`jti`) kept only until the token would have expired anyway.
+
+    - O(1) `revoke` / `is_revoked`: a dict lookup plus a timing wheel that drops entries at `exp`.
+    - Memory bounded: past `max_entries` the entry expiring soonest is evicted and the "issued
+      before" floor is raised past its `iat`, so the evicted token (and any older one) stays
+      revoked. Overflow revokes too much rather than too little.
+    - Every raise of the floor is counted as revocation_floor_raised_total, by reason.
+    - `revoke_issued_before(ts)` revokes every token issued before `ts` with a single number,
+      used when all users are deleted.
+    - With `journal_path` every change is appended to a JSON lines file that is replayed and
+      compacted on start, so a restart does not resurrect revoked tokens.
+    """
+
+    def __init__(self, max_entries: int = 100_000, journal_path: str | None = None, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, float]] = OrderedDict()  # jti -> (exp, iat)
+        self._wheel = TimingWheel(clock=clock)
+        self._issued_before = 0.0
+        self._journal_path = journal_path
+        self._journal = None
+        self._journal_lines = 0
+        if journal_path is not None:
+            self._load(journal_path)
+
+    def revoke(self, jti: str, expires_at: float, issued_at: float = 0.0) -> None:
+        now = self.clock()
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._expire(now)
+            self._entries[jti] = (expires_at, issued_at)
+            self._wheel.schedule(jti, expires_at)
+            self._append({"jti": jti, "exp": expires_at, "iat": issued_at})
+            while len(self._entries) > self.max_entries:
+                # the soonest to expire: the floor logs out the fewest tokens still valid
+                evicted = self._wheel.soonest(lambda key, expires_at: self._entries.get(key, (None,))[0] == expires_at)
+                _, evicted_issued_at = self._entries.pop(evicted)
+                # iat has microsecond precision, see CookieService._sign
+                self._raise_floor(evicted_issued_at + 1e-6, reason="overflow")
+
+    def revoke_issued_before(self, timestamp: float) -> None:
+        with self._lock:
+            self._raise_floor(timestamp, reason="revoke_all")
+
+    def is_revoked(self, jti: str | None, issued_at: float | None) -> bool:
+        if (issued_at or 0) < self._issued_before:
+            return True
+        if jti is None or jti not in self._entries:
+            return False
+        with self._lock:
+            self._expire(self.clock())
+            return jti in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _raise_floor(self, timestamp: float, reason: str) -> None:
+        if timestamp > self._issued_before:
+            self._issued_before = timestamp
+            self._append({"issued_before": timestamp})
+            get_metrics().increment("revocation_floor_raised_total", reason=reason)
+
+    def _expire(self, now: float) -> None:
+        for jti in self._wheel.advance(now):
+            entry = self._entries.get(jti)
+            if entry is not None and entry[0] <= now:
+                del self._entries[jti]
+
+    # --- persistence ---
+
+    def _append(self, record: dict) -> None:
+        if self._journal is None:
+            return
+        self._journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._journal.flush()
+        self._journal_lines += 1
+        # Rewrite the file once most of its lines are stale (expired or evicted entries)
+        if self._journal_lines > 2 * len(self._entries) + 1024:
+            self._compact()
+
+    def _load(self, path: str) -> None:
+        now = self.clock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line after a crash
+                    if "issued_before" in record:
+                        self._issued_before = max(self._issued_before, record["issued_before"])
+                    elif record["exp"] > now:
+                        self._entries[record["jti"]] = (record["exp"], record.get("iat", 0.0))
+                        self._wheel.schedule(record["jti"], record["exp"])
+        self._compact()
+
+    def _compact(self) -> None:
+        """Atomically replaces the journal with a snapshot of the live entries."""
+        if self._journal is not None:
+            self._journal.close()
+        temporary_path = f"{self._journal_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as snapshot:
+            snapshot.write(json.dumps({"issued_before": self._issued_before}) + "\n")
+            for jti, (expires_at, issued_at) in self._entries.items():
+                snapshot.write(json.dumps({"jti": jti, "exp": expires_at, "iat": issued_at}, separators=(",", ":")) + "\n")
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary_path, self._journal_path)
+        self._journal = open(self._journal_path, "a", encoding="utf-8")
+        self._journal_lines = len(self._entries) + 1
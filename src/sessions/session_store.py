@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+
+class SessionStore(ABC):
+    """
+    Server-side sessions: the cookie only carries an opaque random id and the
+    claims (`sub`, `id`) live in the store until the session expires or is deleted.
+    """
+
+    @abstractmethod
+    def create(self, claims: dict, ttl_seconds: float) -> str:
+        pass
+
+    @abstractmethod
+    def get(self, session_id: str) -> dict | None:
+        pass
+
+    @abstractmethod
+    def touch(self, session_id: str, ttl_seconds: float) -> bool:
+        pass
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
@@ -0,0 +1,39 @@
+import hashlib
+import hmac
+import secrets
+import time
+from typing import Callable
+from src.core.ttl_cache import TTLCache
+
+
+class VerifiedCredentials:
+    """
+    Logins that recently passed bcrypt, so a repeated valid login can skip it.
+
+    Entries are keyed by username and an HMAC of the presented password under a random key of
+    this process, never the password itself, and hold the stored hash the password was checked
+    against. A login only counts as verified while the user's current hash is that same hash, so
+    changing the password or deleting the user (a new user gets a new salt) invalidates it at once.
+    Failed logins are never cached: guessing still pays bcrypt. Per process and size bounded.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 60, clock: Callable[[], float] = time.monotonic):
+        self._key = secrets.token_bytes(32)
+        self._entries: TTLCache[tuple[str, bytes], str] = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds, clock=clock)
+
+    def is_verified(self, username: str, password: bytes, stored_hash: str) -> bool:
+        verified_hash = self._entries.get((username, self._digest(password)))
+        return verified_hash is not None and hmac.compare_digest(verified_hash, stored_hash)
+
+    def remember(self, username: str, password: bytes, stored_hash: str) -> None:
+        """Records that bcrypt accepted `password` for `stored_hash`."""
+        self._entries.set((username, self._digest(password)), stored_hash)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _digest(self, password: bytes) -> bytes:
+        return hmac.new(self._key, password, hashlib.sha256).digest()
@@ -0,0 +1,64 @@
+import time
+import pytest
+from jose import jwt, JWTError, ExpiredSignatureError
+from src.dependencies.codecs_di import available_jwt_codecs, get_jwt_codec
+
+SECRET_KEY = "test-secret-key"
+
+@pytest.fixture(params=[(backend, algorithm) for backend in available_jwt_codecs() for algorithm in ["HS256", "HS384", "HS512"]], ids=lambda p: f"{p[0]}-{p[1]}")
+def codec(request):
+    """Every installed backend must behave the same for each HMAC algorithm."""
+    backend, algorithm = request.param
+    return get_jwt_codec(backend, SECRET_KEY, algorithm)
+
+def claims(expires_in: int = 60) -> dict:
+    now = int(time.time())
+    return {"sub": "testuser", "id": 1, "iat": now, "exp": now + expires_in}
+
+def test_roundtrip(codec):
+    """Tests that a token encoded by the codec decodes to the same claims."""
+    payload = claims()
+
+    assert codec.decode(codec.encode(payload)) == payload
+
+def test_interoperable_with_jose(codec):
+    """Tests that tokens are standard JWTs readable and writable by python-jose."""
+    payload = claims()
+
+    assert jwt.decode(codec.encode(payload), SECRET_KEY, algorithms=[codec.algorithm]) == payload
+    assert codec.decode(jwt.encode(payload, SECRET_KEY, algorithm=codec.algorithm)) == payload
+
+def test_expired_token(codec):
+    """Tests that an expired token raises ExpiredSignatureError."""
+    with pytest.raises(ExpiredSignatureError):
+        codec.decode(codec.encode(claims(expires_in=-10)))
+
+@pytest.mark.parametrize("token", [
+    "invalid.token",
+    "invalid.token.string",
+    "",
+])
+def test_malformed_token(codec, token):
+    """Tests that malformed tokens raise JWTError."""
+    with pytest.raises(JWTError):
+        codec.decode(token)
+
+def test_tampered_or_foreign_tokens(codec):
+    """Tests that a wrong key, a tampered payload or another algorithm are rejected."""
+    payload = claims()
+    header, body, signature = codec.encode(payload).split(".")
+    other_body = jwt.encode({**payload, "id": 2}, SECRET_KEY, algorithm=codec.algorithm).split(".")[1]
+    other_algorithm = "HS512" if codec.algorithm != "HS512" else "HS256"
+
+    with pytest.raises(JWTError):
+        codec.decode(jwt.encode(payload, "another-key", algorithm=codec.algorithm))
+    with pytest.raises(JWTError):
+        codec.decode(f"{header}.{other_body}.{signature}")
+    with pytest.raises(JWTError):
+        codec.decode(jwt.encode(payload, SECRET_KEY, algorithm=other_algorithm))
+    with pytest.raises(JWTError):
+        codec.decode(f"eyJhbGciOiJub25lIiwidHlwIjoiSldUIn0.{body}.")
+
+def test_auto_backend_uses_hmac_fast_path_for_hs_algorithms():
+    """Tests that the auto backend resolves to the stdlib HMAC codec for HS256."""
+    assert get_jwt_codec("auto", SECRET_KEY, "HS256").name == "hmac"
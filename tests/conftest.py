@@ -4,10 +4,11 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from src.core.config import settings
 from src.database.models.user import User
 from src.main import app
 from src.database.base import Base
-from src.database.session import get_db_session as app_get_db_session
+from src.database.session import get_db_session as app_get_db_session, get_session_factory as app_get_session_factory
 
 SQLALCHEMY_DATABASE_URL = "sqlite+pysqlite:///:memory:"
 
@@ -19,10 +20,23 @@ engine = create_engine(
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# the warmup would open the real database on every TestClient startup, see src.core.warmup
+settings.WARMUP_ON_STARTUP = False
+
 @pytest.fixture(scope="session", autouse=True)
 def setup_db():
     Base.metadata.create_all(bind=engine)
 
+@pytest.fixture(scope="function")
+def shard_engines():
+    """Three empty in-memory SQLite databases, the shards of a sharded repository."""
+    engines = [create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool) for _ in range(3)]
+    for shard_engine in engines:
+        Base.metadata.create_all(shard_engine)
+    yield engines
+    for shard_engine in engines:
+        shard_engine.dispose()
+
 @pytest.fixture(scope="function")
 def client():
     connection = engine.connect()
@@ -36,6 +50,8 @@ def client():
             pass
             
     app.dependency_overrides[app_get_db_session] = override_get_db
+    # background jobs open their own sessions, on the same rolled back transaction
+    app.dependency_overrides[app_get_session_factory] = lambda: (lambda: TestingSessionLocal(bind=connection))
 
     with TestClient(app) as test_client:
         yield test_client 
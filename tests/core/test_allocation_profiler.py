@@ -0,0 +1,73 @@
+import tracemalloc
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.core.allocation_profiler import AllocationProfiler
+from src.core.middleware import AllocationProfilingMiddleware
+
+retained: list[bytes] = []
+
+@pytest.fixture
+def profiler():
+    profiler = AllocationProfiler(frames=5, max_snapshots=2)
+    profiler.start()
+    yield profiler
+    profiler.stop()
+    retained.clear()
+
+def allocate_retained(count: int) -> None:
+    retained.extend(bytes(1000) + str(i).encode() for i in range(count))
+
+def test_profiler_does_not_trace_until_started():
+    """Tests that creating the profiler leaves tracemalloc off, so it costs nothing until started."""
+    AllocationProfiler()
+
+    assert not tracemalloc.is_tracing()
+
+def test_requests_are_recorded_by_route_template(profiler):
+    """Tests that the middleware attributes what a request leaves allocated to its route template."""
+    app = FastAPI()
+
+    @app.get("/items/{id}")
+    async def item(id: int):
+        allocate_retained(100)
+        return {}
+
+    app.add_middleware(AllocationProfilingMiddleware, profiler=profiler)
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    stats = {stats.route: stats for stats in profiler.routes()}
+    assert stats["/items/{id}"].requests == 2
+    assert stats["/items/{id}"].allocated_bytes >= 2 * 100 * 1000
+    assert stats["/items/{id}"].allocations >= 200
+    assert stats["<unmatched>"].requests == 1
+    assert profiler.routes()[0].route == "/items/{id}"
+
+def test_top_reports_the_allocation_site(profiler):
+    """Tests that the line holding the most memory is reported first, with its traceback."""
+    allocate_retained(2000)
+    top = profiler.top(limit=1)
+
+    assert top[0].location[0].endswith(f"test_allocation_profiler.py:{allocate_retained.__code__.co_firstlineno + 1}")
+    assert top[0].size_bytes >= 2000 * 1000
+
+def test_snapshot_diff_shows_what_grew(profiler):
+    """Tests that diffing two snapshots reports the allocations made between them."""
+    base = profiler.take_snapshot()
+    allocate_retained(2000)
+    later = profiler.take_snapshot()
+    diff = profiler.diff(later, base, limit=1)
+
+    assert diff[0].location[0].endswith(f"test_allocation_profiler.py:{allocate_retained.__code__.co_firstlineno + 1}")
+    assert diff[0].size_diff_bytes >= 2000 * 1000
+    assert diff[0].count_diff >= 2000
+
+def test_oldest_snapshots_are_dropped(profiler):
+    """Tests that only max_snapshots snapshots are kept."""
+    ids = [profiler.take_snapshot().id for _ in range(3)]
+
+    assert [snapshot.id for snapshot in profiler.snapshots()] == ids[1:]
+    assert profiler.get_snapshot(ids[0]) is None
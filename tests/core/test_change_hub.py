@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from src.core.change_hub import ChangeHub
+
+def drain(subscription) -> list:
+    async def collect():
+        events = []
+        while (event := await subscription.get(timeout=0.01)) is not None:
+            events.append(event)
+        return events
+    return collect()
+
+def test_subscribers_receive_published_events():
+    """Tests that every subscriber gets each event, in order, including events published from other threads."""
+    hub = ChangeHub()
+
+    async def scenario():
+        first, second = hub.subscribe(), hub.subscribe()
+        hub.publish("created", {"id": 1})
+        thread = threading.Thread(target=hub.publish, args=("deleted", {"id": 1}))
+        thread.start()
+        thread.join()
+        return await drain(first), await drain(second)
+
+    first, second = asyncio.run(scenario())
+
+    assert [(event.id, event.type) for event in first] == [(1, "created"), (2, "deleted")]
+    assert first == second
+
+def test_resume_after_event_id_replays_the_ring_buffer():
+    """Tests that subscribing after an id replays only the later events."""
+    hub = ChangeHub(history_size=10)
+    for i in range(5):
+        hub.publish("created", {"id": i})
+
+    async def scenario():
+        return await drain(hub.subscribe(after=3)), await drain(hub.subscribe(after=5))
+
+    resumed, up_to_date = asyncio.run(scenario())
+
+    assert [event.id for event in resumed] == [4, 5]
+    assert up_to_date == []
+
+def test_resume_from_evicted_history_sends_reset():
+    """Tests that an id older than the ring buffer, or unknown, yields a single reset at the current id."""
+    hub = ChangeHub(history_size=2)
+    for i in range(5):
+        hub.publish("created", {"id": i})
+
+    async def scenario():
+        return await drain(hub.subscribe(after=1)), await drain(hub.subscribe(after=42))
+
+    too_old, unknown = asyncio.run(scenario())
+
+    assert [(event.id, event.type) for event in too_old] == [(5, "reset")]
+    assert [(event.id, event.type) for event in unknown] == [(5, "reset")]
+
+def test_slow_subscriber_is_evicted():
+    """Tests that a subscriber whose buffer is full is dropped without affecting the others."""
+    hub = ChangeHub(subscriber_buffer=2)
+
+    async def scenario():
+        slow, fast = hub.subscribe(), hub.subscribe()
+        hub.publish("created")
+        hub.publish("created")
+        fast_events = await drain(fast)
+        hub.publish("created")
+        return slow, fast, fast_events + await drain(fast)
+
+    slow, fast, fast_events = asyncio.run(scenario())
+
+    assert slow.evicted and slow.closed
+    assert not fast.closed
+    assert len(fast_events) == 3
+    assert len(hub) == 1
@@ -0,0 +1,84 @@
+import gzip
+import zlib
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+from src.core.compression import negotiate, is_compressible
+from src.core.middleware import CompressionMiddleware
+
+PAGE = [{"id": i, "username": f"user{i}", "is_active": True} for i in range(100)]
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/page")
+    def page():
+        return PAGE
+
+    @app.get("/small")
+    def small():
+        return {"id": 1}
+
+    @app.get("/png")
+    def png():
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"data: {i}\n\n" for i in range(3)), media_type="text/event-stream")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=500, gzip_level=6)
+    return TestClient(app)
+
+@pytest.mark.parametrize("accept_encoding,expected", [
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("*", "gzip"),
+    ("*;q=0.1, gzip;q=0", None),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiate(accept_encoding, expected):
+    """Tests Accept-Encoding negotiation with q-values and wildcards."""
+    assert negotiate(accept_encoding, ["gzip"]) == expected
+
+def test_is_compressible():
+    """Tests that JSON and text are compressible and binary types are not."""
+    assert is_compressible("application/json")
+    assert is_compressible("text/event-stream; charset=utf-8")
+    assert is_compressible("application/problem+json")
+    assert not is_compressible("image/png")
+
+def test_large_json_is_gzipped(client: TestClient):
+    """Tests that a page above the threshold is sent gzipped with Vary and no stale Content-Length."""
+    response = client.get("/page", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == PAGE
+    assert response.num_bytes_downloaded < len(response.content)
+
+def test_small_binary_and_unaccepted_responses_are_not_compressed(client: TestClient):
+    """Tests that small bodies, binary types and clients without gzip get identity responses."""
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    png = client.get("/png", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/page", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in png.headers
+    assert "content-encoding" not in identity.headers
+    assert identity.json() == PAGE
+
+def test_streaming_chunks_are_compressed_incrementally(client: TestClient):
+    """Tests that each streamed chunk is flushed as a decodable piece of the gzip stream."""
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw) == b"data: 0\n\ndata: 1\n\ndata: 2\n\n"
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    # the stream can be decoded up to the first sync flush without its end
+    assert decompressor.decompress(raw[: raw.index(b"\x00\x00\xff\xff") + 4]) == b"data: 0\n\n"
@@ -0,0 +1,127 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+from src.core.concurrency_limit import AdaptiveLimit
+from src.core.metrics import Metrics
+from src.core.middleware import ConcurrencyLimitMiddleware
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_limit_grows_while_fast_and_busy():
+    """Tests that fast requests at high utilization raise the limit by about one per `limit` requests."""
+    limit = AdaptiveLimit(initial=4, minimum=1, maximum=10, target_latency=0.1)
+    for _ in range(4):
+        assert limit.try_acquire()
+    for _ in range(4):
+        limit.release(0.01)
+
+    assert 4 < limit.limit < 5
+
+def test_limit_does_not_grow_when_mostly_idle():
+    """Tests that fast requests do not raise a limit that is far from being used."""
+    limit = AdaptiveLimit(initial=8, minimum=1, maximum=10, target_latency=0.1)
+    for _ in range(20):
+        limit.try_acquire()
+        limit.release(0.01)
+
+    assert limit.limit == 8
+
+def test_slow_requests_back_off_once_per_latency_window():
+    """Tests that requests completing together over the target latency cut the limit only once."""
+    clock = FakeClock()
+    limit = AdaptiveLimit(initial=10, minimum=2, maximum=10, target_latency=0.5, backoff=0.5, clock=clock)
+    for _ in range(5):
+        limit.try_acquire()
+    for _ in range(5):
+        limit.release(1.0)
+    assert limit.limit == 5
+
+    clock.now = 1.0
+    limit.try_acquire()
+    limit.release(0.0, overloaded=True)
+    limit.try_acquire()
+    clock.now = 2.0
+    limit.release(1.0)
+    assert limit.limit == 2
+
+def test_limit_rejects_over_capacity():
+    """Tests that try_acquire fails once as many requests as the limit are in flight."""
+    limit = AdaptiveLimit(initial=2, minimum=1, maximum=4, target_latency=1)
+
+    assert limit.try_acquire() and limit.try_acquire()
+    assert not limit.try_acquire()
+    assert limit.in_flight == 2
+
+def test_invalid_limits_are_rejected():
+    """Tests that an initial limit outside [minimum, maximum] is a configuration error."""
+    with pytest.raises(ValueError):
+        AdaptiveLimit(initial=10, minimum=1, maximum=4, target_latency=1)
+
+def build_app(metrics: Metrics) -> tuple[FastAPI, asyncio.Event]:
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {}
+
+    @app.get("/stream")
+    async def stream():
+        await release.wait()
+        return {}
+
+    groups = {"/stream": None}
+    routes = [(route, groups.get(route.path, "default")) for route in app.routes]
+    limits = {"default": AdaptiveLimit(initial=1, minimum=1, maximum=1, target_latency=10)}
+    app.add_middleware(ConcurrencyLimitMiddleware, limits=limits, routes=routes, retry_after_seconds=3, metrics=metrics)
+    return app, release
+
+def test_requests_over_the_limit_are_shed_with_retry_after():
+    """Tests that a request over its group's limit gets 503 and Retry-After at once, and is counted."""
+    metrics = Metrics()
+    app, release = build_app(metrics)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/slow"))
+            while metrics.get("concurrency_in_flight", group="default") == 0:
+                await asyncio.sleep(0)
+            shed = await client.get("/slow")
+            release.set()
+            return await first, shed
+
+    first, shed = asyncio.run(scenario())
+
+    assert first.status_code == 200
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "3"
+    assert metrics.get("concurrency_rejected_total", group="default") == 1
+    assert metrics.get("concurrency_in_flight", group="default") == 0
+    assert metrics.get("concurrency_limit", group="default") == 1
+
+def test_routes_without_group_are_never_shed():
+    """Tests that @concurrency_limit(None) routes bypass the limit even when it is full."""
+    metrics = Metrics()
+    app, release = build_app(metrics)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/slow"))
+            while metrics.get("concurrency_in_flight", group="default") == 0:
+                await asyncio.sleep(0)
+            stream = asyncio.create_task(client.get("/stream"))
+            await asyncio.sleep(0.01)
+            release.set()
+            return await first, await stream
+
+    first, stream = asyncio.run(scenario())
+
+    assert first.status_code == 200
+    assert stream.status_code == 200
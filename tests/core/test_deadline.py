@@ -0,0 +1,37 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.core.deadline import remaining
+from src.core.middleware import DeadlineMiddleware
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/fast")
+    def fast():
+        return {"remaining": remaining()}
+
+    @app.get("/items/{id}")
+    def item(id: str):
+        return {"remaining": remaining()}
+
+    @app.get("/stream")
+    async def stream():
+        return {"remaining": remaining()}
+
+    deadlines = {"/items/{id}": 30, "/stream": None}
+    routes = [(route, deadlines.get(route.path, 2)) for route in app.routes]
+    app.add_middleware(DeadlineMiddleware, default_seconds=2, routes=routes)
+    return app
+
+def test_deadline_is_visible_in_sync_endpoints():
+    """Tests that the deadline set by the middleware reaches endpoints run in the threadpool."""
+    client = TestClient(build_app())
+
+    assert 1 < client.get("/fast").json()["remaining"] <= 2
+
+def test_route_deadlines_override_the_default():
+    """Tests that templated routes get their own budget and None disables the deadline."""
+    client = TestClient(build_app())
+
+    assert 29 < client.get("/items/42").json()["remaining"] <= 30
+    assert client.get("/stream").json()["remaining"] is None
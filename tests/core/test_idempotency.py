@@ -0,0 +1,59 @@
+import asyncio
+from src.core.idempotency import IdempotencyStore, StoredResponse
+
+def response(status_code: int = 201) -> StoredResponse:
+    return StoredResponse(status_code=status_code, headers=[], body=b"{}", fingerprint="body")
+
+def test_concurrent_duplicates_wait_for_the_original():
+    """Tests that requests sharing a key while the first is running reuse its response without running."""
+    store = IdempotencyStore(max_entries=10, ttl_seconds=60)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return response()
+
+    async def scenario():
+        return await asyncio.gather(*(store.run("key", call) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert calls == 1
+    assert [replayed for _, replayed in results] == [False, True, True, True, True]
+
+def test_server_errors_are_not_stored():
+    """Tests that a 5xx response is not replayed to the next retry."""
+    store = IdempotencyStore(max_entries=10, ttl_seconds=60)
+    statuses = iter([503, 201])
+
+    async def call():
+        return response(next(statuses))
+
+    first, replayed_first = asyncio.run(store.run("key", call))
+    second, replayed_second = asyncio.run(store.run("key", call))
+
+    assert (first.status_code, replayed_first) == (503, False)
+    assert (second.status_code, replayed_second) == (201, False)
+
+def test_failed_original_lets_a_waiter_run():
+    """Tests that when the original raises, a waiting duplicate runs the request itself."""
+    store = IdempotencyStore(max_entries=10, ttl_seconds=60)
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.01)
+        if attempts == 1:
+            raise RuntimeError("boom")
+        return response()
+
+    async def scenario():
+        return await asyncio.gather(store.run("key", call), store.run("key", call), return_exceptions=True)
+
+    original, waiter = asyncio.run(scenario())
+
+    assert isinstance(original, RuntimeError)
+    assert waiter[0].status_code == 201 and waiter[1] is False
@@ -0,0 +1,98 @@
+import io
+import json
+import logging
+import queue
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from src.core.middleware import AccessLogMiddleware
+from src.core.structured_logging import BatchingWriter, JSONFormatter, NonBlockingQueueHandler, request_id
+from src.dependencies.metrics_di import get_metrics
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+@pytest.fixture
+def access_records():
+    """Access log records written during the test."""
+    handler = ListHandler()
+    logger = logging.getLogger("src.access")
+    logger.addHandler(handler)
+    yield handler.records
+    logger.removeHandler(handler)
+
+def build_client(sample_rate: float) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/ok")
+    def ok():
+        return {"request_id": request_id.get()}
+
+    @app.get("/missing")
+    def missing():
+        raise HTTPException(status_code=404)
+
+    app.add_middleware(AccessLogMiddleware, sample_rate=sample_rate)
+    return TestClient(app)
+
+def test_writer_formats_queued_records_as_json_lines():
+    """Tests that records go through the queue to the stream as JSON with request id, fields and traceback."""
+    records, stream = queue.Queue(), io.StringIO()
+    writer = BatchingWriter(records, stream, JSONFormatter(), batch_size=10, flush_interval=0.01)
+    logger = logging.getLogger("tests.structured_logging")
+    handler = NonBlockingQueueHandler(records)
+    logger.addHandler(handler)
+    writer.start()
+    token = request_id.set("abc123")
+    try:
+        logger.warning("user %s", "alice", extra={"fields": {"user_id": 7}})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+    finally:
+        request_id.reset(token)
+        logger.removeHandler(handler)
+        writer.stop()
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["message"] == "user alice" and first["user_id"] == 7 and first["request_id"] == "abc123"
+    assert second["level"] == "ERROR" and "ValueError: boom" in second["exc_info"]
+
+def test_full_queue_drops_records_without_blocking():
+    """Tests that records are dropped and counted instead of waiting when the queue is full."""
+    records = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(records)
+    before = get_metrics().get("log_records_dropped_total")
+    for _ in range(3):
+        handler.emit(logging.LogRecord("tests", logging.INFO, __file__, 1, "message", None, None))
+
+    assert records.qsize() == 1
+    assert get_metrics().get("log_records_dropped_total") == before + 2
+
+def test_access_log_carries_the_request_id(access_records):
+    """Tests that each request gets an id, echoed in X-Request-ID and in its access record."""
+    client = build_client(sample_rate=1.0)
+
+    generated = client.get("/ok")
+    forwarded = client.get("/ok", headers={"X-Request-ID": "from-proxy-1"})
+    malformed = client.get("/ok", headers={"X-Request-ID": "bad id with spaces"})
+
+    assert generated.headers["x-request-id"] == generated.json()["request_id"]
+    assert forwarded.headers["x-request-id"] == "from-proxy-1"
+    assert malformed.headers["x-request-id"] != "bad id with spaces"
+    assert [record.fields["status"] for record in access_records] == [200, 200, 200]
+
+def test_access_log_samples_successes_but_keeps_errors(access_records):
+    """Tests that a 0 sample rate drops successful requests from the access log, never errors."""
+    client = build_client(sample_rate=0.0)
+
+    client.get("/ok")
+    client.get("/missing")
+
+    assert [(record.fields["path"], record.fields["status"]) for record in access_records] == [("/missing", 404)]
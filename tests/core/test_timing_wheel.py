@@ -0,0 +1,34 @@
+from src.core.timing_wheel import TimingWheel
+
+def test_advance_yields_only_expired_keys():
+    """Tests that advancing the wheel yields the keys whose deadline passed and keeps the rest."""
+    wheel = TimingWheel(tick_seconds=1, slots=8, clock=lambda: 100.0)
+    wheel.schedule("soon", 102.5)
+    wheel.schedule("later", 105.0)
+
+    assert list(wheel.advance(103.0)) == ["soon"]
+    assert list(wheel.advance(104.0)) == []
+    assert list(wheel.advance(105.0)) == ["later"]
+    assert len(wheel) == 0
+
+def test_deadlines_beyond_one_revolution():
+    """Tests that a deadline further than slots * tick is kept until its own round."""
+    wheel = TimingWheel(tick_seconds=1, slots=4, clock=lambda: 0.0)
+    wheel.schedule("far", 10.0)
+
+    assert list(wheel.advance(6.0)) == []
+    assert list(wheel.advance(10.0)) == ["far"]
+
+def test_soonest_skips_keys_the_caller_no_longer_holds():
+    """Tests that soonest returns the live key with the earliest deadline, also beyond one revolution."""
+    wheel = TimingWheel(tick_seconds=1, slots=4, clock=lambda: 0.0)
+    wheel.schedule("far", 10.0)
+    wheel.schedule("gone", 1.5)
+    wheel.schedule("soon", 2.5)
+    live = {"far", "soon"}
+
+    assert wheel.soonest(lambda key, expires_at: key in live) == "soon"
+    live.discard("soon")
+    assert wheel.soonest(lambda key, expires_at: key in live) == "far"
+    live.clear()
+    assert wheel.soonest(lambda key, expires_at: key in live) is None
@@ -0,0 +1,81 @@
+import os
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from fastapi.responses import StreamingResponse
+from src.core.middleware import TrafficCaptureMiddleware
+from src.core.traffic_capture import TrafficRecorder, body_shape, read_capture
+
+def build_app(recorder: TrafficRecorder) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login(body: dict, response: Response):
+        response.set_cookie("token", f"token-of-{body['username']}")
+        return {}
+
+    @app.get("/items/{id}")
+    async def item(id: int, request: Request):
+        return {"token": request.cookies.get("token")}
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse(iter([b"data: 1\n\n"]), media_type="text/event-stream")
+
+    app.add_middleware(TrafficCaptureMiddleware, recorder=recorder)
+    return app
+
+def capture(tmp_path, requests) -> list:
+    recorder = TrafficRecorder(str(tmp_path / "capture.jsonl"))
+    requests(TestClient(build_app(recorder)))
+    recorder.stop()
+    # the file is only created with the first record
+    return read_capture([recorder.process_path]) if os.path.exists(recorder.process_path) else []
+
+def test_body_shape_keeps_structure_not_values():
+    """Tests that captured bodies keep keys, types and string lengths but no value."""
+    shape = body_shape({"username": "alice", "password": "pa55word", "tags": ["a"], "age": 3, "ok": True, "x": None})
+
+    assert shape == {"username": "str:5", "password": "str:8", "tags": ["str:1"], "age": "int", "ok": "bool", "x": "null"}
+
+def test_requests_are_captured_with_route_params_and_body_shape(tmp_path):
+    """Tests that each request is written with its route template, parameters, body shape, status and time."""
+    captured = capture(tmp_path, lambda client: (
+        client.post("/login", json={"username": "alice", "password": "secret"}),
+        client.get("/items/7", params={"page": 2}),
+    ))
+
+    assert [request.route for request in captured] == ["/login", "/items/{id}"]
+    assert captured[0].body == {"username": "str:5", "password": "str:6"}
+    assert captured[1].path_params == {"id": "7"}
+    assert captured[1].query == [("page", "2")]
+    assert all(request.status == 200 and request.ms > 0 for request in captured)
+
+def test_token_issued_at_login_continues_the_session(tmp_path):
+    """Tests that requests made with the cookie set by a login share the login's session pseudonym."""
+    def requests(client):
+        client.post("/login", json={"username": "alice", "password": "secret"})
+        client.get("/items/1")
+        client.cookies.clear()
+        client.get("/items/2")
+
+    login, with_cookie, without_cookie = capture(tmp_path, requests)
+
+    assert with_cookie.session == login.session
+    assert without_cookie.session != login.session
+
+def test_streams_and_unmatched_paths_are_not_captured(tmp_path):
+    """Tests that event streams, which replay cannot finish, and 404s without a route are skipped."""
+    captured = capture(tmp_path, lambda client: (client.get("/stream"), client.get("/missing")))
+
+    assert captured == []
+
+def test_capture_never_contains_values(tmp_path):
+    """Tests that neither passwords nor tokens end up in the capture file."""
+    recorder = TrafficRecorder(str(tmp_path / "capture.jsonl"))
+    client = TestClient(build_app(recorder))
+    client.post("/login", json={"username": "alice", "password": "secret"})
+    client.get("/items/1")
+    recorder.stop()
+
+    content = open(recorder.process_path).read()
+    assert "secret" not in content and "token-of" not in content and "alice" not in content
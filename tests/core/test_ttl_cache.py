@@ -0,0 +1,40 @@
+from src.core.ttl_cache import TTLCache
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_entries_expire():
+    """Tests that an entry is returned until its TTL elapses."""
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, ttl_seconds=5, clock=clock)
+    cache.set("key", "value")
+
+    clock.now = 4.9
+    assert cache.get("key") == "value"
+    clock.now = 5
+    assert cache.get("key") is None
+
+def test_size_bounded():
+    """Tests that the oldest entries are evicted beyond max_entries."""
+    cache = TTLCache(max_entries=2, ttl_seconds=60, clock=FakeClock())
+    for key in ["a", "b", "c"]:
+        cache.set(key, key)
+
+    assert len(cache) == 2
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
+
+def test_get_or_set_calls_factory_once():
+    """Tests that get_or_set only builds the value when there is no live entry."""
+    cache = TTLCache(max_entries=10, ttl_seconds=60, clock=FakeClock())
+    calls = []
+
+    first = cache.get_or_set("key", lambda: calls.append(1) or "first")
+    second = cache.get_or_set("key", lambda: calls.append(1) or "second")
+
+    assert first == second == "first"
+    assert len(calls) == 1
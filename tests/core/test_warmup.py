@@ -0,0 +1,20 @@
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+from src.core import warmup
+from src.core.config import settings
+
+def test_open_pool_connections_fills_the_pool(tmp_path):
+    """Tests that every connection the pool keeps is opened and left in the pool."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'warmup.db'}", poolclass=QueuePool, pool_size=3)
+
+    assert warmup.open_pool_connections(engine) == 3
+    assert engine.pool.checkedin() == 3
+    engine.dispose()
+
+def test_warm_up_runs_and_times_every_step(monkeypatch):
+    """Tests that warm_up runs the bcrypt, JWT, repository and cache steps and returns their durations."""
+    monkeypatch.setattr(settings, "USER_REPOSITORY", "memory")
+    durations = warmup.warm_up()
+
+    assert set(durations) == {"repository", "bcrypt", "jwt", "caches"}
+    assert all(seconds >= 0 for seconds in durations.values())
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import create_engine, insert, text
+
+from src.database.backfill import CHECKPOINT_TABLE, BackfillProgress, backfill
+from src.database.base import Base
+from src.database.models.user import User
+
+UPDATE = "UPDATE user SET username_lower = lower(username) WHERE id BETWEEN :first_id AND :last_id AND username_lower IS NULL"
+
+@pytest.fixture
+def engine(tmp_path):
+    """File SQLite database with 2500 users and a new, empty username_lower column."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'backfill.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{"username": f"User{i}", "password": "hashed_password", "is_active": True} for i in range(2500)])
+        connection.exec_driver_sql("ALTER TABLE user ADD COLUMN username_lower VARCHAR(30)")
+    yield engine
+    engine.dispose()
+
+def _missing(engine) -> int:
+    with engine.connect() as connection:
+        return connection.scalar(text("SELECT count(*) FROM user WHERE username_lower IS NULL"))
+
+def _checkpoints(engine) -> list:
+    with engine.connect() as connection:
+        return connection.execute(text(f"SELECT name, last_id, upper_id, rows FROM {CHECKPOINT_TABLE}")).all()
+
+def test_backfill_updates_every_row_in_batches(engine):
+    """Tests that every row is updated, batch_size ids per batch, and that the checkpoint is gone at the end."""
+    reports: list[BackfillProgress] = []
+
+    progress = backfill(engine, "lower", UPDATE, batch_size=1000, pause_seconds=0, on_progress=reports.append, progress_interval=0)
+
+    assert _missing(engine) == 0
+    assert (progress.rows, progress.batches, progress.done) == (2500, 3, True)
+    assert [report.last_id for report in reports] == [1000, 2000, 2500]
+    assert _checkpoints(engine) == []
+
+def test_backfill_resumes_from_its_checkpoint(engine):
+    """Tests that a run interrupted after a batch leaves a checkpoint and the next run starts right after it."""
+    def interrupt(progress: BackfillProgress):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        backfill(engine, "lower", UPDATE, batch_size=1000, pause_seconds=0, on_progress=interrupt, progress_interval=0)
+    assert _checkpoints(engine) == [("lower", 1000, 2500, 1000)]
+    assert _missing(engine) == 1500
+
+    # rows added meanwhile are past the recorded upper bound and not visited
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{"username": "Late", "password": "hashed_password", "is_active": True}])
+    reports: list[BackfillProgress] = []
+    progress = backfill(engine, "lower", UPDATE, batch_size=1000, pause_seconds=0, on_progress=reports.append, progress_interval=0)
+
+    assert [report.last_id for report in reports] == [2000, 2500]
+    assert (progress.rows, progress.batches, progress.resumed_rows) == (2500, 2, 1000)
+    assert _missing(engine) == 1
+
+def test_resumed_backfill_rate_counts_only_its_own_rows():
+    """Tests that the rows done before a resume are not part of the rows per second of the run resuming."""
+    progress = BackfillProgress("lower", 2500, 2500, rows=2500, batches=2, elapsed=2.0, resumed_rows=1000)
+
+    assert progress.rows_per_second == 750
+
+def test_backfill_skips_id_gaps(engine):
+    """Tests that batches follow the existing ids, so sparse ids do not produce empty batches."""
+    with engine.begin() as connection:
+        # through negative ids, a direct id * 1000 collides with existing ids
+        connection.exec_driver_sql("UPDATE user SET id = -id * 1000")
+        connection.exec_driver_sql("UPDATE user SET id = -id")
+    reports: list[BackfillProgress] = []
+
+    progress = backfill(engine, "lower", UPDATE, batch_size=1000, pause_seconds=0, on_progress=reports.append, progress_interval=0)
+
+    assert progress.batches == 3
+    assert _missing(engine) == 0
+
+def test_backfill_on_empty_table(tmp_path):
+    """Tests that a table without rows is a no-op."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    Base.metadata.create_all(engine)
+
+    progress = backfill(engine, "noop", "UPDATE user SET is_active = 1 WHERE id BETWEEN :first_id AND :last_id", pause_seconds=0)
+
+    assert (progress.rows, progress.batches) == (0, 0)
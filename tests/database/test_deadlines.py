@@ -0,0 +1,88 @@
+import sqlite3
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+
+from src.core.deadline import DeadlineExceeded, set_deadline, reset_deadline
+from src.database.session import enforce_deadlines
+
+# ~10^8 rows, seconds of work without an interrupt
+SLOW_QUERY = text("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000000) SELECT count(*) FROM n")
+
+@pytest.fixture
+def engine(tmp_path):
+    """File SQLite engine enforcing request deadlines."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'deadline.db'}")
+    enforce_deadlines(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def deadline():
+    """Sets the deadline of the test's context, reset afterwards."""
+    tokens = []
+    yield lambda seconds: tokens.append(set_deadline(seconds))
+    for token in reversed(tokens):
+        reset_deadline(token)
+
+def test_running_statement_is_interrupted_at_the_deadline(engine, deadline):
+    """Tests that the progress handler stops a long SQLite statement shortly after the deadline."""
+    deadline(0.05)
+    start = time.monotonic()
+
+    with pytest.raises(DeadlineExceeded), engine.connect() as connection:
+        connection.execute(SLOW_QUERY)
+
+    assert time.monotonic() - start < 0.5
+
+def test_no_statement_starts_past_the_deadline(engine, deadline):
+    """Tests that a statement is refused once the deadline has passed."""
+    with engine.connect() as connection:
+        deadline(0.001)
+        time.sleep(0.002)
+        with pytest.raises(DeadlineExceeded):
+            connection.execute(text("SELECT 1"))
+
+def test_lock_wait_is_bounded_by_the_deadline(engine, deadline, tmp_path):
+    """Tests that waiting on a write lock gives up at the deadline instead of the 5s busy timeout."""
+    with engine.connect() as connection:
+        connection.execute(text("CREATE TABLE t (x INTEGER)"))
+        connection.commit()
+    locker = sqlite3.connect(tmp_path / "deadline.db")
+    locker.execute("BEGIN EXCLUSIVE")
+    try:
+        deadline(0.2)
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded), engine.connect() as connection:
+            connection.execute(text("INSERT INTO t VALUES (1)"))
+        assert time.monotonic() - start < 1
+    finally:
+        locker.rollback()
+        locker.close()
+
+def test_other_errors_past_the_deadline_are_kept(engine, monkeypatch):
+    """Tests that a constraint violation handled once the deadline has passed stays an IntegrityError."""
+    with engine.connect() as connection:
+        connection.execute(text("CREATE TABLE t (x INTEGER PRIMARY KEY)"))
+        connection.execute(text("INSERT INTO t VALUES (1)"))
+        connection.commit()
+        # the statement starts in time, the deadline passes before its error is handled
+        monkeypatch.setattr("src.database.session.expired", lambda: True)
+        with pytest.raises(IntegrityError):
+            connection.execute(text("INSERT INTO t VALUES (1)"))
+
+def test_queries_without_deadline_are_not_bounded(engine):
+    """Tests that statements run normally when no deadline is set, also from other threads."""
+    results = []
+
+    def query():
+        with engine.connect() as connection:
+            results.append(connection.execute(text("SELECT 41 + 1")).scalar())
+
+    thread = threading.Thread(target=query)
+    thread.start()
+    thread.join()
+
+    assert results == [42]
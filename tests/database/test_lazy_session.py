@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+
+from src.database.base import Base
+from src.database.models.user import User
+from src.database.session import LazySession
+from src.repositories.impl.user_repository_sql_alchemy import UserRepository
+
+@pytest.fixture
+def pool(tmp_path):
+    """File SQLite engine with a counter of the connections currently checked out of its pool."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'lazy.db'}")
+    Base.metadata.create_all(engine)
+    checked_out = {"now": 0, "total": 0}
+
+    def on_checkout(*_):
+        checked_out["now"] += 1
+        checked_out["total"] += 1
+
+    def on_checkin(*_):
+        checked_out["now"] -= 1
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+    yield sessionmaker(autoflush=False, bind=engine), checked_out
+    engine.dispose()
+
+def test_unused_session_is_never_created(pool):
+    """Tests that a LazySession nobody queries never builds a session nor checks out a connection."""
+    session_factory, checked_out = pool
+    db = LazySession(session_factory)
+
+    db.close()
+
+    assert db.is_open is False
+    assert checked_out["total"] == 0
+
+def test_reads_release_the_connection(pool):
+    """Tests that the connection goes back to the pool right after a read and the loaded objects stay usable."""
+    session_factory, checked_out = pool
+    db = LazySession(session_factory)
+    repository = UserRepository(db=db)
+    repository.save(User(username="testuser", password="hashed_password"))
+
+    user = repository.get_by_username("testuser")
+    count = repository.get_count()
+
+    assert checked_out["now"] == 0
+    assert (user.username, user.is_active, count) == ("testuser", True, 1)
+    db.close()
+
+def test_read_with_pending_changes_keeps_the_transaction(pool):
+    """Tests that a read never commits changes that are still pending in the session."""
+    session_factory, _ = pool
+    db = LazySession(session_factory)
+    db.add(User(username="pending", password="hashed_password"))
+
+    db.query(User).all()
+    db.rollback()
+
+    assert UserRepository(db=LazySession(session_factory)).get_count() == 0
+    db.close()
+
+def test_read_after_a_flush_keeps_the_transaction(pool):
+    """Tests that a read never commits a row already flushed, a rollback still discards it."""
+    session_factory, _ = pool
+    db = LazySession(session_factory)
+    db.add(User(username="flushed", password="hashed_password"))
+    db.flush()
+
+    db.query(User).all()
+    db.rollback()
+
+    assert UserRepository(db=LazySession(session_factory)).get_count() == 0
+    db.close()
+
+def test_read_after_core_dml_keeps_the_transaction(pool):
+    """Tests that a read never commits an UPDATE run through the session, a rollback still discards it."""
+    session_factory, _ = pool
+    repository = UserRepository(db=LazySession(session_factory))
+    repository.save(User(username="active", password="hashed_password"))
+    db = LazySession(session_factory)
+    db.execute(update(User).values(is_active=False))
+
+    db.query(User).all()
+    db.rollback()
+
+    assert UserRepository(db=LazySession(session_factory)).get_by_username("active").is_active is True
+    db.close()
+
+def test_reads_release_the_connection_again_after_a_commit(pool):
+    """Tests that once the writes are committed, the next read releases the connection again."""
+    session_factory, checked_out = pool
+    db = LazySession(session_factory)
+    db.add(User(username="committed", password="hashed_password"))
+    db.flush()
+    db.commit()
+
+    db.query(User).all()
+
+    assert checked_out["now"] == 0
+    db.close()
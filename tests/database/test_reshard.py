@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.database.base import Base
+from src.database.models.user import User
+from src.database.reshard import reshard
+from src.repositories.impl.user_repository_sharded import ShardedUserRepository, username_bucket
+from src.repositories.impl.user_repository_sql_alchemy import UserRepository
+
+USERNAMES = [f"user{i}" for i in range(50)]
+
+def _sharded(engines) -> ShardedUserRepository:
+    return ShardedUserRepository([UserRepository(db=sessionmaker(bind=engine)()) for engine in engines])
+
+@pytest.fixture
+def targets():
+    """Two empty in-memory databases, the new shards."""
+    engines = [create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool) for _ in range(2)]
+    yield engines
+    for engine in engines:
+        engine.dispose()
+
+def test_reshard_moves_users_keeping_their_ids(shard_engines, targets):
+    """Tests that every user ends up on its new shard with the same id, password and is_active."""
+    source = _sharded(shard_engines)
+    for username in USERNAMES:
+        source.save(User(username=username, password=f"hash-{username}", is_active=username != "user7"))
+    before = {username: source.get_by_username(username).id for username in USERNAMES}
+
+    copied = reshard(shard_engines, targets, batch_size=7)
+
+    target = _sharded(targets)
+    assert sum(copied) == len(USERNAMES)
+    for username, id in before.items():
+        user = target.get_by_id(id)
+        assert (user.username, user.password) == (username, f"hash-{username}")
+        assert target.shard_for_username(username).get_by_username(username).id == id
+        assert target.shards[username_bucket(username) % 2] is target.shard_for_username(username)
+    assert target.get_count(is_active=False) == 1
+
+def test_new_users_after_reshard_get_fresh_ids(shard_engines, targets):
+    """Tests that ids handed out on the new shards do not collide with the moved ones."""
+    source = _sharded(shard_engines)
+    for username in USERNAMES:
+        source.save(User(username=username, password="hashed_password"))
+    reshard(shard_engines, targets)
+
+    target = _sharded(targets)
+    new_users = [target.save(User(username=f"new{i}", password="hashed_password")) for i in range(10)]
+
+    ids = [target.get_by_username(username).id for username in USERNAMES] + [user.id for user in new_users]
+    assert len(set(ids)) == len(ids)
+
+def test_reshard_refuses_targets_with_users(shard_engines, targets):
+    """Tests that resharding into a database that already has users fails before copying anything."""
+    for target in targets:
+        Base.metadata.create_all(target)
+    _sharded(targets).save(User(username="someone", password="hashed_password"))
+
+    with pytest.raises(ValueError):
+        reshard(shard_engines, targets)
@@ -0,0 +1,117 @@
+import bcrypt
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.database.base import Base
+from src.database.seed import UserDistribution, generate_users, hash_passwords, seed_engine, seed_repository, seed_shards
+from src.repositories.impl.user_repository_memory import MemoryUserRepository
+from src.repositories.impl.user_repository_sharded import ShardedUserRepository, id_bucket, username_bucket
+from src.repositories.impl.user_repository_sql_alchemy import UserRepository
+
+@pytest.fixture(scope="module")
+def password_hashes() -> list[str]:
+    return hash_passwords("password", 2, rounds=4)
+
+def test_hash_passwords_are_valid_and_salted(password_hashes):
+    """Tests that every hash verifies the password and that each one has its own salt."""
+    assert len(set(password_hashes)) == 2
+    assert all(bcrypt.checkpw(b"password", hashed.encode("utf-8")) for hashed in password_hashes)
+
+def test_generate_users_follows_the_distribution(password_hashes):
+    """Tests that usernames are unique and within bounds, with the requested inactive and prefix shares."""
+    distribution = UserDistribution(min_length=5, max_length=12, inactive_ratio=0.2, common_prefixes=("al",), common_prefix_ratio=0.5)
+
+    users = list(generate_users(5000, password_hashes, distribution))
+
+    assert len({user["username"] for user in users}) == 5000
+    assert all(5 <= len(user["username"]) <= 12 for user in users)
+    assert 0.15 < sum(not user["is_active"] for user in users) / 5000 < 0.25
+    assert 0.45 < sum(user["username"].startswith("al") for user in users) / 5000 < 0.55
+    assert {user["password"] for user in users} == set(password_hashes)
+    assert list(generate_users(10, password_hashes, distribution)) == users[:10]
+
+def test_distribution_rejects_invalid_shapes():
+    """Tests that impossible lengths, ratios and prefixes are refused."""
+    with pytest.raises(ValueError):
+        UserDistribution(min_length=10, max_length=5)
+    with pytest.raises(ValueError):
+        UserDistribution(inactive_ratio=1.5)
+    with pytest.raises(ValueError):
+        UserDistribution(min_length=3, common_prefixes=("abc",))
+
+def test_seed_engine_bulk_inserts_and_restores_pragmas(tmp_path, password_hashes):
+    """Tests that the rows are inserted in batches, existing usernames skipped, and the journal mode restored."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(engine)
+    users = list(generate_users(2500, password_hashes))
+    progress = []
+
+    inserted = seed_engine(engine, users, batch_size=1000, on_batch=progress.append)
+    again = seed_engine(engine, users[:10])
+
+    assert (inserted, again, progress) == (2500, 0, [1000, 2000, 2500])
+    with engine.connect() as connection:
+        assert connection.scalar(text("SELECT count(*) FROM user")) == 2500
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "delete"
+    user = UserRepository(db=sessionmaker(bind=engine)()).get_by_username(users[0]["username"])
+    assert bcrypt.checkpw(b"password", user.password.encode("utf-8"))
+
+def test_seed_shards_uses_the_sharded_repository_layout(shard_engines, password_hashes):
+    """Tests that seeded users are found through ShardedUserRepository, with ids of their bucket, after existing ones."""
+    repository = ShardedUserRepository([UserRepository(db=sessionmaker(bind=engine)()) for engine in shard_engines])
+    users = list(generate_users(600, password_hashes))
+    seed_shards(shard_engines, users[:300], batch_size=100)
+
+    inserted = seed_shards(shard_engines, users[300:], batch_size=100)
+
+    assert inserted == 300
+    assert repository.get_count() == 600
+    ids = set()
+    for row in users:
+        user = repository.get_by_username(row["username"])
+        assert id_bucket(user.id) == username_bucket(row["username"])
+        assert repository.get_by_id(user.id).username == row["username"]
+        ids.add(user.id)
+    assert len(ids) == 600
+
+def test_seed_engine_restores_every_loading_pragma(tmp_path, password_hashes):
+    """Tests that the page cache size and temp store are restored on the pooled connection too, not only the journal."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    pragmas = ("journal_mode", "synchronous", "cache_size", "temp_store")
+    with engine.connect() as connection:
+        before = [connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in pragmas]
+
+    seed_engine(engine, generate_users(10, password_hashes))
+
+    with engine.connect() as connection:
+        assert [connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in pragmas] == before
+
+def test_seed_shards_tunes_each_shard_once_and_restores_it(tmp_path, password_hashes):
+    """Tests that the loading pragmas are set once per shard for the whole load, not per batch, and restored after it."""
+    engines = [create_engine(f"sqlite:///{tmp_path / f'shard{i}.db'}") for i in range(2)]
+    tunings = []
+
+    def count_tunings(conn, cursor, statement, *_):
+        if statement == "PRAGMA journal_mode = OFF":
+            tunings.append(statement)
+
+    for shard_engine in engines:
+        Base.metadata.create_all(shard_engine)
+        event.listen(shard_engine, "before_cursor_execute", count_tunings)
+
+    seed_shards(engines, generate_users(500, password_hashes), batch_size=100)
+
+    assert len(tunings) == 2
+    for shard_engine in engines:
+        with shard_engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "delete"
+
+def test_seed_repository_goes_through_any_repository(password_hashes):
+    """Tests that rows can be saved through a repository without an engine, e.g. the in-memory one."""
+    repository = MemoryUserRepository()
+
+    assert seed_repository(repository, generate_users(50, password_hashes, UserDistribution(inactive_ratio=1.0))) == 50
+    assert repository.get_count(is_active=False) == 50
@@ -0,0 +1,34 @@
+import threading
+from src.jobs.job_registry import JobRegistry
+
+def _blocking_job(release: threading.Event):
+    def run(job):
+        release.wait(timeout=5)
+    return run
+
+def test_finished_jobs_are_evicted_oldest_first():
+    """Tests that past max_jobs the oldest finished job is dropped and the newer ones kept."""
+    registry = JobRegistry(max_jobs=2)
+    jobs = []
+    for i in range(3):
+        jobs.append(registry.submit(f"kind-{i}", lambda job: None))
+        registry.wait(jobs[-1], timeout=5)
+
+    assert registry.get(jobs[0].id) is None
+    assert [registry.get(job.id) for job in jobs[1:]] == jobs[1:]
+
+def test_active_jobs_are_never_evicted():
+    """Tests that a running job stays queryable past max_jobs, finished ones are evicted around it."""
+    registry = JobRegistry(max_jobs=1, workers=2)
+    release = threading.Event()
+    running = registry.submit("delete_all", _blocking_job(release))
+    try:
+        finished = registry.submit("other", lambda job: None)
+        registry.wait(finished, timeout=5)
+        registry.submit("third", lambda job: None)
+
+        assert registry.get(running.id) is running
+        assert registry.get(finished.id) is None
+    finally:
+        release.set()
+        registry.wait(running, timeout=5)
@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.orm import sessionmaker
+
+from src.repositories.impl.user_repository_sharded import ShardedUserRepository
+from src.repositories.impl.user_repository_sql_alchemy import UserRepository as SQLAlchemyUserRepository
+from tests.conftest import engine, TestingSessionLocal
+
+
+@pytest.fixture(scope="function")
+def db():
+    """Session bound to a connection whose transaction is rolled back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = TestingSessionLocal(bind=connection)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="function")
+def query_plans(db):
+    """
+    Records the SQLite EXPLAIN QUERY PLAN of every SELECT executed through the test session.
+    Each plan is the list of 'detail' lines, e.g. 'SEARCH user USING INDEX ix_user_username (username>? AND username<?)'.
+    """
+    connection = db.connection()
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", capture)
+
+    def plans() -> list[list[str]]:
+        event.remove(connection, "before_cursor_execute", capture)
+        try:
+            return [
+                [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+                for statement, parameters in captured
+            ]
+        finally:
+            event.listen(connection, "before_cursor_execute", capture)
+
+    yield plans
+    event.remove(connection, "before_cursor_execute", capture)
+
+
+@pytest.fixture(scope="function")
+def sharded_repository(shard_engines):
+    """ShardedUserRepository with one session per shard database."""
+    sessions = [sessionmaker(autoflush=False, bind=shard_engine)() for shard_engine in shard_engines]
+    yield ShardedUserRepository([SQLAlchemyUserRepository(db=session) for session in sessions])
+    for session in sessions:
+        session.close()
@@ -0,0 +1,178 @@
+import asyncio
+import pytest
+from src.database.models.user import User
+from src.repositories.user_repository import UserRepository
+from src.repositories.impl.user_repository_memory import MemoryUserRepository
+from src.repositories.impl.user_repository_sql_alchemy import UserRepository as SQLAlchemyUserRepository
+from src.repositories.impl.user_repository_sharded import ShardedUserRepository
+from src.dependencies.sessions_di import get_profile_versions
+from src.dependencies.events_di import get_change_hub
+
+USERNAMES = ["alice", "alfred", "albert", "bob", "al", "alz", "am"]
+
+@pytest.fixture(params=["sqlalchemy", "memory", "sharded"])
+def user_repository(request, db) -> UserRepository:
+    """Every UserRepository implementation, seeded with the same users."""
+    if request.param == "sharded":
+        repository = request.getfixturevalue("sharded_repository")
+    else:
+        repository = SQLAlchemyUserRepository(db=db) if request.param == "sqlalchemy" else MemoryUserRepository()
+    for username in USERNAMES:
+        repository.save(User(username=username, password="hashed_password"))
+    return repository
+
+# --- Tests for save / lookups ---
+
+def test_save_assigns_increasing_ids(user_repository: UserRepository):
+    """Tests that new users get an id, in insertion order."""
+    if isinstance(user_repository, ShardedUserRepository):
+        pytest.skip("sharded ids only increase within a shard")
+    ids = [user_repository.get_by_username(username).id for username in USERNAMES]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(USERNAMES)
+
+def test_get_by_id_and_username(user_repository: UserRepository):
+    """Tests that a saved user is found by id and by username, and that unknown keys return None."""
+    bob = user_repository.get_by_username("bob")
+
+    assert user_repository.get_by_id(bob.id).username == "bob"
+    assert user_repository.get_by_username("nobody") is None
+    assert user_repository.get_by_id(999_999) is None
+    assert user_repository.get_by_id(str(bob.id)).username == "bob"
+    assert user_repository.get_by_id("12345678-1234-5678-1234-567812345678") is None
+    assert user_repository.user_does_exist("bob") is True
+    assert user_repository.user_does_exist("nobody") is False
+
+def test_get_by_ids_skips_unknown_ids(user_repository: UserRepository):
+    """Tests that get_by_ids returns the known users only."""
+    alice, bob = user_repository.get_by_username("alice"), user_repository.get_by_username("bob")
+
+    users = user_repository.get_by_ids([bob.id, 999_999, alice.id])
+
+    assert sorted(user.username for user in users) == ["alice", "bob"]
+    assert user_repository.get_by_ids([]) == []
+
+def test_save_update_reindexes_username_and_is_active(user_repository: UserRepository):
+    """Tests that an update is visible through every lookup, filter and count."""
+    if isinstance(user_repository, ShardedUserRepository):
+        pytest.skip("the username is the shard key and cannot change")
+    bob = user_repository.get_by_username("bob")
+    version = get_profile_versions().current(bob.id)
+    bob.username = "robert"
+    bob.is_active = False
+    user_repository.save(bob)
+
+    assert user_repository.get_by_username("bob") is None
+    assert user_repository.get_by_username("robert").id == bob.id
+    assert [user.username for user in user_repository.get_users(0, 10, is_active=False)] == ["robert"]
+    assert user_repository.get_count() == len(USERNAMES)
+    assert user_repository.get_count(is_active=True) == len(USERNAMES) - 1
+    assert get_profile_versions().current(bob.id) != version
+
+# --- Tests for delete / delete_all ---
+
+def test_delete_removes_the_user(user_repository: UserRepository):
+    """Tests that a deleted user is gone from lookups and counts."""
+    bob = user_repository.get_by_username("bob")
+    user_repository.delete(bob)
+
+    assert user_repository.get_by_id(bob.id) is None
+    assert user_repository.user_does_exist("bob") is False
+    assert user_repository.get_count() == len(USERNAMES) - 1
+    assert "bob" not in [user.username for user in user_repository.get_users(0, 10, sort_by="username")]
+
+def test_delete_all_empties_the_repository(user_repository: UserRepository):
+    """Tests that delete_all removes every user."""
+    user_repository.delete_all()
+
+    assert user_repository.get_count() == 0
+    assert user_repository.get_users(0, 10) == []
+    assert user_repository.search_by_username_prefix("a", limit=10) == []
+
+def test_next_id_range_walks_every_user_in_chunks(user_repository: UserRepository):
+    """Tests that deleting the successive next_id_range chunks removes every user, starting from the lowest id."""
+    first_id, last_id = user_repository.get_id_bounds()
+    chunks, deleted, after_id = [], 0, first_id - 1
+    while (chunk := user_repository.next_id_range(after_id, 2)) is not None:
+        chunks.append(chunk)
+        deleted += user_repository.delete_id_range(*chunk)
+        after_id = chunk[1]
+
+    assert chunks[0][0] == first_id
+    assert chunks[-1][1] == last_id
+    assert deleted == len(USERNAMES)
+    assert user_repository.get_count() == 0
+    assert user_repository.get_id_bounds() is None
+
+# --- Tests for get_users / get_count / get_total_pages ---
+
+@pytest.mark.parametrize("is_active", [None, True, False])
+@pytest.mark.parametrize("sort_by", ["id", "username"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("offset,limit", [(0, 3), (2, 3), (5, 10), (10, 3)])
+def test_get_users_pages_like_a_sorted_filtered_list(user_repository: UserRepository, is_active, sort_by, order, offset, limit):
+    """Tests that every page equals the slice of the filtered users in the requested order."""
+    bob = user_repository.get_by_username("bob")
+    bob.is_active = False
+    user_repository.save(bob)
+    everyone = [user_repository.get_by_username(username) for username in USERNAMES]
+    expected = sorted(
+        (user for user in everyone if is_active is None or user.is_active == is_active),
+        key=lambda user: getattr(user, sort_by),
+        reverse=order == "desc",
+    )
+
+    page = user_repository.get_users(offset, limit, is_active=is_active, sort_by=sort_by, order=order)
+
+    assert [user.id for user in page] == [user.id for user in expected[offset:offset + limit]]
+    assert user_repository.get_count(is_active=is_active) == len(expected)
+
+def test_get_total_pages(user_repository: UserRepository):
+    """Tests that total pages round up."""
+    assert user_repository.get_total_pages(3) == 3
+    assert user_repository.get_total_pages(7) == 1
+
+# --- Tests for search_by_username_prefix ---
+
+def test_search_by_username_prefix(user_repository: UserRepository):
+    """Tests that the prefix search is ordered, limited and resumes after the cursor."""
+    assert [user.username for user in user_repository.search_by_username_prefix("al", limit=10)] == ["al", "albert", "alfred", "alice", "alz"]
+    assert [user.username for user in user_repository.search_by_username_prefix("al", limit=2, after="albert")] == ["alfred", "alice"]
+    assert [user.username for user in user_repository.search_by_username_prefix("", limit=2)] == ["al", "albert"]
+    assert user_repository.search_by_username_prefix("zz", limit=10) == []
+
+# --- Tests for change events ---
+
+def test_mutations_publish_change_events(user_repository: UserRepository):
+    """Tests that updates, deletes and delete_all are published to the change hub."""
+    hub = get_change_hub()
+    last_id = hub.last_id
+    bob = user_repository.get_by_username("bob")
+    bob.is_active = False
+    user_repository.save(bob)
+    user_repository.delete(bob)
+    user_repository.delete_all()
+
+    async def collect():
+        subscription = hub.subscribe(after=last_id)
+        hub.unsubscribe(subscription)
+        return [await subscription.get(timeout=0.01) for _ in range(3)]
+
+    updated, deleted, cleared = asyncio.run(collect())
+    assert (updated.type, updated.data) == ("updated", {"id": bob.id, "username": "bob", "is_active": False})
+    assert (deleted.type, deleted.data) == ("deleted", {"id": bob.id})
+    assert cleared.type == "cleared"
+    # one event per call, however many shards it touched
+    assert hub.last_id == last_id + 3
+
+def test_delete_id_range_publishes_one_event(user_repository: UserRepository):
+    """Tests that deleting a range of ids publishes a single deleted_range event with its bounds."""
+    hub = get_change_hub()
+    last_id = hub.last_id
+    first_id, upper_id = user_repository.get_id_bounds()
+
+    user_repository.delete_id_range(first_id, upper_id)
+
+    assert hub.last_id == last_id + 1
+    assert user_repository.get_count() == 0
@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from src.database.models.user import User
+from src.repositories.impl.user_repository_sharded import SHARD_BUCKETS, ShardedUserRepository, id_bucket, username_bucket
+
+USERNAMES = [f"user{i}" for i in range(30)]
+
+@pytest.fixture
+def seeded_repository(sharded_repository: ShardedUserRepository) -> ShardedUserRepository:
+    for username in USERNAMES:
+        sharded_repository.save(User(username=username, password="hashed_password"))
+    return sharded_repository
+
+def _shard_usernames(repository: ShardedUserRepository) -> list[set[str]]:
+    return [set(shard.db.scalars(select(User.username))) for shard in repository.shards]
+
+def test_users_live_on_the_shard_of_their_username_bucket(seeded_repository: ShardedUserRepository):
+    """Tests that each user is stored only on shard username_bucket % shards, and that every shard gets users."""
+    shards = _shard_usernames(seeded_repository)
+
+    for username in USERNAMES:
+        assert [index for index, usernames in enumerate(shards) if username in usernames] == [username_bucket(username) % 3]
+    assert all(shards)
+
+def test_ids_are_unique_and_encode_the_bucket(seeded_repository: ShardedUserRepository):
+    """Tests that ids are unique across shards and route back to the user's shard."""
+    users = [seeded_repository.get_by_username(username) for username in USERNAMES]
+
+    assert len({user.id for user in users}) == len(USERNAMES)
+    for user in users:
+        assert id_bucket(user.id) == username_bucket(user.username)
+        assert seeded_repository.get_by_id(user.id).username == user.username
+
+def test_ids_increase_within_a_shard(sharded_repository: ShardedUserRepository):
+    """Tests that a shard hands out increasing ids whatever the bucket of the new user."""
+    shard = sharded_repository.shards[0]
+    usernames = [username for username in (f"name{i}" for i in range(100)) if username_bucket(username) % 3 == 0][:5]
+
+    ids = [sharded_repository.save(User(username=username, password="hashed_password")).id for username in usernames]
+
+    assert ids == sorted(ids)
+    assert [id // SHARD_BUCKETS for id in ids] == [1, 2, 3, 4, 5]
+    assert shard.get_count() == 5
+
+def test_duplicate_username_is_rejected_by_its_shard(seeded_repository: ShardedUserRepository):
+    """Tests that usernames stay unique, since equal usernames land on the same shard."""
+    with pytest.raises(IntegrityError):
+        seeded_repository.save(User(username="user1", password="hashed_password"))
+
+def test_username_cannot_change(seeded_repository: ShardedUserRepository):
+    """Tests that renaming a user is refused, the username being the shard key."""
+    user = seeded_repository.get_by_username("user1")
+    user.username = "renamed"
+
+    with pytest.raises(ValueError):
+        seeded_repository.save(user)
+
+def test_update_is_routed_to_the_user_shard(seeded_repository: ShardedUserRepository):
+    """Tests that updating other fields keeps the user, and its id, on its shard."""
+    user = seeded_repository.get_by_username("user1")
+    user.is_active = False
+    seeded_repository.save(user)
+
+    assert seeded_repository.get_by_id(user.id).is_active is False
+    assert seeded_repository.get_count(is_active=False) == 1
+    assert sum(len(usernames) for usernames in _shard_usernames(seeded_repository)) == len(USERNAMES)
+
+def test_get_users_merges_shards_in_order(seeded_repository: ShardedUserRepository):
+    """Tests that pages are cut from the merged, globally ordered users of every shard."""
+    by_username = sorted(USERNAMES)
+
+    page = seeded_repository.get_users(10, 5, sort_by="username", order="desc")
+
+    assert [user.username for user in page] == by_username[::-1][10:15]
+    assert seeded_repository.get_count() == len(USERNAMES)
+    assert seeded_repository.get_total_pages(7) == 5
+
+def test_get_by_ids_queries_only_the_shards_of_the_ids(seeded_repository: ShardedUserRepository):
+    """Tests that a batch lookup only queries the shards owning the requested ids."""
+    user = seeded_repository.get_by_username("user1")
+    queried = []
+    for index, shard in enumerate(seeded_repository.shards):
+        shard.get_by_ids = (lambda original, index: lambda ids: queried.append(index) or original(ids))(shard.get_by_ids, index)
+
+    assert [found.id for found in seeded_repository.get_by_ids([user.id])] == [user.id]
+    assert queried == [username_bucket("user1") % 3]
+
+def test_requires_between_one_and_shard_buckets_shards():
+    """Tests that an empty shard list is refused."""
+    with pytest.raises(ValueError):
+        ShardedUserRepository([])
@@ -0,0 +1,101 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT
+from src.database.models.user import User
+from src.repositories.impl.user_repository_sql_alchemy import UserRepository
+
+@pytest.fixture
+def user_repository(db):
+    """SQLAlchemy repository over the rolled back test session."""
+    repository = UserRepository(db=db)
+    for username in ["alice", "alfred", "albert", "bob", "al", "alz", "am"]:
+        repository.save(User(username=username, password="hashed_password"))
+    return repository
+
+# --- Tests for search_by_username_prefix method ---
+
+def test_search_by_username_prefix_returns_matches_sorted(user_repository: UserRepository):
+    """Tests that only usernames starting with the prefix are returned, ordered by username."""
+    users = user_repository.search_by_username_prefix("al", limit=10)
+
+    assert [user.username for user in users] == ["al", "albert", "alfred", "alice", "alz"]
+
+def test_search_by_username_prefix_keyset_pagination(user_repository: UserRepository):
+    """Tests that 'after' resumes the scan right after the given username."""
+    first_page = user_repository.search_by_username_prefix("al", limit=2)
+    second_page = user_repository.search_by_username_prefix("al", limit=2, after=first_page[-1].username)
+
+    assert [user.username for user in first_page] == ["al", "albert"]
+    assert [user.username for user in second_page] == ["alfred", "alice"]
+
+def test_search_by_username_prefix_uses_username_index(user_repository: UserRepository, query_plans):
+    """Tests that the prefix search is a range scan on ix_user_username, without a full scan or a temp B-tree sort."""
+    user_repository.search_by_username_prefix("al", limit=10, after="albert")
+
+    plan = " ".join(query_plans()[-1])
+    assert "SEARCH user USING INDEX ix_user_username" in plan
+    assert "TEMP B-TREE" not in plan
+
+# --- Tests for get_users / get_count filters and sorting ---
+
+def test_get_users_filters_by_is_active_and_sorts(user_repository: UserRepository):
+    """Tests that is_active filters the page and the count, and that sort_by/order are applied."""
+    bob = user_repository.get_by_username("bob")
+    bob.is_active = False
+    user_repository.save(bob)
+
+    inactive = user_repository.get_users(0, 10, is_active=False)
+    active_desc = user_repository.get_users(0, 3, is_active=True, sort_by="username", order="desc")
+    by_id_desc = user_repository.get_users(0, 10, order="desc")
+
+    assert [user.username for user in inactive] == ["bob"]
+    assert user_repository.get_count(is_active=False) == 1
+    assert user_repository.get_count(is_active=True) == 6
+    assert [user.username for user in active_desc] == ["am", "alz", "alice"]
+    assert [user.id for user in by_id_desc] == sorted((user.id for user in by_id_desc), reverse=True)
+
+@pytest.mark.parametrize("is_active", [None, True, False])
+@pytest.mark.parametrize("sort_by", ["id", "username"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_get_users_never_sorts_in_a_temp_b_tree(user_repository: UserRepository, query_plans, is_active, sort_by, order):
+    """Tests through EXPLAIN QUERY PLAN that every filter/sort combination reads rows in order from an index."""
+    user_repository.get_users(10, 10, is_active=is_active, sort_by=sort_by, order=order)
+    user_repository.get_count(is_active=is_active)
+
+    page_plan, count_plan = [" ".join(plan) for plan in query_plans()[-2:]]
+    assert "TEMP B-TREE" not in page_plan
+    if is_active is not None:
+        assert "USING INDEX ix_user_is_active" in page_plan
+        assert "USING COVERING INDEX ix_user_is_active" in count_plan
+    elif sort_by == "username":
+        assert "USING INDEX ix_user_username" in page_plan
+
+# --- Tests for statement caching ---
+
+def test_repeated_calls_reuse_the_compiled_statement(user_repository: UserRepository, db):
+    """Tests that a second call with other arguments hits SQLAlchemy's compiled cache for every query method."""
+    cache_hits = []
+    event.listen(db.connection(), "before_cursor_execute", lambda conn, cursor, statement, parameters, context, executemany: cache_hits.append(context.cache_hit == CACHE_HIT))
+    calls = [
+        lambda i: user_repository.get_by_username(["alice", "bob"][i]),
+        lambda i: user_repository.user_does_exist(["alice", "bob"][i]),
+        lambda i: user_repository.get_by_ids([[1, 2], [3, 4]][i]),
+        lambda i: user_repository.get_users(i, 2, is_active=True, sort_by="username", order="desc"),
+        lambda i: user_repository.search_by_username_prefix(["al", "b"][i], limit=3, after=[None, "a"][i]),
+        lambda i: user_repository.get_count(is_active=[True, False][i]),
+    ]
+    for call in calls:
+        call(0)
+        cache_hits.clear()
+        call(1)
+        assert cache_hits == [True]
+
+def test_get_by_id_uses_the_identity_map(user_repository: UserRepository, db):
+    """Tests that looking up an already loaded user issues no query."""
+    statements = []
+    event.listen(db.connection(), "before_cursor_execute", lambda conn, cursor, statement, *_: statements.append(statement))
+    alice = user_repository.get_by_username("alice")
+    statements.clear()
+
+    assert user_repository.get_by_id(alice.id) is alice
+    assert statements == []
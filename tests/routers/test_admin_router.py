@@ -0,0 +1,66 @@
+from tests.routers.users_constants import *
+import pytest
+from src.main import app
+from src.core.allocation_profiler import AllocationProfiler
+from src.core.config import settings
+from src.dependencies.profiling_di import get_allocation_profiler
+
+@pytest.fixture
+def profiler(client):
+    profiler = AllocationProfiler(frames=5)
+    app.dependency_overrides[get_allocation_profiler] = lambda: profiler
+    yield profiler
+    profiler.stop()
+
+@pytest.fixture
+def admin(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_USERNAMES", {name_valid_user})
+    client.post("/auth/register", json=valid_user)
+    return client
+
+def test_profiling_requires_authentication(client, profiler):
+    """Tests that the admin endpoints are behind the auth cookie."""
+    assert client.get("/admin/profiling/routes").status_code == 401
+
+def test_profiling_is_admin_only(client, profiler):
+    """Tests that an authenticated user missing from ADMIN_USERNAMES gets 403."""
+    client.post("/auth/register", json=valid_user)
+
+    assert client.get("/admin/profiling/routes").status_code == 403
+
+def test_profiling_endpoints_answer_409_when_off(admin, profiler):
+    """Tests that the endpoints explain profiling is off instead of tracing on demand."""
+    response = admin.get("/admin/profiling/top")
+
+    assert response.status_code == 409
+    assert "ALLOCATION_PROFILING" in response.json()["message"]
+
+def test_top_and_snapshot_diff(admin, profiler):
+    """Tests that an admin can list allocation sites and diff two snapshots."""
+    profiler.start()
+    first = admin.post("/admin/profiling/snapshots").json()
+    second = admin.post("/admin/profiling/snapshots").json()
+    top = admin.get("/admin/profiling/top", params={"limit": 3})
+    diff = admin.get(f"/admin/profiling/snapshots/{second['id']}/diff", params={"base": first["id"], "limit": 3})
+
+    assert top.status_code == 200
+    assert len(top.json()) == 3
+    assert diff.status_code == 200
+    assert len(diff.json()) <= 3
+    assert [snapshot["id"] for snapshot in admin.get("/admin/profiling/snapshots").json()] == [first["id"], second["id"]]
+
+def test_diff_with_unknown_snapshot_is_404(admin, profiler):
+    """Tests that diffing against a snapshot that is not kept answers 404."""
+    profiler.start()
+    snapshot = admin.post("/admin/profiling/snapshots").json()
+
+    assert admin.get(f"/admin/profiling/snapshots/{snapshot['id']}/diff", params={"base": 999}).status_code == 404
+
+def test_route_allocations_are_listed_and_reset(admin, profiler):
+    """Tests that recorded route numbers are served and can be cleared."""
+    profiler.start()
+    profiler.record("/users", profiler.mark())
+
+    assert [stats["route"] for stats in admin.get("/admin/profiling/routes").json()] == ["/users"]
+    assert admin.delete("/admin/profiling/routes").status_code == 204
+    assert admin.get("/admin/profiling/routes").json() == []
@@ -1,4 +1,5 @@
 from tests.routers.users_constants import *
+from src.dependencies.metrics_di import get_metrics
 
 def test_register_new_user_successfully(client):
     """Integration test: Tests that the /auth/register endpoint registers a new user successfully."""
@@ -78,4 +79,58 @@ def test_logout_succesfully(client):
     
     assert response.status_code == 401
     assert "Unauthorized" in response.json()["message"]
-    
\ No newline at end of file
+    
+def test_logout_revokes_token(client):
+    """Tests that a token captured before logout is rejected afterwards."""
+    client.post("/auth/register", json=valid_user)
+    token = client.cookies.get("token")
+
+    client.post("/auth/logout")
+    client.cookies.set("token", token)
+    response = client.get("/users/me")
+
+    assert response.status_code == 401
+
+def test_register_replays_response_for_repeated_idempotency_key(client):
+    """Tests that a retry with the same Idempotency-Key gets the first response and cookie instead of a 409."""
+    headers = {"Idempotency-Key": "register-replay-1"}
+    first = client.post("/auth/register", json=valid_user, headers=headers)
+    client.cookies.clear()
+
+    retry = client.post("/auth/register", json=valid_user, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.cookies["token"] == first.cookies["token"]
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+
+def test_register_rejects_idempotency_key_reused_with_other_body(client):
+    """Tests that reusing an Idempotency-Key for a different registration returns 422."""
+    headers = {"Idempotency-Key": "register-replay-2"}
+    client.post("/auth/register", json=valid_user, headers=headers)
+
+    response = client.post("/auth/register", json={**valid_user, "username": "someone_else"}, headers=headers)
+
+    assert response.status_code == 422
+    assert response.json()["message"] == "Idempotency-Key was already used with a different request body"
+
+def test_register_without_idempotency_key_is_not_replayed(client):
+    """Tests that plain retries still run the endpoint and conflict."""
+    client.post("/auth/register", json=valid_user)
+
+    response = client.post("/auth/register", json=valid_user)
+
+    assert response.status_code == 409
+
+def test_register_past_deadline_returns_gateway_timeout(client, monkeypatch):
+    """Tests that a request out of time fails with a 504 ErrorDTO and is counted per route."""
+    metrics = get_metrics()
+    before = metrics.get("deadline_exceeded_total", route="/auth/register")
+    monkeypatch.setattr("src.core.deadline.expired", lambda: True)
+
+    response = client.post("/auth/register", json=valid_user)
+
+    assert response.status_code == 504
+    assert response.json()["message"] == "Request deadline exceeded"
+    assert metrics.get("deadline_exceeded_total", route="/auth/register") == before + 1
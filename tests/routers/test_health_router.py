@@ -0,0 +1,43 @@
+import pytest
+from src.core.health import Readiness
+from src.dependencies.health_di import get_readiness
+from src.main import app
+
+@pytest.fixture
+def readiness(client):
+    state = Readiness()
+    app.dependency_overrides[get_readiness] = lambda: state
+    return state
+
+def test_live_answers_without_a_cookie(client, readiness):
+    """Tests that /health/live is public and answers while the worker is still starting."""
+    client.cookies.clear()
+    response = client.get("/health/live")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "alive"
+
+def test_ready_is_503_until_warmed_up(client, readiness):
+    """Tests that /health/ready answers 503 with the state before the warmup is done."""
+    response = client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+
+def test_ready_is_200_with_the_warmup_durations(client, readiness):
+    """Tests that /health/ready answers 200 and reports the warmup steps once ready."""
+    readiness.mark_ready({"bcrypt": 0.01})
+    response = client.get("/health/ready")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["warmup"] == {"bcrypt": 0.01}
+
+def test_ready_is_503_while_draining(client, readiness):
+    """Tests that /health/ready answers 503 once shutdown begins, so traffic moves elsewhere."""
+    readiness.mark_ready()
+    readiness.mark_draining()
+    response = client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "draining"
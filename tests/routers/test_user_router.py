@@ -1,5 +1,18 @@
 from tests.routers.users_constants import *
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
 import pytest
+from src.main import app
+from src.core.change_hub import ChangeHub
+from src.dependencies.events_di import get_change_hub
+from src.dependencies.jobs_di import get_job_registry
+from src.dependencies.services_di import get_cookie_service
+from src.services.cookie_service import CookieService
+from src.sessions.revocation_store import RevocationStore
+from src.core.config import settings
+from src.sessions.profile_versions import ProfileVersions
 
 def test_get_me_succesfully(client):
     """Tests that the /users/me endpoint successfully retrieves the authenticated user's data."""
@@ -18,6 +31,42 @@ def test_get_me_succesfully(client):
     assert response.status_code == 200
     assert data["username"] == name_valid_user
 
+def test_get_me_from_token_claims(client, monkeypatch):
+    """Tests that /users/me answers from the embedded claims and falls back to the database once they are stale."""
+    monkeypatch.setattr(settings, "TOKEN_EMBED_USER_CLAIMS", True)
+    profile_versions = ProfileVersions()
+    app.dependency_overrides[get_cookie_service] = lambda: CookieService(profile_versions=profile_versions)
+    user_id = client.post("/auth/register", json=valid_user).json()["id"]
+
+    from_claims = client.get("/users/me")
+    profile_versions.bump(user_id)
+    from_database = client.get("/users/me")
+
+    assert from_claims.status_code == 200
+    assert from_claims.json() == {"id": user_id, "username": name_valid_user, "is_active": True}
+    assert from_database.json() == from_claims.json()
+
+def test_token_close_to_expiration_is_refreshed(client, monkeypatch):
+    """Tests that the auth middleware re-issues the cookie when the token is within the refresh window."""
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_EXPIRE_MINUTES", settings.TOKEN_REFRESH_WINDOW_MINUTES - 1)
+    client.post("/auth/register", json=valid_user)
+    old_token = client.cookies.get("token")
+
+    response = client.get("/users/me")
+
+    assert response.status_code == 200
+    assert "token=" in response.headers["set-cookie"]
+    assert client.cookies.get("token") != old_token
+
+def test_token_far_from_expiration_is_not_refreshed(client):
+    """Tests that requests outside the refresh window do not get a new cookie."""
+    client.post("/auth/register", json=valid_user)
+
+    response = client.get("/users/me")
+
+    assert response.status_code == 200
+    assert "set-cookie" not in response.headers
+
 def test_get_me_unauthorized(client):
     """Tests that accessing the /users/me endpoint without authentication returns a 401 Unauthorized error."""
     response = client.get(
@@ -117,3 +166,160 @@ def test_get_user_by_id_not_found(client):
 
     assert response.status_code == 404
     assert  response.json()["message"] == f'User with id {non_existent_id} not found'
+
+# --- Tests for GET /users/batch ---
+
+def test_get_users_by_ids_preserves_order_and_reports_missing(client):
+    """Tests that the batch endpoint returns users in the requested order and lists the missing ids."""
+    first_id = client.post("/auth/register", json=valid_user).json()["id"]
+    second_id = client.post("/auth/register", json={"username": "otheruser", "password": "password"}).json()["id"]
+    missing_id = second_id + 1000
+
+    response = client.get(f"/users/batch?ids={second_id}&ids={missing_id}&ids={first_id}")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert [user["id"] for user in data["results"]] == [second_id, first_id]
+    assert data["missing"] == [missing_id]
+
+def test_get_users_by_ids_exceeding_max_batch_size(client):
+    """Tests that requesting more ids than MAX_BATCH_SIZE returns a 400 Bad Request error."""
+    client.post("/auth/register", json=valid_user)
+    ids = "&".join(f"ids={i}" for i in range(settings.MAX_BATCH_SIZE + 1))
+
+    response = client.get(f"/users/batch?{ids}")
+
+    assert response.status_code == 400
+    assert response.json()["message"] == f"Batch size must not exceed {settings.MAX_BATCH_SIZE} ids"
+
+def test_get_users_by_ids_without_ids(client):
+    """Tests that the batch endpoint requires at least one id."""
+    client.post("/auth/register", json=valid_user)
+
+    response = client.get("/users/batch")
+
+    assert response.status_code == 422
+
+# --- Tests for GET /users/search ---
+
+def test_search_users_by_prefix_with_cursor(client):
+    """Tests that the search endpoint pages through the matching usernames with next_cursor."""
+    client.post("/auth/register", json=valid_user)
+    for username in ["searchb", "searcha", "searchc", "other"]:
+        client.post("/auth/register", json={"username": username, "password": "password"})
+
+    first_page = client.get("/users/search?prefix=search&limit=2").json()
+    second_page = client.get(f"/users/search?prefix=search&limit=2&after={first_page['next_cursor']}").json()
+
+    assert [user["username"] for user in first_page["results"]] == ["searcha", "searchb"]
+    assert first_page["next_cursor"] == "searchb"
+    assert [user["username"] for user in second_page["results"]] == ["searchc"]
+    assert second_page["next_cursor"] is None
+
+def test_search_users_without_prefix(client):
+    """Tests that the search endpoint requires a non empty prefix."""
+    client.post("/auth/register", json=valid_user)
+
+    response = client.get("/users/search?prefix=")
+
+    assert response.status_code == 422
+
+def test_list_users_sorted_by_username_desc(client):
+    """Tests that sort_by and order query params are applied to the user list."""
+    client.post("/auth/register", json=valid_user)
+    for username in ["aaa_user", "zzz_user"]:
+        client.post("/auth/register", json={"username": username, "password": "password"})
+
+    response = client.get("/users?sort_by=username&order=desc&is_active=true")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert [user["username"] for user in data["results"]] == ["zzz_user", name_valid_user, "aaa_user"]
+    assert data["total_results"] == 3
+
+def test_list_users_with_invalid_sort(client):
+    """Tests that an unsupported sort field returns a 422 Unprocessable Entity error."""
+    client.post("/auth/register", json=valid_user)
+
+    response = client.get("/users?sort_by=password")
+
+    assert response.status_code == 422
+
+def test_user_changes_streams_events_after_last_event_id(client):
+    """Tests that /users/changes sends the events after Last-Event-ID as Server-Sent Events."""
+    hub = ChangeHub()
+    hub.publish("created", {"id": 1, "username": "alice", "is_active": True})
+    hub.publish("deleted", {"id": 1})
+    hub.close()
+    app.dependency_overrides[get_change_hub] = lambda: hub
+    client.post("/auth/register", json=valid_user)
+
+    response = client.get("/users/changes", headers={"Last-Event-ID": "1"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == 'id: 2\nevent: deleted\ndata: {"id": 1}\n\n'
+
+def test_repository_publishes_user_changes(client):
+    """Tests that registering a user is published to the change hub."""
+    hub = get_change_hub()
+    last_id = hub.last_id
+    user_id = client.post("/auth/register", json=valid_user).json()["id"]
+
+    async def collect():
+        subscription = hub.subscribe(after=last_id)
+        hub.unsubscribe(subscription)
+        return await subscription.get(timeout=0.01)
+
+    created = asyncio.run(collect())
+    assert (created.type, created.data) == ("created", {"id": user_id, "username": name_valid_user, "is_active": True})
+
+# --- Tests for DELETE /users ---
+
+def test_delete_all_runs_as_a_background_job(client):
+    """Tests that DELETE /users answers 202 with a job whose status endpoint reports the deletion."""
+    app.dependency_overrides[get_cookie_service] = lambda: CookieService(revocation_store=RevocationStore())
+    for username in ["first_user", "second_user", name_valid_user]:
+        client.post("/auth/register", json={**valid_user, "username": username})
+
+    response = client.delete("/users")
+    job = response.json()
+    get_job_registry().wait(get_job_registry().get(job["id"]), timeout=5)
+    status_response = client.get(response.headers["location"])
+
+    assert response.status_code == 202
+    assert job["kind"] == "delete_all"
+    assert status_response.status_code == 200
+    assert status_response.json()["state"] == "succeeded"
+    assert status_response.json()["processed"] == 3
+    assert client.get("/users").json()["total_results"] == 0
+    assert client.get("/users/jobs/unknown").status_code == 404
+
+def test_login_right_after_delete_all_is_accepted(client, monkeypatch):
+    """Tests that tokens issued in the same second as DELETE /users, after it, are not caught by its revocation."""
+    app.dependency_overrides[get_cookie_service] = lambda: CookieService(revocation_store=RevocationStore())
+    # DELETE /users at .2 of a second, the new tokens at .5 of the same one
+    clock = SimpleNamespace(now=float(int(time.time())) + 0.2)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromtimestamp(clock.now, tz)
+
+    monkeypatch.setattr("src.services.cookie_service.time", SimpleNamespace(time=lambda: clock.now))
+    monkeypatch.setattr("src.services.cookie_service.datetime", FrozenDatetime)
+    client.post("/auth/register", json=valid_user)
+    job = client.delete("/users").json()
+    get_job_registry().wait(get_job_registry().get(job["id"]), timeout=5)
+    clock.now += 0.3
+
+    register = client.post("/auth/register", json=valid_user)
+    me_after_register = client.get("/users/me")
+    client.cookies.clear()
+    login = client.post("/auth/login", json=valid_user)
+    me_after_login = client.get("/users/me")
+
+    assert register.status_code == 201
+    assert me_after_register.status_code == 200
+    assert login.status_code == 200
+    assert me_after_login.status_code == 200
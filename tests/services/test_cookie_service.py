@@ -7,6 +7,10 @@ from unittest.mock import MagicMock
 from src.services.cookie_service import CookieService
 from src.database.models.user import User
 from src.core.config import settings
+from src.sessions.impl.memory_session_store import MemorySessionStore
+from src.sessions.revocation_store import RevocationStore
+from src.sessions.profile_versions import ProfileVersions
+from src.dependencies.sessions_di import get_slid_sessions
 
 @pytest.fixture
 def cookie_service():
@@ -28,6 +32,7 @@ def test_create_token(cookie_service: CookieService, sample_user: User):
     
     assert payload["sub"] == sample_user.username
     assert payload["id"] == sample_user.id
+    assert payload["jti"]
     
     # Verifica que la expiración está dentro de un rango razonable
     exp_time = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
@@ -93,6 +98,18 @@ def test_get_user_id_from_token_expired(cookie_service: CookieService, sample_us
     
     assert user_id is None
 
+def test_revoke_token_rejects_the_token(cookie_service: CookieService, sample_user: User):
+    """Tests that a revoked JWT no longer validates even though it has not expired."""
+    cookie_service.revocation_store = RevocationStore()
+    token = cookie_service.create_token(sample_user)
+    other_token = cookie_service.create_token(sample_user)
+
+    cookie_service.revoke_token(token)
+
+    with pytest.raises(JWTError):
+        cookie_service.validate_token(token)
+    cookie_service.validate_token(other_token)
+
 def test_validate_token_invalid(cookie_service: CookieService):
     """Tests that validate_token raises an exception for an invalid token."""
     with pytest.raises(JWTError):
@@ -101,4 +118,124 @@ def test_validate_token_invalid(cookie_service: CookieService):
 def test_validate_token_none(cookie_service: CookieService):
     """Tests that validate_token raises an exception for a null token."""
     with pytest.raises(JWTError):
-        cookie_service.validate_token(None)
\ No newline at end of file
+        cookie_service.validate_token(None)
+# --- Server-side session mode ---
+
+@pytest.fixture
+def session_cookie_service():
+    """CookieService backed by an in-memory session store."""
+    return CookieService(session_store=MemorySessionStore(shards=2))
+
+def test_session_mode_issues_opaque_ids(session_cookie_service: CookieService, sample_user: User):
+    """Tests that in session mode the token is an opaque id resolved by the store, not a JWT."""
+    token = session_cookie_service.create_token(sample_user)
+    mock_request = MagicMock(spec=Request)
+    mock_request.cookies.get.return_value = token
+
+    with pytest.raises(JWTError):
+        jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    session_cookie_service.validate_token(token)
+    assert session_cookie_service.get_user_id_from_token(mock_request) == sample_user.id
+
+def test_session_mode_slides_the_session_once_per_refresh_window(session_cookie_service: CookieService, sample_user: User, monkeypatch):
+    """Tests that a request extends its server-side session in the store, once per refresh window, keeping the same id."""
+    store = session_cookie_service.session_store
+    touches = []
+    monkeypatch.setattr(store, "touch", lambda session_id, ttl_seconds: touches.append(session_id) or True)
+    token = session_cookie_service.create_token(sample_user)
+    payload = session_cookie_service.validate_token(token)
+
+    assert session_cookie_service.refresh_token(payload, token) is None
+    assert touches == []
+    get_slid_sessions().pop(token)
+    assert session_cookie_service.refresh_token(payload, token) is None
+    assert session_cookie_service.refresh_token(payload, token) is None
+    assert touches == [token]
+
+def test_session_mode_revoke_token(session_cookie_service: CookieService, sample_user: User):
+    """Tests that a revoked session no longer validates."""
+    token = session_cookie_service.create_token(sample_user)
+
+    session_cookie_service.revoke_token(token)
+
+    with pytest.raises(JWTError):
+        session_cookie_service.validate_token(token)
+
+# --- User claims embedded in the token ---
+
+@pytest.fixture
+def claims_cookie_service():
+    """CookieService embedding the user claims, with its own profile versions."""
+    return CookieService(profile_versions=ProfileVersions())
+
+def mock_request_with(cookie_service: CookieService, token: str):
+    """A request the auth middleware authenticated with `token`."""
+    mock_request = MagicMock(spec=Request)
+    mock_request.cookies.get.return_value = token
+    mock_request.state.token_claims = cookie_service.validate_token(token)
+    return mock_request
+
+def test_get_user_from_claims(claims_cookie_service: CookieService):
+    """Tests that the embedded user is returned while its profile version is current."""
+    user = User(id=7, username="testuser", password="testpassword", is_active=True)
+    token = claims_cookie_service.create_token(user, embed_user_claims=True)
+
+    claims_user = claims_cookie_service.get_user_from_claims(mock_request_with(claims_cookie_service, token))
+
+    assert claims_user.model_dump() == {"id": 7, "username": "testuser", "is_active": True}
+
+def test_get_user_from_claims_after_profile_change(claims_cookie_service: CookieService):
+    """Tests that bumping the user's profile version makes the embedded claims stale."""
+    user = User(id=7, username="testuser", password="testpassword")
+    token = claims_cookie_service.create_token(user, embed_user_claims=True)
+
+    claims_cookie_service.profile_versions.bump(7)
+
+    assert claims_cookie_service.get_user_from_claims(mock_request_with(claims_cookie_service, token)) is None
+
+def test_get_user_from_claims_without_embedded_user(claims_cookie_service: CookieService, sample_user: User):
+    """Tests that plain tokens never answer from claims."""
+    token = claims_cookie_service.create_token(sample_user, embed_user_claims=False)
+
+    assert claims_cookie_service.get_user_from_claims(mock_request_with(claims_cookie_service, token)) is None
+
+def test_get_user_from_claims_of_another_process(claims_cookie_service: CookieService):
+    """Tests that claims stamped by another process (a restart, another worker) are never current, even at the same version."""
+    user = User(id=7, username="testuser", password="testpassword")
+    token = CookieService(profile_versions=ProfileVersions()).create_token(user, embed_user_claims=True)
+
+    assert claims_cookie_service.get_user_from_claims(mock_request_with(claims_cookie_service, token)) is None
+
+def test_get_user_from_claims_reads_the_validated_claims(claims_cookie_service: CookieService, monkeypatch):
+    """Tests that the claims the middleware validated are used, the token is not decoded again."""
+    user = User(id=7, username="testuser", password="testpassword", is_active=True)
+    request = mock_request_with(claims_cookie_service, claims_cookie_service.create_token(user, embed_user_claims=True))
+    monkeypatch.setattr(claims_cookie_service.codec, "decode", MagicMock(side_effect=AssertionError("decoded twice")))
+
+    assert claims_cookie_service.get_user_from_claims(request).id == 7
+
+# --- Sliding expiration ---
+
+def test_refresh_token_outside_window(cookie_service: CookieService, sample_user: User):
+    """Tests that a token far from its expiration is not re-signed."""
+    cookie_service.refresh_window = 5
+    cookie_service.expiration_time = 30
+    payload = cookie_service.validate_token(cookie_service.create_token(sample_user))
+
+    assert cookie_service.refresh_token(payload) is None
+
+def test_refresh_token_inside_window_mints_once(cookie_service: CookieService, sample_user: User):
+    """Tests that a token close to exp gets one replacement, shared by every request carrying it."""
+    cookie_service.refresh_window = 5
+    cookie_service.expiration_time = 2
+    payload = cookie_service.validate_token(cookie_service.create_token(sample_user))
+    cookie_service.expiration_time = 30
+
+    first = cookie_service.refresh_token(payload)
+    second = cookie_service.refresh_token(payload)
+    refreshed = cookie_service.validate_token(first)
+
+    assert first == second
+    assert refreshed["id"] == sample_user.id
+    assert refreshed["jti"] != payload["jti"]
+    assert refreshed["exp"] > payload["exp"]
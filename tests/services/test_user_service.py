@@ -1,13 +1,17 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from contextlib import nullcontext
+from unittest.mock import MagicMock, patch, call
 from fastapi import HTTPException, status, Response, Request
 from src.database.models.user import User
 from src.repositories.impl.user_repository_sql_alchemy import UserRepository
 from src.services.cookie_service import CookieService
 from src.services.user_service import UserService
-from src.schemas.user import RegisterUserDTO, LoginUserDTO
+from src.schemas.user import RegisterUserDTO, LoginUserDTO, UserDTO
 from src.schemas.pagination import PaginationParams, PaginationResponse
 import bcrypt
+from src.core.config import settings
+from src.jobs.job_registry import JobRegistry
+from src.sessions.verified_credentials import VerifiedCredentials
 
 # --- Fixtures ---
 
@@ -23,8 +27,8 @@ def cookie_service_mock():
 
 @pytest.fixture
 def user_service(user_repository_mock: UserRepository, cookie_service_mock: CookieService):
-    """Fixture to get an instance of UserService with mocks."""
-    return UserService(user_repository_mock, cookie_service_mock)
+    """Fixture to get an instance of UserService with mocks, its background jobs use the same repository mock."""
+    return UserService(user_repository_mock, cookie_service_mock, JobRegistry(), lambda: nullcontext(user_repository_mock))
 
 @pytest.fixture
 def sample_user():
@@ -127,12 +131,84 @@ def test_login_invalid_password(user_service: UserService, user_repository_mock:
         user_repository_mock.get_by_username.assert_called_once_with(login_user_dto.username)
         cookie_service_mock.set_cookie.assert_not_called()
 
+def test_repeated_login_skips_bcrypt_with_the_login_cache(user_repository_mock: UserRepository, cookie_service_mock: CookieService, login_user_dto: LoginUserDTO, mock_response: Response, sample_user: User):
+    """Tests that a valid login is verified by bcrypt once, then answered from VerifiedCredentials."""
+    service = UserService(user_repository_mock, cookie_service_mock, verified_credentials=VerifiedCredentials())
+    user_repository_mock.get_by_username.return_value = sample_user
+
+    with patch('bcrypt.checkpw', return_value=True) as checkpw:
+        service.login(login_user_dto, mock_response)
+        service.login(login_user_dto, mock_response)
+
+    checkpw.assert_called_once()
+    assert cookie_service_mock.set_cookie.call_count == 2
+
+def test_login_cache_is_bypassed_after_a_password_change(user_repository_mock: UserRepository, cookie_service_mock: CookieService, login_user_dto: LoginUserDTO, mock_response: Response, sample_user: User):
+    """Tests that a cached login no longer counts once the user's stored hash changed."""
+    service = UserService(user_repository_mock, cookie_service_mock, verified_credentials=VerifiedCredentials())
+    user_repository_mock.get_by_username.return_value = sample_user
+    with patch('bcrypt.checkpw', return_value=True):
+        service.login(login_user_dto, mock_response)
+
+    sample_user.password = "new_hashed_password"
+    with patch('bcrypt.checkpw', return_value=False):
+        with pytest.raises(HTTPException) as exc_info:
+            service.login(login_user_dto, mock_response)
+
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_failed_logins_are_not_cached(user_repository_mock: UserRepository, cookie_service_mock: CookieService, login_user_dto: LoginUserDTO, mock_response: Response, sample_user: User):
+    """Tests that a wrong password pays bcrypt on every attempt."""
+    credentials = VerifiedCredentials()
+    service = UserService(user_repository_mock, cookie_service_mock, verified_credentials=credentials)
+    user_repository_mock.get_by_username.return_value = sample_user
+
+    with patch('bcrypt.checkpw', return_value=False) as checkpw:
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                service.login(login_user_dto, mock_response)
+
+    assert checkpw.call_count == 2
+    assert len(credentials) == 0
+
 # --- Tests for delete_all method ---
 
-def test_delete_all(user_service: UserService, user_repository_mock: UserRepository):
-    """Tests that the delete_all method calls the repository."""
+def test_delete_all(user_service: UserService, user_repository_mock: UserRepository, monkeypatch):
+    """Tests that delete_all deletes the users in the background, in bounded id ranges, reporting progress."""
+    monkeypatch.setattr(settings, "DELETE_ALL_CHUNK_SIZE", 1000)
+    monkeypatch.setattr(settings, "DELETE_ALL_PAUSE_SECONDS", 0)
+    user_repository_mock.get_id_bounds.return_value = (1, 2500)
+    user_repository_mock.get_count.return_value = 2500
+    user_repository_mock.next_id_range.side_effect = [(1, 1000), (1001, 2000), (2001, 2500), None]
+    user_repository_mock.delete_id_range.side_effect = [1000, 1000, 500]
+
+    job = user_service.delete_all()
+    user_service.job_registry.wait(job, timeout=5)
+
+    assert user_repository_mock.delete_id_range.call_args_list == [call(1, 1000), call(1001, 2000), call(2001, 2500)]
+    assert (job.state, job.total, job.processed, job.progress) == ("succeeded", 2500, 2500, 1.0)
+    assert user_service.get_job(job.id) is job
+
+def test_delete_all_without_users(user_service: UserService, user_repository_mock: UserRepository):
+    """Tests that the job succeeds without deleting anything on an empty table."""
+    user_repository_mock.get_id_bounds.return_value = None
+
+    job = user_service.delete_all()
+    user_service.job_registry.wait(job, timeout=5)
+
+    assert job.state == "succeeded"
+    user_repository_mock.delete_id_range.assert_not_called()
+
+def test_get_job_not_found(user_service: UserService):
+    """Tests that an unknown job id raises a 404."""
+    with pytest.raises(HTTPException) as exc_info:
+        user_service.get_job("missing")
+    assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+
+def test_delete_all_revokes_every_token(user_service: UserService, cookie_service_mock: CookieService):
+    """Tests that deleting all users also revokes every issued token."""
     user_service.delete_all()
-    user_repository_mock.delete_all.assert_called_once()
+    cookie_service_mock.revoke_all.assert_called_once()
 
 # --- Tests for logout method ---
 
@@ -141,10 +217,20 @@ def test_logout(user_service: UserService, cookie_service_mock: CookieService, m
     user_service.logout(mock_response)
     cookie_service_mock.clean_cookies.assert_called_once_with(mock_response)
 
+def test_logout_revokes_the_request_token(user_service: UserService, cookie_service_mock: CookieService, mock_response: Response, mock_request: Request):
+    """Tests that logging out with the request revokes its token before clearing the cookie."""
+    cookie_service_mock.get_token.return_value = "token"
+
+    user_service.logout(mock_response, mock_request)
+
+    cookie_service_mock.revoke_token.assert_called_once_with("token")
+    cookie_service_mock.clean_cookies.assert_called_once_with(mock_response)
+
 # --- Tests for get_current_user method ---
 
 def test_get_current_user_success(user_service: UserService, cookie_service_mock: CookieService, user_repository_mock: UserRepository, mock_request: Request, sample_user: User):
     """Tests successfully getting the current user."""
+    cookie_service_mock.get_user_from_claims.return_value = None
     cookie_service_mock.get_user_id_from_token.return_value = sample_user.id
     user_repository_mock.get_by_id.return_value = sample_user
     
@@ -154,8 +240,19 @@ def test_get_current_user_success(user_service: UserService, cookie_service_mock
     user_repository_mock.get_by_id.assert_called_once_with(sample_user.id)
     assert current_user == sample_user
 
+def test_get_current_user_from_token_claims(user_service: UserService, cookie_service_mock: CookieService, user_repository_mock: UserRepository, mock_request: Request):
+    """Tests that current user claims still valid in the token are returned without querying the repository."""
+    claims_user = UserDTO(id=1, username="testuser", is_active=True)
+    cookie_service_mock.get_user_from_claims.return_value = claims_user
+
+    current_user = user_service.get_current_user(mock_request)
+
+    assert current_user == claims_user
+    user_repository_mock.get_by_id.assert_not_called()
+
 def test_get_current_user_no_token_or_user_not_found(user_service: UserService, cookie_service_mock: CookieService, user_repository_mock: UserRepository, mock_request: Request):
     """Tests getting the current user when there is no token or the user is not found."""
+    cookie_service_mock.get_user_from_claims.return_value = None
     cookie_service_mock.get_user_id_from_token.return_value = None # Simulate no token or invalid token
     user_repository_mock.get_by_id.return_value = None # Simulate user not found when get_by_id is called with None
     
@@ -200,8 +297,8 @@ def test_list_users_default_pagination(user_service: UserService, user_repositor
     params = PaginationParams()
     response = user_service.list_users(params)
     
-    user_repository_mock.get_users.assert_called_once_with(0, 10) # offset = (page-1)*limit
-    user_repository_mock.get_count.assert_called_once()
+    user_repository_mock.get_users.assert_called_once_with(0, 10, None, "id", "asc") # offset = (page-1)*limit
+    user_repository_mock.get_count.assert_called_once_with(None)
     
     assert isinstance(response, PaginationResponse)
     assert response.results == [sample_user]
@@ -218,8 +315,8 @@ def test_list_users_custom_pagination(user_service: UserService, user_repository
     params = PaginationParams(page=2, limit=5)
     response = user_service.list_users(params)
     
-    user_repository_mock.get_users.assert_called_once_with(5, 5) # offset = (2-1)*5 = 5
-    user_repository_mock.get_count.assert_called_once()
+    user_repository_mock.get_users.assert_called_once_with(5, 5, None, "id", "asc") # offset = (2-1)*5 = 5
+    user_repository_mock.get_count.assert_called_once_with(None)
     
     assert isinstance(response, PaginationResponse)
     assert response.results == [sample_user]
@@ -236,12 +333,68 @@ def test_list_users_empty_results(user_service: UserService, user_repository_moc
     params = PaginationParams()
     response = user_service.list_users(params)
     
-    user_repository_mock.get_users.assert_called_once_with(0, 10)
-    user_repository_mock.get_count.assert_called_once()
+    user_repository_mock.get_users.assert_called_once_with(0, 10, None, "id", "asc")
+    user_repository_mock.get_count.assert_called_once_with(None)
     
     assert isinstance(response, PaginationResponse)
     assert response.results == []
     assert response.page == 1
     assert response.limit == 10
     assert response.total_results == 0
-    assert response.total_pages == 0 # (0 + 10 - 1) // 10 = 0
\ No newline at end of file
+    assert response.total_pages == 0 # (0 + 10 - 1) // 10 = 0
+def test_list_users_filtered_and_sorted(user_service: UserService, user_repository_mock: UserRepository, sample_user: User):
+    """Tests that the filter and sort params reach the repository and the count uses the same filter."""
+    user_repository_mock.get_users.return_value = [sample_user]
+    user_repository_mock.get_count.return_value = 1
+
+    params = PaginationParams(is_active=False, sort_by="username", order="desc")
+    user_service.list_users(params)
+
+    user_repository_mock.get_users.assert_called_once_with(0, 10, False, "username", "desc")
+    user_repository_mock.get_count.assert_called_once_with(False)
+
+# --- Tests for get_users_by_ids method ---
+
+def test_get_users_by_ids_single_query_in_input_order(user_service: UserService, user_repository_mock: UserRepository):
+    """Tests that the batch lookup queries the repository once, keeps the input order and reports missing ids."""
+    first = User(id=1, username="first", password="hashed_password")
+    third = User(id=3, username="third", password="hashed_password")
+    user_repository_mock.get_by_ids.return_value = [first, third]
+
+    response = user_service.get_users_by_ids([3, 2, 1, 3])
+
+    user_repository_mock.get_by_ids.assert_called_once_with([3, 2, 1])
+    assert [user.id for user in response.results] == [3, 1]
+    assert response.missing == [2]
+
+def test_get_users_by_ids_too_many(user_service: UserService, user_repository_mock: UserRepository):
+    """Tests that a batch larger than MAX_BATCH_SIZE is rejected before hitting the repository."""
+    with patch.object(settings, "MAX_BATCH_SIZE", 2):
+        with pytest.raises(HTTPException) as exc_info:
+            user_service.get_users_by_ids([1, 2, 3])
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+    user_repository_mock.get_by_ids.assert_not_called()
+
+# --- Tests for search_users method ---
+
+def test_search_users_sets_next_cursor_when_more_rows(user_service: UserService, user_repository_mock: UserRepository):
+    """Tests that search_users asks for one extra row and exposes the last username as cursor."""
+    user_repository_mock.search_by_username_prefix.return_value = [
+        User(id=i, username=f"user{i}", password="hashed_password") for i in range(3)
+    ]
+
+    response = user_service.search_users("user", 2)
+
+    user_repository_mock.search_by_username_prefix.assert_called_once_with("user", 3, None)
+    assert [user.username for user in response.results] == ["user0", "user1"]
+    assert response.next_cursor == "user1"
+
+def test_search_users_last_page(user_service: UserService, user_repository_mock: UserRepository):
+    """Tests that the last page has no next_cursor."""
+    user_repository_mock.search_by_username_prefix.return_value = [User(id=1, username="user1", password="hashed_password")]
+
+    response = user_service.search_users("user", 2, after="user0")
+
+    user_repository_mock.search_by_username_prefix.assert_called_once_with("user", 3, "user0")
+    assert response.next_cursor is None
@@ -0,0 +1,84 @@
+from src.sessions.revocation_store import RevocationStore
+from src.dependencies.metrics_di import get_metrics
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_revoked_until_expiration():
+    """Tests that a revoked jti is reported until the token's own exp, then dropped."""
+    clock = FakeClock()
+    store = RevocationStore(clock=clock)
+
+    store.revoke("jti-1", expires_at=clock.now + 60, issued_at=clock.now)
+
+    assert store.is_revoked("jti-1", clock.now) is True
+    assert store.is_revoked("jti-2", clock.now) is False
+    clock.now += 61
+    assert store.is_revoked("jti-1", clock.now - 120) is False
+    assert len(store) == 0
+
+def test_overflow_revokes_older_tokens_instead_of_forgetting():
+    """Tests that past max_entries the evicted token stays revoked through the issued-before floor."""
+    clock = FakeClock()
+    store = RevocationStore(max_entries=2, clock=clock)
+    for i in range(3):
+        store.revoke(f"jti-{i}", expires_at=clock.now + 60, issued_at=clock.now + i)
+
+    assert len(store) == 2
+    assert store.is_revoked("jti-0", clock.now) is True
+    assert store.is_revoked("never-revoked", clock.now + 5) is False
+
+def test_overflow_evicts_the_token_expiring_soonest():
+    """Tests that past max_entries the entry expiring soonest is evicted, not the oldest one, and the floor raise is counted."""
+    clock = FakeClock()
+    store = RevocationStore(max_entries=2, clock=clock)
+    raised = get_metrics().get("revocation_floor_raised_total", reason="overflow")
+    store.revoke("long-lived", expires_at=clock.now + 600, issued_at=clock.now - 10)
+    store.revoke("short-lived", expires_at=clock.now + 5, issued_at=clock.now - 20)
+
+    store.revoke("new", expires_at=clock.now + 300, issued_at=clock.now)
+
+    assert len(store) == 2
+    assert store.is_revoked("short-lived", clock.now - 20) is True
+    assert store.is_revoked("other", clock.now - 15) is False
+    assert get_metrics().get("revocation_floor_raised_total", reason="overflow") == raised + 1
+
+def test_revoke_issued_before():
+    """Tests that every token issued before the given time is revoked."""
+    clock = FakeClock()
+    store = RevocationStore(clock=clock)
+
+    store.revoke_issued_before(clock.now)
+
+    assert store.is_revoked("any", clock.now - 1) is True
+    assert store.is_revoked("any", None) is True
+    assert store.is_revoked("any", clock.now) is False
+
+def test_token_issued_in_the_same_second_after_the_floor_is_valid():
+    """Tests that a sub-second iat just after revoke_issued_before is not revoked."""
+    store = RevocationStore()
+    store.revoke_issued_before(1000.25)
+
+    assert store.is_revoked("before", 1000.2) is True
+    assert store.is_revoked("after", 1000.5) is False
+
+def test_journal_survives_restart(tmp_path):
+    """Tests that revocations are replayed from the journal and expired ones are compacted away."""
+    clock = FakeClock()
+    journal_path = str(tmp_path / "revoked.jsonl")
+    store = RevocationStore(journal_path=journal_path, clock=clock)
+    store.revoke("short", expires_at=clock.now + 10, issued_at=clock.now)
+    store.revoke("long", expires_at=clock.now + 600, issued_at=clock.now)
+    store.revoke_issued_before(clock.now - 100)
+
+    clock.now += 20
+    restarted = RevocationStore(journal_path=journal_path, clock=clock)
+
+    assert restarted.is_revoked("long", clock.now) is True
+    assert restarted.is_revoked("short", clock.now) is False
+    assert restarted.is_revoked("other", clock.now - 200) is True
+    assert len(restarted) == 1
@@ -0,0 +1,68 @@
+import pytest
+from src.sessions.session_store import SessionStore
+from src.sessions.impl.memory_session_store import MemorySessionStore
+from src.sessions.impl.sqlite_session_store import SQLiteSessionStore
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture(params=["memory", "sqlite"])
+def session_store(request, clock, tmp_path) -> SessionStore:
+    """Every SessionStore implementation must pass the same tests."""
+    if request.param == "memory":
+        return MemorySessionStore(shards=4, clock=clock)
+    return SQLiteSessionStore(f"sqlite:///{tmp_path / 'sessions.db'}", purge_every=1, clock=clock)
+
+def test_create_and_get(session_store: SessionStore):
+    """Tests that a created session resolves to its claims through an opaque id."""
+    session_id = session_store.create({"sub": "testuser", "id": 1}, ttl_seconds=60)
+
+    assert len(session_id) >= 32
+    assert session_store.get(session_id) == {"sub": "testuser", "id": 1}
+    assert session_store.get("unknown") is None
+
+def test_session_expires(session_store: SessionStore, clock: FakeClock):
+    """Tests that a session is no longer returned once its TTL elapsed."""
+    session_id = session_store.create({"id": 1}, ttl_seconds=60)
+
+    clock.now += 61
+
+    assert session_store.get(session_id) is None
+
+def test_touch_extends_session(session_store: SessionStore, clock: FakeClock):
+    """Tests that touch slides the expiration of a live session."""
+    session_id = session_store.create({"id": 1}, ttl_seconds=60)
+
+    clock.now += 50
+    assert session_store.touch(session_id, ttl_seconds=60) is True
+    clock.now += 50
+
+    assert session_store.get(session_id) == {"id": 1}
+
+def test_delete(session_store: SessionStore):
+    """Tests that a deleted session can no longer be resolved."""
+    session_id = session_store.create({"id": 1}, ttl_seconds=60)
+
+    session_store.delete(session_id)
+
+    assert session_store.get(session_id) is None
+    assert session_store.touch(session_id, ttl_seconds=60) is False
+
+def test_memory_store_drops_expired_entries(clock: FakeClock):
+    """Tests that the memory store frees expired sessions through its timing wheel."""
+    store = MemorySessionStore(shards=1, clock=clock)
+    for _ in range(10):
+        store.create({"id": 1}, ttl_seconds=5)
+
+    clock.now += 6
+    store.create({"id": 2}, ttl_seconds=5)
+
+    assert len(store) == 1
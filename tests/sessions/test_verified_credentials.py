@@ -0,0 +1,58 @@
+from src.sessions.verified_credentials import VerifiedCredentials
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_remembered_login_is_verified():
+    """Tests that a remembered username, password and hash is verified."""
+    credentials = VerifiedCredentials()
+    credentials.remember("alice", b"secret", "$2b$12$hash")
+
+    assert credentials.is_verified("alice", b"secret", "$2b$12$hash")
+
+def test_other_password_or_user_is_not_verified():
+    """Tests that neither another password nor another username match an entry."""
+    credentials = VerifiedCredentials()
+    credentials.remember("alice", b"secret", "$2b$12$hash")
+
+    assert not credentials.is_verified("alice", b"Secret", "$2b$12$hash")
+    assert not credentials.is_verified("bob", b"secret", "$2b$12$hash")
+
+def test_changed_hash_is_not_verified():
+    """Tests that an entry stops counting as soon as the stored hash changes."""
+    credentials = VerifiedCredentials()
+    credentials.remember("alice", b"secret", "$2b$12$old")
+
+    assert not credentials.is_verified("alice", b"secret", "$2b$12$new")
+
+def test_entries_expire():
+    """Tests that a verification is forgotten after ttl_seconds."""
+    clock = FakeClock()
+    credentials = VerifiedCredentials(ttl_seconds=60, clock=clock)
+    credentials.remember("alice", b"secret", "$2b$12$hash")
+    clock.now = 60
+
+    assert not credentials.is_verified("alice", b"secret", "$2b$12$hash")
+
+def test_entries_are_bounded():
+    """Tests that past max_entries the oldest verification is evicted."""
+    credentials = VerifiedCredentials(max_entries=2)
+    for username in ("alice", "bob", "carol"):
+        credentials.remember(username, b"secret", "$2b$12$hash")
+
+    assert len(credentials) == 2
+    assert not credentials.is_verified("alice", b"secret", "$2b$12$hash")
+
+def test_password_is_not_stored():
+    """Tests that neither the password nor an unkeyed digest of it is kept."""
+    credentials = VerifiedCredentials()
+    credentials.remember("alice", b"secret", "$2b$12$hash")
+    (username, digest), = credentials._entries._entries
+
+    assert username == "alice"
+    assert b"secret" not in digest
+    assert digest != VerifiedCredentials()._digest(b"secret")
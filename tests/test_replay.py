@@ -0,0 +1,76 @@
+import asyncio
+import random
+import httpx
+from fastapi import FastAPI, HTTPException, Request, Response
+from src.core.traffic_capture import CapturedRequest
+from src.replay import build_body, build_path, needs_account, replay, report
+
+def captured(session: str, ts: float, method: str, route: str, **kwargs) -> CapturedRequest:
+    return CapturedRequest(ts=ts, session=session, method=method, route=route, status=200, ms=1.0, **kwargs)
+
+def build_app() -> tuple[FastAPI, list]:
+    app = FastAPI()
+    accounts: dict[str, str] = {}
+    calls = []
+
+    @app.post("/auth/register")
+    async def register(body: dict, response: Response):
+        accounts[body["username"]] = body["password"]
+        response.set_cookie("token", body["username"])
+        return {}
+
+    @app.post("/auth/login")
+    async def login(body: dict, response: Response):
+        if accounts.get(body["username"]) != body["password"]:
+            raise HTTPException(status_code=401)
+        response.set_cookie("token", body["username"])
+        return {}
+
+    @app.get("/users/{id}")
+    async def user(id: int, request: Request):
+        token = request.cookies.get("token")
+        calls.append((token, id))
+        if token is None:
+            raise HTTPException(status_code=401)
+        return {}
+
+    return app, calls
+
+def test_build_path_fills_the_route_template():
+    """Tests that path parameters, with or without a convertor, are put back into the route."""
+    assert build_path("/users/{id}", {"id": "7"}) == "/users/7"
+    assert build_path("/jobs/{job_id:str}/x", {"job_id": "ab"}) == "/jobs/ab/x"
+
+def test_build_body_uses_the_session_credentials():
+    """Tests that bodies follow the captured shape, with the session's username and password."""
+    body = build_body({"username": "str:5", "password": "str:8", "note": "str:3", "n": "int"}, {"username": "u", "password": "p"}, random.Random(1))
+
+    assert body["username"] == "u" and body["password"] == "p"
+    assert len(body["note"]) == 3 and body["n"] == 1
+
+def test_only_sessions_logging_in_before_registering_need_an_account():
+    """Tests that a session gets an account registered in advance only when it logs in first."""
+    assert needs_account([captured("a", 0, "GET", "/users/{id}"), captured("a", 1, "POST", "/auth/login")])
+    assert not needs_account([captured("a", 0, "POST", "/auth/register"), captured("a", 1, "POST", "/auth/login")])
+    assert not needs_account([captured("a", 0, "GET", "/users/{id}")])
+
+def test_replay_keeps_session_order_and_cookies():
+    """Tests that each session logs in with its own account and then sends its cookie, in captured order."""
+    app, calls = build_app()
+    credentials_shape = {"username": "str:5", "password": "str:8"}
+    log = [
+        captured("s1", 0.00, "POST", "/auth/login", body=credentials_shape),
+        captured("s2", 0.01, "POST", "/auth/register", body=credentials_shape),
+        captured("s1", 0.02, "GET", "/users/{id}", path_params={"id": "1"}),
+        captured("s2", 0.03, "GET", "/users/{id}", path_params={"id": "2"}),
+        captured("s1", 0.04, "GET", "/users/{id}", path_params={"id": "3"}),
+    ]
+    new_client = lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay")
+
+    results = asyncio.run(replay(log, new_client, speed=10))
+
+    assert all(result.status == 200 for result in results)
+    tokens = {id: token for token, id in calls}
+    assert tokens[1] == tokens[3] != tokens[2]
+    assert [id for token, id in calls if token == tokens[1]] == [1, 3]
+    assert "GET /users/{id}" in report(results)
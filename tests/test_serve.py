@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+from src.serve import cgroup_cpu_quota, multi_worker_problems, worker_count
+
+def _cgroup_files(tmp_path, **contents):
+    paths = {name: str(tmp_path / name) for name in ("cpu_max", "cfs_quota", "cfs_period")}
+    for name, content in contents.items():
+        (tmp_path / name).write_text(content + "\n")
+    return paths
+
+def test_cgroup_v2_quota_is_read_from_cpu_max(tmp_path):
+    """Tests that a cgroup v2 limit of 150000/100000 is a quota of 1.5 CPUs."""
+    assert cgroup_cpu_quota(**_cgroup_files(tmp_path, cpu_max="150000 100000")) == 1.5
+
+def test_cgroup_v2_without_limit_has_no_quota(tmp_path):
+    """Tests that "max" in cpu.max means no quota."""
+    assert cgroup_cpu_quota(**_cgroup_files(tmp_path, cpu_max="max 100000")) is None
+
+def test_cgroup_v1_quota_is_read_when_there_is_no_v2(tmp_path):
+    """Tests that the cfs quota and period of cgroup v1 are used when cpu.max does not exist."""
+    assert cgroup_cpu_quota(**_cgroup_files(tmp_path, cfs_quota="200000", cfs_period="100000")) == 2
+
+def test_cgroup_v1_negative_quota_has_no_quota(tmp_path):
+    """Tests that a cfs quota of -1, unlimited, means no quota."""
+    assert cgroup_cpu_quota(**_cgroup_files(tmp_path, cfs_quota="-1", cfs_period="100000")) is None
+
+def test_worker_count_rounds_a_fractional_quota_up(tmp_path, monkeypatch):
+    """Tests that a 1.5 CPU quota on a 4 CPU host runs 2 workers."""
+    monkeypatch.setattr("os.sched_getaffinity", lambda pid: {0, 1, 2, 3})
+    assert worker_count(**_cgroup_files(tmp_path, cpu_max="150000 100000")) == 2
+
+def test_worker_count_is_capped_by_the_cpus_available(tmp_path, monkeypatch):
+    """Tests that a quota above the CPUs the process may use does not add workers."""
+    monkeypatch.setattr("os.sched_getaffinity", lambda pid: {0, 1})
+    assert worker_count(**_cgroup_files(tmp_path, cpu_max="800000 100000")) == 2
+
+def test_configured_worker_count_wins(tmp_path):
+    """Tests that WEB_CONCURRENCY overrides the CPU quota."""
+    assert worker_count(5, **_cgroup_files(tmp_path, cpu_max="100000 100000")) == 5
+
+def _settings(**overrides):
+    values = {"USER_REPOSITORY": "sqlalchemy", "SESSION_MODE": "server", "SESSION_STORE": "sqlite", "REVOCATION_JOURNAL_PATH": None}
+    return SimpleNamespace(**(values | overrides))
+
+def test_shared_sessions_only_warn_about_per_worker_state():
+    """Tests that SQLite users and sessions start several workers, with a warning about the state they do not share."""
+    errors, warnings = multi_worker_problems(_settings())
+    assert errors == []
+    assert warnings
+
+def test_memory_session_store_refuses_several_workers():
+    """Tests that server-side sessions kept in memory are refused, a session would only exist in one worker."""
+    errors, _ = multi_worker_problems(_settings(SESSION_STORE="memory"))
+    assert any("SESSION_STORE" in error for error in errors)
+
+def test_revocation_journal_refuses_several_workers():
+    """Tests that a revocation journal is refused, workers would compact it under each other."""
+    errors, _ = multi_worker_problems(_settings(SESSION_MODE="jwt", REVOCATION_JOURNAL_PATH="revocations.log"))
+    assert any("REVOCATION_JOURNAL_PATH" in error for error in errors)
+
+def test_jwt_sessions_warn_that_revocations_are_per_worker():
+    """Tests that JWT sessions start several workers with a warning that logouts only revoke in one of them."""
+    errors, warnings = multi_worker_problems(_settings(SESSION_MODE="jwt", SESSION_STORE="memory"))
+    assert errors == []
+    assert any("revoke" in warning for warning in warnings)